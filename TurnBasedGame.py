@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import messagebox
 from abc import ABC, abstractmethod
 import random
 
@@ -390,6 +390,72 @@ class BossMonster(Monster):
             drops.append(random.choice(loot_table))
         return drops
 
+# Default turn pacing in milliseconds (at 1x speed)
+TURN_DELAY_MS = 1500
+STAGE_DELAY_MS = 4000
+RESET_DELAY_MS = 2000
+SKIP_DELAY_MS = 500
+
+# Speed multipliers the speed button cycles through
+SPEED_MULTIPLIERS = (1, 2, 4, 8)
+
+# Central scheduler on top of root.after: speed multiplier, fast-forward
+# (zero delays, pending callbacks run immediately) and cancel-all on reset.
+# Same code as projectfix/praktikum/scheduler.py; keep the copies in sync.
+class TurnScheduler:
+    def __init__(self, root, speed=1):
+        self.root = root
+        self.speed = speed
+        self.fast_forward = False
+        self._pending = {}
+        self._next_token = 0
+
+    def delay_for(self, delay_ms):
+        if self.fast_forward:
+            return 0
+        return int(delay_ms / self.speed)
+
+    def cycle_speed(self):
+        if self.speed in SPEED_MULTIPLIERS:
+            index = (SPEED_MULTIPLIERS.index(self.speed) + 1) % len(SPEED_MULTIPLIERS)
+        else:
+            index = 0
+        self.speed = SPEED_MULTIPLIERS[index]
+        return self.speed
+
+    def set_fast_forward(self, enabled):
+        self.fast_forward = enabled
+        if enabled:
+            self.skip()
+
+    def schedule(self, delay_ms, callback, *args):
+        self._next_token += 1
+        token = self._next_token
+        after_id = self.root.after(self.delay_for(delay_ms), self._run, token)
+        self._pending[token] = (after_id, callback, args)
+        return token
+
+    def _run(self, token):
+        entry = self._pending.pop(token, None)
+        if entry is None:
+            return
+        _, callback, args = entry
+        callback(*args)
+
+    def cancel_all(self):
+        pending, self._pending = self._pending, {}
+        for after_id, _, _ in pending.values():
+            self.root.after_cancel(after_id)
+
+    def skip(self):
+        for token in list(self._pending):
+            entry = self._pending.pop(token, None)
+            if entry is None:
+                continue
+            after_id, callback, args = entry
+            self.root.after_cancel(after_id)
+            callback(*args)
+
 class RPGGameUI:
     def __init__(self, root):
         self.root = root
@@ -397,6 +463,7 @@ class RPGGameUI:
         self.root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
         self.root.resizable(False, False)
         self.root.configure(bg="#1a1a2e")  # Dark Tech Blue background
+        self.scheduler = TurnScheduler(root)  # all turn pacing goes through one scheduler
 
         self.stage = 1
         self.player = Player()
@@ -443,6 +510,9 @@ class RPGGameUI:
         self.buttons_frame = tk.Frame(self.root, bg="#1a1a2e")
         self.buttons_frame.pack(padx=20, pady=10)
 
+        # Target selection panel; replaces the action buttons while choosing
+        self.target_frame = tk.Frame(self.root, bg="#1a1a2e")
+
         self.upgrade_frame = tk.LabelFrame(self.root, text="Upgrades", fg="#4ecdc4", bg="#2d2d44",
                                            font=(FONT_NAME, 12, "bold"))
         self.upgrade_frame.pack(fill="x", padx=20, pady=(0, 10))
@@ -600,6 +670,23 @@ class RPGGameUI:
                                      font=(FONT_NAME, 12), bg="#28a745", fg="white", width=12)
         self.shop_button.grid(row=0, column=1, padx=20)
 
+        self.speed_var = tk.StringVar(value="Speed: 1x")
+        tk.Button(self.menu_frame, textvariable=self.speed_var, command=self.cycle_speed, font=(FONT_NAME, 12),
+                  bg="#6c757d", fg="white", width=14).grid(row=0, column=2, padx=10)
+        self.fast_forward_var = tk.StringVar(value="Skip: Off")
+        tk.Button(self.menu_frame, textvariable=self.fast_forward_var, command=self.toggle_fast_forward,
+                  font=(FONT_NAME, 12), bg="#6c757d", fg="white", width=14).grid(row=0, column=3, padx=10)
+
+    def cycle_speed(self):
+        speed = self.scheduler.cycle_speed()
+        self.speed_var.set(f"Speed: {speed}x")
+
+    # Fast-forward: every turn delay becomes 0 and pending callbacks run right away
+    def toggle_fast_forward(self):
+        enabled = not self.scheduler.fast_forward
+        self.fast_forward_var.set(f"Skip: {'On' if enabled else 'Off'}")
+        self.scheduler.set_fast_forward(enabled)
+
     def create_gold_label(self):
         self.gold_var = tk.StringVar()
         self.gold_label = tk.Label(self.root, textvariable=self.gold_var, font=(FONT_NAME, 14, "bold"),
@@ -666,6 +753,7 @@ class RPGGameUI:
         return random.choice(sets)
 
     def start_stage(self):
+        self.hide_target_panel()
         self.player_defending = False
         if self.stage % 3 == 0:
             # Boss stage
@@ -713,13 +801,15 @@ class RPGGameUI:
             self.update_upgrade_ui()
             self.status_var.set(f"You defeated the enemies! Gained {xp_earned} XP and {gold_earned} Gold! {loot_text} Prepare for next stage...")
             self.stage += 1
-            self.root.after(4000, self.start_stage)
+            self.scheduler.schedule(STAGE_DELAY_MS, self.start_stage)
         else:
             self.status_var.set("Game Over! You were defeated.")
             messagebox.showinfo("Game Over", "You have been defeated! Game will reset.")
             self.reset_game()
 
     def reset_game(self):
+        # Drop turn/stage callbacks still pending from the previous game
+        self.scheduler.cancel_all()
         self.stage = 1
         self.player = Player()
         self.monsters = []
@@ -733,15 +823,19 @@ class RPGGameUI:
         self.update_upgrade_ui()
         self.update_gold_label()
         self.status_var.set("Game Reset. Starting from Stage 1...")
-        self.root.after(2000, self.start_stage)
+        self.scheduler.schedule(RESET_DELAY_MS, self.start_stage)
 
     def player_attack_action(self):
         if not self.in_battle or not self.is_player_turn:
             return
-        target = self.get_current_target_monster()
-        if not target:
+        if not any(m.is_alive for m in self.monsters):
             self.status_var.set("No valid target to attack.")
             return
+        self.get_current_target_monster(self.player_attack_on)
+
+    def player_attack_on(self, target):
+        if not self.in_battle or not self.is_player_turn or not target.is_alive:
+            return
         result = self.player.attack(target)
         self.status_var.set(result)
         self.update_monster_ui()
@@ -751,10 +845,14 @@ class RPGGameUI:
     def player_special_attack_action(self):
         if not self.in_battle or not self.is_player_turn:
             return
-        target = self.get_current_target_monster()
-        if not target:
+        if not any(m.is_alive for m in self.monsters):
             self.status_var.set("No valid target to attack.")
             return
+        self.get_current_target_monster(self.player_special_attack_on)
+
+    def player_special_attack_on(self, target):
+        if not self.in_battle or not self.is_player_turn or not target.is_alive:
+            return
         result = self.player.special_attack(target)
         self.status_var.set(result)
         self.update_monster_ui()
@@ -798,7 +896,7 @@ class RPGGameUI:
             self.is_player_turn = False
             self.update_action_buttons(state="disabled")
             self.active_monster_index = 0
-            self.root.after(1500, self.monster_turn)
+            self.scheduler.schedule(TURN_DELAY_MS, self.monster_turn)
         else:
             # Monster turn is done or no monsters left, player's turn
             self.is_player_turn = True
@@ -819,7 +917,7 @@ class RPGGameUI:
         current_monster = self.monsters[self.active_monster_index]
         if not current_monster.is_alive:
             self.active_monster_index += 1
-            self.root.after(500, self.monster_turn)
+            self.scheduler.schedule(SKIP_DELAY_MS, self.monster_turn)
             return
 
         action_choice = random.choices(["attack", "special"], weights=[80, 20])[0]
@@ -842,31 +940,40 @@ class RPGGameUI:
             return
 
         self.active_monster_index += 1
-        self.root.after(1500, self.monster_turn)
+        self.scheduler.schedule(TURN_DELAY_MS, self.monster_turn)
 
-    def get_current_target_monster(self):
-        if not self.monsters:
-            return None
-        # If only one monster alive or only one monster exists, target that
+    # Non-modal target selection: on_selected(monster) runs right away when only one
+    # monster is alive, otherwise after a target button in the main window is clicked
+    def get_current_target_monster(self, on_selected):
         alive_monsters = [m for m in self.monsters if m.is_alive]
+        if not alive_monsters:
+            return
         if len(alive_monsters) == 1:
-            return alive_monsters[0]
-
-        # Multiple monsters alive - ask player which to target
-        alive_indexes = [idx for idx, m in enumerate(self.monsters) if m.is_alive]
-        # GUI prompt for target selection: a simple dialog
-        target_names = [self.monsters[i].name for i in alive_indexes]
-        choice = simpledialog.askstring("Choose Target",
-                                        f"Multiple enemies alive. Select target by number:\n" +
-                                        "\n".join(f"{i+1}. {name}" for i, name in enumerate(target_names)))
-        try:
-            choice_idx = int(choice) - 1
-            if 0 <= choice_idx < len(target_names):
-                return self.monsters[alive_indexes[choice_idx]]
-        except:
-            pass
-        # Default to first alive monster if invalid input
-        return self.monsters[alive_indexes[0]] if alive_indexes else None
+            on_selected(alive_monsters[0])
+            return
+
+        self.hide_target_panel()
+        tk.Label(self.target_frame, text="Choose target:", font=(FONT_NAME, FONT_SIZE, "bold"), fg="white",
+                 bg="#1a1a2e").pack(side="left", padx=8)
+        for monster in alive_monsters:
+            tk.Button(self.target_frame, text=f"{monster.name}\nHP: {monster.hp}/{monster.max_hp}",
+                      font=(FONT_NAME, FONT_SIZE, "bold"), fg="white", bg="#8a5cf6", width=14,
+                      command=lambda m=monster: self.select_target(m, on_selected)).pack(side="left", padx=4)
+        tk.Button(self.target_frame, text="Cancel", font=(FONT_NAME, FONT_SIZE, "bold"), bg="#ff5555", fg="white",
+                  command=self.hide_target_panel).pack(side="left", padx=8)
+        self.buttons_frame.pack_forget()
+        self.target_frame.pack(before=self.upgrade_frame, padx=20, pady=10)
+
+    def select_target(self, monster, on_selected):
+        self.hide_target_panel()
+        on_selected(monster)
+
+    def hide_target_panel(self):
+        for widget in self.target_frame.winfo_children():
+            widget.destroy()
+        if self.target_frame.winfo_manager():
+            self.target_frame.pack_forget()
+            self.buttons_frame.pack(before=self.upgrade_frame, padx=20, pady=10)
 
     # Inventory and Shop Windows --------------------------------------------------
     def open_inventory_window(self):
@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import messagebox
 import random
 from main import (
     Player, Monster, BossMonster,
@@ -7,6 +7,7 @@ from main import (
     HEALTH_POTION, MP_POTION, WOODEN_SWORD, IRON_SWORD,
     LEATHER_ARMOR, CHAINMAIL_ARMOR, LUCKY_CHARM, CRIT_RING
 )
+from scheduler import TurnScheduler, TURN_DELAY_MS, STAGE_DELAY_MS
 
 # Konstanta untuk ukuran UI dan font
 WINDOW_WIDTH = 900
@@ -14,6 +15,10 @@ WINDOW_HEIGHT = 600
 FONT_NAME = "Helvetica"
 FONT_SIZE = 12
 
+# Jeda sebelum memulai ulang setelah reset dan sebelum melewati monster yang sudah mati (skala 1x)
+RESET_DELAY_MS = 2000
+SKIP_DELAY_MS = 500
+
 class RPGGameUI:
     def __init__(self, root):
         self.root = root
@@ -21,6 +26,7 @@ class RPGGameUI:
         self.root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
         self.root.resizable(False, False)
         self.root.configure(bg="#1a1a2e")  # Latar belakang Biru Teknologi Gelap
+        self.scheduler = TurnScheduler(root)  # semua jeda giliran lewat penjadwal pusat
 
         self.stage = 1
         self.player = Player()
@@ -67,6 +73,9 @@ class RPGGameUI:
         self.buttons_frame = tk.Frame(self.root, bg="#1a1a2e")
         self.buttons_frame.pack(padx=20, pady=10)
 
+        # Panel pemilihan target; menggantikan tombol aksi selama memilih
+        self.target_frame = tk.Frame(self.root, bg="#1a1a2e")
+
         self.upgrade_frame = tk.LabelFrame(self.root, text="Peningkatan", fg="#4ecdc4", bg="#2d2d44",
                                            font=(FONT_NAME, 12, "bold"))
         self.upgrade_frame.pack(fill="x", padx=20, pady=(0, 10))
@@ -224,6 +233,23 @@ class RPGGameUI:
                                      font=(FONT_NAME, 12), bg="#28a745", fg="white", width=12)
         self.shop_button.grid(row=0, column=1, padx=20)
 
+        self.speed_var = tk.StringVar(value="Kecepatan: 1x")
+        tk.Button(self.menu_frame, textvariable=self.speed_var, command=self.cycle_speed, font=(FONT_NAME, 12),
+                  bg="#6c757d", fg="white", width=14).grid(row=0, column=2, padx=10)
+        self.fast_forward_var = tk.StringVar(value="Lewati: Mati")
+        tk.Button(self.menu_frame, textvariable=self.fast_forward_var, command=self.toggle_fast_forward,
+                  font=(FONT_NAME, 12), bg="#6c757d", fg="white", width=14).grid(row=0, column=3, padx=10)
+
+    def cycle_speed(self):
+        speed = self.scheduler.cycle_speed()
+        self.speed_var.set(f"Kecepatan: {speed}x")
+
+    # Mode lewati: semua jeda giliran menjadi 0 dan yang tertunda langsung dijalankan
+    def toggle_fast_forward(self):
+        enabled = not self.scheduler.fast_forward
+        self.fast_forward_var.set(f"Lewati: {'Nyala' if enabled else 'Mati'}")
+        self.scheduler.set_fast_forward(enabled)
+
     def create_gold_label(self):
         self.gold_var = tk.StringVar()
         self.gold_label = tk.Label(self.root, textvariable=self.gold_var, font=(FONT_NAME, 14, "bold"),
@@ -290,6 +316,7 @@ class RPGGameUI:
         return random.choice(sets)
 
     def start_stage(self):
+        self.hide_target_panel()
         self.player_defending = False
         if self.stage % 3 == 0:
             # Tahap bos
@@ -337,13 +364,15 @@ class RPGGameUI:
             self.update_upgrade_ui()
             self.status_var.set(f"Anda mengalahkan musuh! Memperoleh {xp_earned} XP dan {gold_earned} Emas! {loot_text} Bersiap untuk tahap selanjutnya...")
             self.stage += 1
-            self.root.after(4000, self.start_stage)
+            self.scheduler.schedule(STAGE_DELAY_MS, self.start_stage)
         else:
             self.status_var.set("Permainan Berakhir! Anda dikalahkan.")
             messagebox.showinfo("Permainan Berakhir", "Anda telah dikalahkan! Permainan akan diatur ulang.")
             self.reset_game()
 
     def reset_game(self):
+        # Batalkan giliran/tahap yang masih tertunda dari permainan sebelumnya
+        self.scheduler.cancel_all()
         self.stage = 1
         self.player = Player()
         self.monsters = []
@@ -357,15 +386,19 @@ class RPGGameUI:
         self.update_upgrade_ui()
         self.update_gold_label()
         self.status_var.set("Permainan Diatur Ulang. Memulai dari Tahap 1...")
-        self.root.after(2000, self.start_stage)
+        self.scheduler.schedule(RESET_DELAY_MS, self.start_stage)
 
     def player_attack_action(self):
         if not self.in_battle or not self.is_player_turn:
             return
-        target = self.get_current_target_monster()
-        if not target:
+        if not any(m.is_alive for m in self.monsters):
             self.status_var.set("Tidak ada target yang valid untuk diserang.")
             return
+        self.get_current_target_monster(self.player_attack_on)
+
+    def player_attack_on(self, target):
+        if not self.in_battle or not self.is_player_turn or not target.is_alive:
+            return
         result = self.player.attack(target)
         self.status_var.set(result)
         self.update_monster_ui()
@@ -375,10 +408,14 @@ class RPGGameUI:
     def player_special_attack_action(self):
         if not self.in_battle or not self.is_player_turn:
             return
-        target = self.get_current_target_monster()
-        if not target:
+        if not any(m.is_alive for m in self.monsters):
             self.status_var.set("Tidak ada target yang valid untuk diserang.")
             return
+        self.get_current_target_monster(self.player_special_attack_on)
+
+    def player_special_attack_on(self, target):
+        if not self.in_battle or not self.is_player_turn or not target.is_alive:
+            return
         result = self.player.special_attack(target)
         self.status_var.set(result)
         self.update_monster_ui()
@@ -422,7 +459,7 @@ class RPGGameUI:
             self.is_player_turn = False
             self.update_action_buttons(state="disabled")
             self.active_monster_index = 0
-            self.root.after(1500, self.monster_turn)
+            self.scheduler.schedule(TURN_DELAY_MS, self.monster_turn)
         else:
             # Giliran monster selesai atau tidak ada monster tersisa, giliran pemain
             self.is_player_turn = True
@@ -443,7 +480,7 @@ class RPGGameUI:
         current_monster = self.monsters[self.active_monster_index]
         if not current_monster.is_alive:
             self.active_monster_index += 1
-            self.root.after(500, self.monster_turn)
+            self.scheduler.schedule(SKIP_DELAY_MS, self.monster_turn)
             return
 
         action_choice = random.choices(["attack", "special"], weights=[80, 20])[0]
@@ -466,31 +503,40 @@ class RPGGameUI:
             return
 
         self.active_monster_index += 1
-        self.root.after(1500, self.monster_turn)
+        self.scheduler.schedule(TURN_DELAY_MS, self.monster_turn)
 
-    def get_current_target_monster(self):
-        if not self.monsters:
-            return None
-        # Jika hanya ada satu monster yang hidup atau hanya ada satu monster, targetkan itu
+    # Memilih target tanpa dialog modal: on_selected(monster) dipanggil langsung
+    # jika hanya satu monster hidup, atau setelah tombol target di jendela utama diklik
+    def get_current_target_monster(self, on_selected):
         alive_monsters = [m for m in self.monsters if m.is_alive]
+        if not alive_monsters:
+            return
         if len(alive_monsters) == 1:
-            return alive_monsters[0]
-
-        # Beberapa monster hidup - tanyakan kepada pemain mana yang akan ditargetkan
-        alive_indexes = [idx for idx, m in enumerate(self.monsters) if m.is_alive]
-        # Prompt GUI untuk pemilihan target: dialog sederhana
-        target_names = [self.monsters[i].name for i in alive_indexes]
-        choice = simpledialog.askstring("Pilih Target",
-                                        f"Beberapa musuh hidup. Pilih target berdasarkan nomor:\n" +
-                                        "\n".join(f"{i+1}. {name}" for i, name in enumerate(target_names)))
-        try:
-            choice_idx = int(choice) - 1
-            if 0 <= choice_idx < len(target_names):
-                return self.monsters[alive_indexes[choice_idx]]
-        except:
-            pass
-        # Default ke monster hidup pertama jika input tidak valid
-        return self.monsters[alive_indexes[0]] if alive_indexes else None
+            on_selected(alive_monsters[0])
+            return
+
+        self.hide_target_panel()
+        tk.Label(self.target_frame, text="Pilih target:", font=(FONT_NAME, FONT_SIZE, "bold"), fg="white",
+                 bg="#1a1a2e").pack(side="left", padx=8)
+        for monster in alive_monsters:
+            tk.Button(self.target_frame, text=f"{monster.name}\nHP: {monster.hp}/{monster.max_hp}",
+                      font=(FONT_NAME, FONT_SIZE, "bold"), fg="white", bg="#8a5cf6", width=14,
+                      command=lambda m=monster: self.select_target(m, on_selected)).pack(side="left", padx=4)
+        tk.Button(self.target_frame, text="Batal", font=(FONT_NAME, FONT_SIZE, "bold"), bg="#ff5555", fg="white",
+                  command=self.hide_target_panel).pack(side="left", padx=8)
+        self.buttons_frame.pack_forget()
+        self.target_frame.pack(before=self.upgrade_frame, padx=20, pady=10)
+
+    def select_target(self, monster, on_selected):
+        self.hide_target_panel()
+        on_selected(monster)
+
+    def hide_target_panel(self):
+        for widget in self.target_frame.winfo_children():
+            widget.destroy()
+        if self.target_frame.winfo_manager():
+            self.target_frame.pack_forget()
+            self.buttons_frame.pack(before=self.upgrade_frame, padx=20, pady=10)
 
     # Jendela Inventaris dan Toko --------------------------------------------------
     def open_inventory_window(self):
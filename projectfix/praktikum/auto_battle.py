@@ -0,0 +1,315 @@
+"""
+Mode pertarungan otomatis untuk party.
+
+AutoBattlePlanner memilih aksi terbaik untuk anggota party yang sedang
+mendapat giliran: serang, spesial, bertahan, atau minum ramuan (ramuan
+dianggap memakai giliran; UI menjalankannya lalu melanjutkan dengan
+bertahan). Pencariannya anytime: setiap aksi kandidat dinilai dengan
+rollout acak sampai pertarungan selesai, dan anggaran rollout dibagi
+dengan UCB1 sehingga aksi yang menjanjikan lebih sering dicoba. Kapan pun
+anggaran waktu (budget_ms) atau rollout (max_rollouts) habis, aksi yang
+paling sering dipilih dipakai.
+
+Rollout berjalan di atas BattleSnapshot, salinan ringan keadaan
+pertarungan berupa list angka, bukan di atas objek Character. Karena itu
+snapshot bisa diambil di thread Tk lalu dicari di AutoBattleWorker (thread
+terpisah) tanpa menyentuh model yang sedang ditampilkan; keputusannya
+dikirim kembali lewat antrean dan diambil UI dengan poll.
+"""
+import math
+import queue
+import random
+import threading
+import time
+
+from game_logic import (
+    ACTION_ATTACK, ACTION_DEFEND, ACTION_SPECIAL, ITEM_TYPE_POTION, MonsterPool, PooledMonster, REVIVE_POTION,
+    BossMonster, Sage
+)
+
+# Aksi tambahan khusus mode otomatis: target berupa (item_id, indeks anggota)
+ACTION_POTION = "potion"
+
+# Batas monster yang dipertimbangkan sebagai target (HP terendah dulu) pada gelombang besar
+MAX_TARGET_CANDIDATES = 4
+# Batas ronde per rollout; rollout yang belum selesai dinilai dengan heuristik
+ROLLOUT_ROUNDS = 30
+# Pengurang nilai setiap ramuan yang dipakai, agar ramuan tidak dibuang percuma
+POTION_COST = 0.05
+UCB_EXPLORATION = 0.5
+
+# Parameter pertarungan yang sama dengan game_logic (lihat juga monster_ai.py)
+PLAYER_CRIT_CHANCE = 0.2
+MONSTER_SPECIAL_ROLL = 0.2
+MONSTER_SPECIAL_CHANCE = 0.25
+KILL_HEAL = 50
+KILL_MP = 30
+
+# Indeks kolom di BattleSnapshot.players dan .monsters
+P_HP, P_MAX_HP, P_MP, P_MAX_MP, P_ATTACK, P_DEFENSE, P_EVADE, P_CRIT, P_SPECIAL_COST, P_SPECIAL_MULT = range(10)
+M_HP, M_MAX_HP, M_MP, M_ATTACK, M_DEFENSE, M_EVADE, M_BOSS = range(7)
+
+
+def _evade_chance(evasion):
+    return min(100, max(0, evasion)) / 100
+
+
+class BattleSnapshot:
+    """
+    Keadaan pertarungan sebagai data biasa: statistik setiap anggota party
+    dan monster (urutan sama dengan engine, termasuk yang sudah kalah),
+    ramuan di inventaris, dan anggota yang sedang mendapat giliran.
+    """
+    __slots__ = ("players", "monsters", "potions", "current")
+
+    def __init__(self, players, monsters, potions, current):
+        self.players = players
+        self.monsters = monsters
+        self.potions = potions
+        self.current = current
+
+    @classmethod
+    def from_engine(cls, engine):
+        players = []
+        for member in engine.party.members:
+            sage = isinstance(member, Sage)
+            players.append([
+                member.hp if member.is_alive else 0, member.max_hp, member.mp, member.max_mp,
+                member.attack_stat, member.defense_stat, _evade_chance(member.evasion_stat),
+                2 + member.total_critical_damage_bonus() / 100, 20 if sage else 15, 2.5 if sage else 2,
+            ])
+        if isinstance(engine.monsters, MonsterPool):
+            monsters = [PooledMonster(engine.monsters, i) for i in range(len(engine.monsters))]
+        else:
+            monsters = engine.monsters
+        foes = [[m.hp if m.is_alive else 0, m.max_hp, m.mp, m.attack_stat, m.defense_stat,
+                 _evade_chance(m.evasion_stat), m.kind == BossMonster.kind]
+                for m in monsters]
+        # item_id -> (jumlah, heal_amount, mp_restore, ramuan kebangkitan?)
+        potions = {}
+        party = engine.party
+        for item, qty in party.inventory_items():
+            if item.item_type == ITEM_TYPE_POTION:
+                potions[item.item_id] = (qty, item.heal_amount, item.mp_restore, item.item_id == REVIVE_POTION.item_id)
+        return cls(players, foes, potions, engine.current_player_index)
+
+
+class AutoBattlePlanner:
+    def __init__(self, budget_ms=100, max_rollouts=None, seed=None):
+        self.budget_ms = budget_ms
+        self.max_rollouts = max_rollouts
+        self.rng = random.Random(seed)
+        # Statistik keputusan terakhir: jumlah rollout dan (aksi, kunjungan, nilai rata-rata)
+        self.last_rollouts = 0
+        self.last_stats = []
+
+    def candidate_actions(self, snapshot):
+        """Daftar (aksi, target) yang masuk akal untuk anggota yang sedang bergiliran."""
+        player = snapshot.players[snapshot.current]
+        living = sorted((m[M_HP], i) for i, m in enumerate(snapshot.monsters) if m[M_HP] > 0)
+        targets = [i for _, i in living[:MAX_TARGET_CANDIDATES]]
+        actions = [(ACTION_ATTACK, i) for i in targets]
+        if player[P_MP] >= player[P_SPECIAL_COST]:
+            actions += [(ACTION_SPECIAL, i) for i in targets]
+        actions.append((ACTION_DEFEND, None))
+        for item_id, (qty, heal, mp_restore, revive) in snapshot.potions.items():
+            if qty <= 0:
+                continue
+            for j, member in enumerate(snapshot.players):
+                alive = member[P_HP] > 0
+                if revive and not alive:
+                    actions.append((ACTION_POTION, (item_id, j)))
+                elif alive and ((heal > 0 and member[P_HP] < member[P_MAX_HP]) or
+                                (mp_restore > 0 and member[P_MP] < member[P_MAX_MP])):
+                    actions.append((ACTION_POTION, (item_id, j)))
+        return actions
+
+    def decide(self, snapshot):
+        """Aksi terbaik (aksi, target) dalam anggaran; selalu mencoba setiap kandidat sekali."""
+        actions = self.candidate_actions(snapshot)
+        if len(actions) == 1:
+            self.last_rollouts = 0
+            self.last_stats = [(actions[0], 0, 0.0)]
+            return actions[0]
+        visits = [0] * len(actions)
+        totals = [0.0] * len(actions)
+        deadline = None if self.budget_ms is None else time.perf_counter() + self.budget_ms / 1000
+        rollouts = 0
+        while True:
+            if rollouts < len(actions):
+                arm = rollouts
+            else:
+                if self.max_rollouts is not None and rollouts >= self.max_rollouts:
+                    break
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                log_n = math.log(rollouts)
+                arm = max(range(len(actions)),
+                          key=lambda a: totals[a] / visits[a] + UCB_EXPLORATION * math.sqrt(log_n / visits[a]))
+            totals[arm] += self.rollout(snapshot, actions[arm])
+            visits[arm] += 1
+            rollouts += 1
+        self.last_rollouts = rollouts
+        self.last_stats = [(action, visits[a], totals[a] / visits[a]) for a, action in enumerate(actions)]
+        best = max(range(len(actions)), key=lambda a: (visits[a], totals[a] / visits[a]))
+        return actions[best]
+
+    def rollout(self, snapshot, action):
+        """Satu simulasi acak dari aksi ini sampai pertarungan selesai; nilai dalam [0, 1]."""
+        rng = self.rng
+        players = [p[:] for p in snapshot.players]
+        monsters = [m[:] for m in snapshot.monsters]
+        current = snapshot.current
+        penalty = 0.0
+
+        kind, target = action
+        if kind == ACTION_POTION:
+            item_id, member = target
+            _, heal, mp_restore, revive = snapshot.potions[item_id]
+            self._apply_potion(players[member], heal, mp_restore, revive)
+            penalty = POTION_COST
+        elif kind != ACTION_DEFEND:
+            self._player_attack(rng, players[current], monsters, target, kind == ACTION_SPECIAL)
+
+        for _ in range(ROLLOUT_ROUNDS):
+            for index in range(current + 1, len(players)):
+                if not any(m[M_HP] > 0 for m in monsters):
+                    break
+                player = players[index]
+                if player[P_HP] > 0:
+                    self._player_attack(rng, player, monsters, self._rollout_target(monsters),
+                                        player[P_MP] >= player[P_SPECIAL_COST])
+            if not any(m[M_HP] > 0 for m in monsters):
+                return self._value(players, True) - penalty
+            self._monster_turn(rng, players, monsters)
+            if not any(p[P_HP] > 0 for p in players):
+                return 0.0
+            current = -1
+        return self._value(players, None, monsters) - penalty
+
+    @staticmethod
+    def _apply_potion(player, heal, mp_restore, revive):
+        if revive and player[P_HP] <= 0:
+            player[P_HP] = player[P_MAX_HP] // 2
+            player[P_MP] = player[P_MAX_MP] // 2
+            return
+        if heal > 0 and player[P_HP] > 0:
+            player[P_HP] = min(player[P_MAX_HP], player[P_HP] + heal)
+        if mp_restore > 0:
+            player[P_MP] = min(player[P_MAX_MP], player[P_MP] + mp_restore)
+
+    # Kebijakan rollout: pukul monster dengan HP terendah
+    @staticmethod
+    def _rollout_target(monsters):
+        best = None
+        for i, monster in enumerate(monsters):
+            if monster[M_HP] > 0 and (best is None or monster[M_HP] < monsters[best][M_HP]):
+                best = i
+        return best
+
+    @staticmethod
+    def _player_attack(rng, player, monsters, target, special):
+        monster = monsters[target]
+        if special:
+            player[P_MP] -= player[P_SPECIAL_COST]
+            if rng.random() < monster[M_EVADE]:
+                return
+            damage = max(1, player[P_ATTACK] * player[P_SPECIAL_MULT] - monster[M_DEFENSE])
+        else:
+            if rng.random() < monster[M_EVADE]:
+                return
+            damage = max(1, player[P_ATTACK] - monster[M_DEFENSE])
+            if rng.random() < PLAYER_CRIT_CHANCE:
+                damage = int(damage * player[P_CRIT])
+        monster[M_HP] -= damage
+        if monster[M_HP] <= 0:
+            monster[M_HP] = 0
+            player[P_HP] = min(player[P_MAX_HP], player[P_HP] + KILL_HEAL)
+            player[P_MP] = min(player[P_MAX_MP], player[P_MP] + KILL_MP)
+
+    # Model giliran monster sama dengan RandomMonsterAI: target acak, spesial 20%
+    @staticmethod
+    def _monster_turn(rng, players, monsters):
+        for monster in monsters:
+            if monster[M_HP] <= 0:
+                continue
+            living = [p for p in players if p[P_HP] > 0]
+            if not living:
+                return
+            player = living[int(rng.random() * len(living))]
+            attack = monster[M_ATTACK]
+            if rng.random() < MONSTER_SPECIAL_ROLL:
+                if monster[M_BOSS]:
+                    if monster[M_MP] >= 20:
+                        monster[M_MP] -= 20
+                        player[P_HP] -= max(1, attack * 3 - player[P_DEFENSE])
+                        player[P_HP] = max(0, player[P_HP])
+                        continue
+                elif rng.random() <= MONSTER_SPECIAL_CHANCE:
+                    attack = int(attack * 1.5)
+            if rng.random() < player[P_EVADE]:
+                continue
+            player[P_HP] = max(0, player[P_HP] - max(1, attack - player[P_DEFENSE]))
+
+    # Menang: 0.6 + sisa HP party; belum selesai: selisih HP party dan monster
+    @staticmethod
+    def _value(players, won, monsters=None):
+        party_hp = sum(p[P_HP] / p[P_MAX_HP] for p in players) / len(players)
+        if won:
+            return 0.6 + 0.4 * party_hp
+        monster_hp = sum(m[M_HP] / m[M_MAX_HP] for m in monsters) / len(monsters)
+        return 0.3 * (1 + party_hp - monster_hp)
+
+    def policy(self, engine, player):
+        """
+        Kebijakan untuk BattleEngine.play_battle. Ramuan langsung dipakai di
+        sini dan giliran diteruskan sebagai bertahan.
+        """
+        action, target = self.decide(BattleSnapshot.from_engine(engine))
+        if action == ACTION_POTION:
+            item_id, member = target
+            party = engine.party
+            item = party.catalog[item_id]
+            if party.members[member].use_potion(item, party=party).ok:
+                party.remove_item(item, 1)
+            return ACTION_DEFEND, None
+        if target is None:
+            return action, None
+        if isinstance(engine.monsters, MonsterPool):
+            return action, PooledMonster(engine.monsters, target)
+        return action, engine.monsters[target]
+
+
+class AutoBattleWorker:
+    """
+    Menjalankan AutoBattlePlanner di thread latar. submit(token, snapshot)
+    mengantrekan permintaan; poll() mengembalikan (token, keputusan) yang
+    sudah selesai tanpa memblokir, atau None. Token dipakai UI untuk
+    membuang keputusan yang sudah basi (misalnya setelah reset).
+    """
+    def __init__(self, planner):
+        self.planner = planner
+        self.requests = queue.Queue()
+        self.decisions = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="auto-battle", daemon=True)
+        self._thread.start()
+
+    def submit(self, token, snapshot):
+        self.requests.put((token, snapshot))
+
+    def poll(self):
+        try:
+            return self.decisions.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            token, snapshot = request
+            self.decisions.put((token, self.planner.decide(snapshot)))
+
+    def stop(self):
+        self.requests.put(None)
@@ -0,0 +1,262 @@
+"""
+Simulator Monte Carlo berbasis NumPy untuk kurva kesulitan per tahap.
+
+Semua pertarungan (N pertarungan x jumlah tahap) dimainkan sekaligus sebagai
+array: HP, MP, serangan, pertahanan, hindaran, XP, dan status hidup untuk
+setiap anggota party dan setiap monster. Aturannya mengikuti game_logic:
+serangan Player.attack (kritis 20%), Monster.special_attack (25%), serangan
+spesial boss, serta pemilihan target acak BattleEngine.execute_monster_turn.
+Statistik awal monster dibaca langsung dari create_stage_monsters, sehingga
+perubahan kurva monster di content/default.json langsung terlihat.
+
+Contoh:
+    python balance_sim.py --stages 1-9 --battles 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from game_logic import BossMonster, create_default_party, create_stage_monsters
+
+# Jumlah slot monster maksimum dalam satu pertarungan
+MAX_MONSTERS = 2
+
+
+# Party dengan XP yang kira-kira dimiliki saat mencapai tahap tertentu
+def party_for_stage(stage):
+    party = create_default_party()
+    xp = sum(50 * s for s in range(1, stage))
+    for member in party.members:
+        member.gain_xp(xp)
+    return party
+
+
+# Membuat template statistik awal (satu baris per tahap)
+def _build_templates(stages, party_factory):
+    parties = [party_factory(stage) for stage in stages]
+    member_count = max(len(p.members) for p in parties)
+    shape_p = (len(stages), member_count)
+    shape_m = (len(stages), MAX_MONSTERS)
+
+    tpl = {
+        "p_hp": np.zeros(shape_p, np.int64),
+        "p_max_hp": np.ones(shape_p, np.int64),
+        "p_mp": np.zeros(shape_p, np.int64),
+        "p_max_mp": np.zeros(shape_p, np.int64),
+        "p_atk": np.zeros(shape_p, np.int64),
+        "p_def": np.zeros(shape_p, np.int64),
+        "p_eva": np.zeros(shape_p, np.int64),
+        "p_crit": np.zeros(shape_p, np.float64),
+        "p_xp": np.zeros(shape_p, np.int64),
+        "p_alive": np.zeros(shape_p, bool),
+        "m_hp": np.zeros(shape_m, np.int64),
+        "m_mp": np.zeros(shape_m, np.int64),
+        "m_atk": np.zeros(shape_m, np.int64),
+        "m_def": np.zeros(shape_m, np.int64),
+        "m_eva": np.zeros(shape_m, np.int64),
+        "m_boss": np.zeros(shape_m, bool),
+        "m_alive": np.zeros(shape_m, bool),
+    }
+    for s, (stage, party) in enumerate(zip(stages, parties)):
+        for i, p in enumerate(party.members):
+            tpl["p_hp"][s, i] = p.hp
+            tpl["p_max_hp"][s, i] = p.max_hp
+            tpl["p_mp"][s, i] = p.mp
+            tpl["p_max_mp"][s, i] = p.max_mp
+            tpl["p_atk"][s, i] = p.attack_stat
+            tpl["p_def"][s, i] = p.defense_stat
+            tpl["p_eva"][s, i] = p.evasion_stat
+            tpl["p_crit"][s, i] = p.total_critical_damage_bonus()
+            tpl["p_xp"][s, i] = p.xp
+            tpl["p_alive"][s, i] = p.is_alive
+        monsters = create_stage_monsters(stage)
+        if len(monsters) > MAX_MONSTERS:
+            raise ValueError(f"Tahap {stage} memiliki lebih dari {MAX_MONSTERS} monster.")
+        for j, m in enumerate(monsters):
+            tpl["m_hp"][s, j] = m.hp
+            tpl["m_mp"][s, j] = m.mp
+            tpl["m_atk"][s, j] = m.attack_stat
+            tpl["m_def"][s, j] = m.defense_stat
+            tpl["m_eva"][s, j] = m.evasion_stat
+            tpl["m_boss"][s, j] = isinstance(m, BossMonster)
+            tpl["m_alive"][s, j] = True
+    return tpl
+
+
+# Gain_xp(50) saat membunuh monster, termasuk kenaikan level
+def _apply_kill_rewards(st, rows, p):
+    alive = st["p_alive"][rows, p]
+    max_hp = st["p_max_hp"][rows, p]
+    st["p_hp"][rows, p] = np.where(alive, np.minimum(max_hp, st["p_hp"][rows, p] + 50), st["p_hp"][rows, p])
+    st["p_mp"][rows, p] = np.minimum(st["p_max_mp"][rows, p], st["p_mp"][rows, p] + 30)
+
+    xp = st["p_xp"][rows, p] + 50
+    level_up = xp >= 100
+    st["p_xp"][rows, p] = np.where(level_up, xp - 100, xp)
+    lv = rows[level_up]
+    if lv.size:
+        st["p_max_hp"][lv, p] += 10
+        st["p_hp"][lv, p] = np.where(st["p_alive"][lv, p],
+                                     np.minimum(st["p_max_hp"][lv, p], st["p_hp"][lv, p] + 10),
+                                     st["p_hp"][lv, p])
+        st["p_max_mp"][lv, p] += 10
+        st["p_mp"][lv, p] = np.minimum(st["p_max_mp"][lv, p], st["p_mp"][lv, p] + 10)
+        st["p_atk"][lv, p] += 5
+        st["p_def"][lv, p] += 5
+        st["p_eva"][lv, p] = np.minimum(100, st["p_eva"][lv, p] + 5)
+
+
+# Giliran pemain ke-p: serang monster hidup pertama (default_battle_policy)
+def _player_turn(st, rng, p):
+    rows = np.nonzero(st["p_alive"][:, p] & st["m_alive"].any(axis=1))[0]
+    if not rows.size:
+        return
+    t = st["m_alive"][rows].argmax(axis=1)
+    n = rows.size
+
+    hit = rng.integers(1, 101, n) > st["m_eva"][rows, t]
+    damage = np.maximum(1, st["p_atk"][rows, p] - st["m_def"][rows, t])
+    crit = rng.random(n) < 0.2
+    crit_damage = (damage * (2 + st["p_crit"][rows, p] / 100)).astype(np.int64)
+    damage = np.where(crit, crit_damage, damage)
+    damage = np.where(hit, damage, 0)
+
+    hp = st["m_hp"][rows, t] - damage
+    killed = hp <= 0
+    st["m_hp"][rows, t] = np.maximum(hp, 0)
+    st["m_alive"][rows[killed], t[killed]] = False
+    if killed.any():
+        _apply_kill_rewards(st, rows[killed], p)
+
+
+# Giliran monster ke-m: target acak, 20% mencoba serangan spesial
+def _monster_turn(st, rng, m):
+    rows = np.nonzero(st["m_alive"][:, m] & st["p_alive"].any(axis=1))[0]
+    if not rows.size:
+        return
+    n = rows.size
+    alive = st["p_alive"][rows]
+    pick = (rng.random(n) * alive.sum(axis=1)).astype(np.int64)
+    target = (alive.cumsum(axis=1) > pick[:, None]).argmax(axis=1)
+
+    use_special = rng.random(n) < 0.2
+    boss = st["m_boss"][rows, m]
+    boss_special = use_special & boss & (st["m_mp"][rows, m] >= 20)
+    monster_special = use_special & ~boss & (rng.random(n) <= 0.25)
+
+    atk = st["m_atk"][rows, m]
+    defense = st["p_def"][rows, target]
+    damage = np.maximum(1, atk - defense)
+    damage = np.where(monster_special, np.maximum(1, (atk * 1.5).astype(np.int64) - defense), damage)
+    damage = np.where(boss_special, np.maximum(1, atk * 3 - defense), damage)
+    st["m_mp"][rows[boss_special], m] -= 20
+
+    # Serangan spesial boss tidak bisa dihindari
+    evaded = (rng.integers(1, 101, n) <= st["p_eva"][rows, target]) & ~boss_special
+    damage = np.where(evaded, 0, damage)
+
+    hp = st["p_hp"][rows, target] - damage
+    died = hp <= 0
+    st["p_hp"][rows, target] = np.maximum(hp, 0)
+    st["p_alive"][rows[died], target[died]] = False
+
+
+# Memainkan satu potongan pertarungan sampai semuanya selesai
+def _simulate_chunk(tpl, stage_idx, rng, max_rounds):
+    st = {k: v[stage_idx].copy() for k, v in tpl.items()}
+    ids = np.arange(stage_idx.size)
+    won = np.zeros(stage_idx.size, bool)
+    turns = np.full(stage_idx.size, max_rounds, np.int64)
+    hp_left = np.zeros(stage_idx.size, np.int64)
+    member_count = tpl["p_hp"].shape[1]
+
+    for rnd in range(1, max_rounds + 1):
+        for p in range(member_count):
+            _player_turn(st, rng, p)
+        cleared = ~st["m_alive"].any(axis=1)
+        for m in range(MAX_MONSTERS):
+            _monster_turn(st, rng, m)
+        wiped = ~st["p_alive"].any(axis=1) & ~cleared
+
+        done = cleared | wiped
+        if done.any():
+            done_ids = ids[done]
+            won[done_ids] = cleared[done]
+            turns[done_ids] = rnd
+            hp_left[done_ids] = st["p_hp"][done].sum(axis=1)
+            keep = ~done
+            st = {k: v[keep] for k, v in st.items()}
+            ids = ids[keep]
+            if not ids.size:
+                break
+    return won, turns, hp_left
+
+
+def simulate_stages(stages, battles_per_stage, party_factory=None, seed=None,
+                    max_rounds=500, chunk_size=200000):
+    """
+    Memainkan battles_per_stage pertarungan untuk setiap tahap dan
+    mengembalikan satu dict per tahap berisi win_rate, avg_turns dan
+    avg_hp_left (dua nilai terakhir dihitung dari pertarungan yang menang).
+    Pertarungan yang melewati max_rounds dihitung kalah.
+    """
+    stages = list(stages)
+    party_factory = party_factory or party_for_stage
+    tpl = _build_templates(stages, party_factory)
+    rng = np.random.default_rng(seed)
+
+    all_stage_idx = np.repeat(np.arange(len(stages)), battles_per_stage)
+    won = np.empty(all_stage_idx.size, bool)
+    turns = np.empty(all_stage_idx.size, np.int64)
+    hp_left = np.empty(all_stage_idx.size, np.int64)
+    for start in range(0, all_stage_idx.size, chunk_size):
+        part = slice(start, start + chunk_size)
+        won[part], turns[part], hp_left[part] = _simulate_chunk(tpl, all_stage_idx[part], rng, max_rounds)
+
+    report = []
+    for s, stage in enumerate(stages):
+        mask = all_stage_idx == s
+        wins = won[mask]
+        win_count = int(wins.sum())
+        report.append({
+            "stage": stage,
+            "battles": int(mask.sum()),
+            "win_rate": win_count / max(1, mask.sum()),
+            "avg_turns": float(turns[mask][wins].mean()) if win_count else 0.0,
+            "avg_hp_left": float(hp_left[mask][wins].mean()) if win_count else 0.0,
+        })
+    return report
+
+
+def format_report(report):
+    lines = [f"{'Tahap':>5} {'Menang':>8} {'Giliran':>8} {'Sisa HP':>8}"]
+    for row in report:
+        lines.append(f"{row['stage']:>5} {row['win_rate']:>8.1%} {row['avg_turns']:>8.2f} {row['avg_hp_left']:>8.1f}")
+    return "\n".join(lines)
+
+
+def _parse_stages(text):
+    if "-" in text:
+        first, last = text.split("-")
+        return range(int(first), int(last) + 1)
+    return [int(s) for s in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulasi keseimbangan tahap berbasis NumPy.")
+    parser.add_argument("--stages", default="1-12", help="contoh: 1-12 atau 1,3,6")
+    parser.add_argument("--battles", type=int, default=100000, help="jumlah pertarungan per tahap")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    stages = _parse_stages(args.stages)
+    start = time.perf_counter()
+    report = simulate_stages(stages, args.battles, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(format_report(report))
+    print(f"{args.battles * len(stages)} pertarungan dalam {elapsed:.2f} detik")
+
+
+if __name__ == "__main__":
+    main()
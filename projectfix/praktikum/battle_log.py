@@ -0,0 +1,99 @@
+"""
+Log pertarungan terstruktur dalam format JSON Lines.
+
+BattleLog dipasang sebagai handler peristiwa BattleEngine:
+
+    log = BattleLog("pertarungan.jsonl", max_bytes=1_000_000)
+    engine.set_event_handler(log)
+
+Setiap peristiwa hanya disimpan sebagai tuple di buffer (nama karakter
+diambil saat itu juga); serialisasi JSON dan penulisan ke berkas dilakukan
+sekaligus per batch saat buffer penuh, saat flush_interval terlewati, atau
+saat flush()/close() dipanggil. Berkas hanya ditambah (append); jika
+max_bytes diisi, berkas dirotasi menjadi path.1, path.2, ... seperti
+RotatingFileHandler milik logging.
+
+Satu baris per peristiwa, misalnya:
+    {"event": "damage", "seq": 12, "target": "Monster 1", "amount": 23, "hp": 7}
+"""
+import json
+import os
+import time
+
+from game_logic import Character, EVENT_FIELDS
+
+
+class BattleLog:
+    def __init__(self, path, flush_every=256, flush_interval=1.0, max_bytes=0, backup_count=3):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.seq = 0
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._file = None
+
+    # Dipanggil oleh engine/karakter sebagai on_event(kind, fields)
+    def __call__(self, kind, fields):
+        self.append(kind, fields)
+
+    def append(self, kind, fields):
+        self.seq += 1
+        fields = tuple(f.name if isinstance(f, Character) else f for f in fields)
+        self._buffer.append((self.seq, kind, fields))
+        if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def pending_count(self):
+        return len(self._buffer)
+
+    # Mengubah satu peristiwa menjadi satu baris JSON
+    @staticmethod
+    def format_event(seq, kind, fields):
+        record = {"event": kind, "seq": seq}
+        record.update(zip(EVENT_FIELDS.get(kind, ()), fields))
+        return json.dumps(record, ensure_ascii=False)
+
+    # Menulis seluruh buffer ke berkas dalam satu kali write
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        buffer, self._buffer = self._buffer, []
+        data = "".join(self.format_event(*event) + "\n" for event in buffer)
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        if self.max_bytes and self._file.tell() > 0 and self._file.tell() + len(data) > self.max_bytes:
+            self.rotate()
+        self._file.write(data)
+        self._file.flush()
+
+    # path -> path.1 -> path.2 ...; berkas tertua (path.backup_count) dibuang
+    def rotate(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{i}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{i + 1}")
+            if os.path.exists(self.path):
+                os.replace(self.path, f"{self.path}.1")
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
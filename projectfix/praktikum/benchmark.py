@@ -0,0 +1,609 @@
+"""
+Micro-benchmark untuk bagian game_logic yang sering dipanggil simulasi.
+
+Contoh:
+    python benchmark.py
+    python benchmark.py --ui    # butuh display untuk Tk
+"""
+import argparse
+import json
+import time
+import timeit
+import tracemalloc
+from collections import Counter
+
+from game_logic import (
+    BattleEngine, ITEM_CATALOG, GameRNG, IRON_SWORD, CHAINMAIL_ARMOR, CRIT_RING, ITEM_TYPE_EQUIPMENT, SHOP_ITEMS, Item, ItemCatalog, LootTable, Monster,
+    Party, Player, loot_table, HEALTH_POTION, PHASE_LOST, PHASE_MONSTER, PHASE_WON, default_battle_policy,
+    RandomMonsterAI, REVIVE_POTION
+)
+from inventory_view import InventoryIndex, format_inventory_row
+from savegame import SaveError, decode, encode, restore, snapshot
+from battle_log import BattleLog
+from monster_ai import ExpectimaxMonsterAI
+from auto_battle import AutoBattlePlanner, AutoBattleWorker, BattleSnapshot
+from encounter_oracle import EncounterOracle, campaign_snapshot, monte_carlo
+from loadout import DEFAULT_BUDGET_MS, OBJECTIVE_DAMAGE, OBJECTIVE_SURVIVAL, LoadoutSolver, random_equipment
+from shop_planner import ShopPlanner
+from replay import (
+    GameSession, monster_index, verify, COMMAND_BUY, COMMAND_END_BATTLE, COMMAND_MONSTER_TURN,
+    COMMAND_PLAYER_TURN, COMMAND_RESET, COMMAND_START_STAGE, COMMAND_UPGRADE, COMMAND_USE_ITEM
+)
+
+
+# Hero berperlengkapan lengkap melawan monster yang tidak bisa mati
+def _attack_setup():
+    rng = GameRNG(1)
+    party = Party()
+    hero = Player(rng=rng.spawn("hero"))
+    for item in (IRON_SWORD, CHAINMAIL_ARMOR, CRIT_RING):
+        party.add_item(item)
+        hero.equip_item(item, party)
+    monster = Monster("Target", stage=5, rng=rng.spawn("monster"))
+    monster._max_hp = monster._hp = 10 ** 12
+    return hero, monster
+
+
+# Biaya per Player.attack dengan statistik tersimpan vs dihitung ulang tiap serangan
+def bench_attack(number=200000):
+    hero, monster = _attack_setup()
+
+    def cached():
+        hero.attack(monster)
+
+    def uncached():
+        hero.invalidate_stats()
+        monster.invalidate_stats()
+        hero.attack(monster)
+
+    return {
+        "attack (cache)": min(timeit.repeat(cached, number=number, repeat=3)) / number,
+        "attack (tanpa cache)": min(timeit.repeat(uncached, number=number, repeat=3)) / number,
+    }
+
+
+# Padanan Monster tanpa __slots__: atribut yang sama disimpan di __dict__ per instance,
+# perlengkapan sebagai dict {slot: item} seperti sebelum EquipmentSlots
+class _DictMonster:
+    def __init__(self, monster):
+        for cls in type(monster).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                setattr(self, name, getattr(monster, name))
+        self.equipped_items = dict(monster.equipped_items.items())
+
+
+def _traced_bytes(make, count):
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        objects = [make() for _ in range(count)]
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objects
+    return (end - start) / count
+
+
+# Rata-rata byte yang dialokasikan per objek Monster (tracemalloc): dengan __slots__ dan padanan berbasis dict
+def bench_monster_memory(count=10000):
+    rng = GameRNG(1)
+    slotted = _traced_bytes(lambda: Monster("Monster #1", stage=5, rng=rng), count)
+    template = Monster("Monster #1", stage=5, rng=rng)
+    dict_based = _traced_bytes(lambda: _DictMonster(template), count)
+    return slotted, dict_based
+
+
+# Perubahan satu jumlah item: indeks + satu baris vs memformat ulang seluruh daftar
+def bench_inventory_update(distinct_items=5000, number=2000):
+    party = Party(catalog=ItemCatalog())
+    for i in range(distinct_items):
+        party.add_item(Item(f"Item {i:05d}", ITEM_TYPE_EQUIPMENT, stat_bonus={"attack": i % 50}, price=i), 1)
+    index = InventoryIndex(party.inventory, party.catalog)
+    items = [party.catalog[item_id] for item_id in index.rows]
+
+    def indexed():
+        for item in items[:number]:
+            party.add_item(item, 1)
+            index.update(item, party.quantity(item))
+            format_inventory_row(item, party.quantity(item))
+
+    def full_refresh():
+        party.add_item(items[0], 1)
+        [format_inventory_row(item, qty) for item, qty in party.inventory_items()]
+
+    return {
+        "ubah item (indeks)": min(timeit.repeat(indexed, number=1, repeat=3)) / number,
+        "ubah item (isi ulang)": min(timeit.repeat(full_refresh, number=20, repeat=3)) / 20,
+    }
+
+
+# Nilai kritis chi-kuadrat (aproksimasi Wilson-Hilferty), z = 3.09 untuk p = 0.001
+def _chi2_critical(dof, z=3.09):
+    return dof * (1 - 2 / (9 * dof) + z * (2 / (9 * dof)) ** 0.5) ** 3
+
+
+def _chi2(observed, weights):
+    total = sum(observed.values())
+    weight_sum = sum(weights.values())
+    return sum((observed.get(key, 0) - total * w / weight_sum) ** 2 / (total * w / weight_sum)
+               for key, w in weights.items())
+
+
+def check_loot_distribution(draws=200000, seed=1):
+    """
+    Uji chi-kuadrat frekuensi undian tabel alias terhadap bobotnya (tabel
+    konten bawaan, tabel berbobot buatan, dan undian per kelangkaan).
+    Mengembalikan list (nama, chi2, nilai_kritis).
+    """
+    rng = GameRNG(seed)
+    weighted = LootTable(1, 0, SHOP_ITEMS[:5], weights=[50, 30, 15, 4, 1])
+    cases = [
+        ("regular draw", loot_table("regular", 1), lambda t: [t.draw(rng) for _ in range(draws)]),
+        ("boss draw_many", loot_table("boss", 1), lambda t: t.draw_many(rng, draws)),
+        ("berbobot draw", weighted, lambda t: [t.draw(rng) for _ in range(draws)]),
+        ("berbobot draw_many", weighted, lambda t: t.draw_many(rng, draws)),
+    ]
+    results = []
+    for name, table, sample in cases:
+        expected = {}
+        for item, weight in zip(table.items, table.weights):
+            expected[item] = expected.get(item, 0) + weight
+        observed = Counter(sample(table))
+        results.append((name, _chi2(observed, expected), _chi2_critical(len(expected) - 1)))
+
+    table = loot_table("regular", 1)
+    for rarity in table.rarity_tiers():
+        expected = {item: w for item, w, r in zip(table.items, table.weights, table.rarities) if r == rarity}
+        if len(expected) < 2:
+            continue
+        observed = Counter(table.draw_rarity(rng, rarity) for _ in range(draws))
+        results.append((f"kelangkaan {rarity}", _chi2(observed, expected), _chi2_critical(len(expected) - 1)))
+    return results
+
+
+# Biaya per undian loot: draw satu per satu vs draw_many
+def bench_loot_draw(number=200000):
+    rng = GameRNG(1)
+    table = loot_table("boss", 1)
+    return {
+        "loot draw": min(timeit.repeat(lambda: table.draw(rng), number=number, repeat=3)) / number,
+        "loot draw_many": min(timeit.repeat(lambda: table.draw_many(rng, number), number=1, repeat=3)) / number,
+    }
+
+
+# Simpan/muat party tahap akhir (level tinggi, semua item di inventaris, perlengkapan penuh)
+def bench_save_load(number=2000):
+    engine = BattleEngine(rng=GameRNG(1), stage=60)
+    party = engine.party
+    for item in ITEM_CATALOG:
+        party.add_item(item, 99)
+    for member in party.members:
+        member.gain_xp(20000)
+        for item in (IRON_SWORD, CHAINMAIL_ARMOR, CRIT_RING):
+            member.equip_item(item, party)
+    raw = encode(snapshot(engine))
+    return {
+        "simpan": min(timeit.repeat(lambda: encode(snapshot(engine)), number=number, repeat=3)) / number,
+        "muat": min(timeit.repeat(lambda: restore(decode(raw)), number=number, repeat=3)) / number,
+    }, len(raw)
+
+
+# Simpan/muat engine dengan seed turunan spawn (separuhnya >= 2^63); snapshot harus sama.
+# Engine ganjil juga membawa dan memakai item acak di luar paket konten.
+def check_save_roundtrip(count=20):
+    failures = []
+    large = 0
+    for key in range(count):
+        engine = BattleEngine(rng=GameRNG(0).spawn(f"run {key}"))
+        large += engine.rng.seed >= 2 ** 63
+        if key % 2:
+            party = engine.party
+            for item, quantity in random_equipment(5, seed=key):
+                party.add_item(item, quantity)
+            party.members[0].equip_item(party.inventory_items()[-1][0], party)
+        data = snapshot(engine)
+        try:
+            if snapshot(restore(decode(encode(data)))) != data:
+                failures.append(key)
+        except SaveError:
+            failures.append(key)
+    return count, large, failures
+
+
+# Biaya satu pertarungan penuh tanpa handler, dengan handler kosong, dan dengan BattleLog
+def bench_battle_events(battles=300):
+    import os
+    import tempfile
+
+    def run(handler):
+        engine = BattleEngine(rng=GameRNG(1))
+        engine.set_event_handler(handler)
+        start = time.perf_counter()
+        for _ in range(battles):
+            engine.reset_game()
+            engine.start_stage()
+            engine.end_battle(engine.play_battle())
+        return (time.perf_counter() - start) / battles
+
+    events = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "battle.jsonl")
+        with BattleLog(path, max_bytes=200_000) as log:
+            logged = run(log)
+            count = log.seq
+        size = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+    return {
+        "pertarungan (tanpa log)": run(None),
+        "pertarungan (handler kosong)": run(lambda kind, fields: events.append(kind)),
+        "pertarungan (BattleLog)": logged,
+    }, count / battles, size
+
+
+# Sesi otomatis seperti yang direkam UI: pertarungan, upgrade, beli dan pakai ramuan
+def record_autoplay_session(stages=100, seed=1, wave_size=0):
+    session = GameSession(BattleEngine(rng=GameRNG(seed), wave_size=wave_size))
+    engine = session.engine
+    session.run(COMMAND_START_STAGE)
+    played = 1
+    while played < stages:
+        if engine.phase == PHASE_MONSTER:
+            session.run(COMMAND_MONSTER_TURN)
+        elif engine.phase == PHASE_WON:
+            session.run(COMMAND_END_BATTLE, True)
+            party = engine.party
+            for i, member in enumerate(party.members):
+                if member.upgrade_points > 0:
+                    session.run(COMMAND_UPGRADE, i, "attack")
+            if party.gold >= HEALTH_POTION.price:
+                session.run(COMMAND_BUY, HEALTH_POTION.item_id)
+                weakest = min(range(len(party.members)), key=lambda i: party.members[i].hp)
+                session.run(COMMAND_USE_ITEM, HEALTH_POTION.item_id, weakest)
+            session.run(COMMAND_START_STAGE)
+            played += 1
+        elif engine.phase == PHASE_LOST:
+            session.run(COMMAND_RESET)
+            session.run(COMMAND_START_STAGE)
+            played += 1
+        else:
+            player = engine.next_player()
+            action, target = default_battle_policy(engine, player)
+            session.run(COMMAND_PLAYER_TURN, action, monster_index(engine, target))
+    return json.loads(json.dumps(session.recording()))
+
+
+def bench_replay(stages=100):
+    recording = record_autoplay_session(stages)
+    start = time.perf_counter()
+    differences = verify(recording)
+    return time.perf_counter() - start, len(recording["commands"]), differences
+
+
+# Pertarungan boss tahap 3 melawan party yang sudah naik level: latensi keputusan
+# AI expectimax per giliran monster dan peluang menang party dibanding AI acak
+def bench_monster_ai(battles=100, budget_ms=10, party_xp=400):
+    def play(monster_ai):
+        wins = 0
+        samples = []
+        for seed in range(battles):
+            engine = BattleEngine(rng=GameRNG(seed), stage=3, monster_ai=monster_ai)
+            for member in engine.party.members:
+                member.gain_xp(party_xp)
+            engine.start_stage()
+            while not engine.is_over():
+                if engine.phase == PHASE_MONSTER:
+                    start = time.perf_counter()
+                    engine.execute_monster_turn()
+                    samples.append(time.perf_counter() - start)
+                else:
+                    action, target = default_battle_policy(engine, engine.next_player())
+                    engine.execute_player_turn(action, target)
+            wins += engine.phase == PHASE_WON
+        samples.sort()
+        return wins / battles, samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+    ai = ExpectimaxMonsterAI(budget_ms=budget_ms, max_depth=12)
+    return {"acak": play(RandomMonsterAI()), f"expectimax {budget_ms} ms": play(ai)}, ai.table
+
+
+# Boss tahap 3 dengan 2 ramuan HP dan 1 ramuan kebangkitan: peluang menang
+# default_battle_policy vs planner otomatis, dan jeda terlama "loop UI" di
+# thread utama selama planner berpikir di AutoBattleWorker
+def bench_auto_battle(battles=50, party_xp=300, rollouts=300, budget_ms=100):
+    def win_rate(make_policy):
+        wins = 0
+        for seed in range(battles):
+            engine = BattleEngine(rng=GameRNG(seed), stage=3)
+            for member in engine.party.members:
+                member.gain_xp(party_xp)
+            engine.party.add_item(HEALTH_POTION, 2)
+            engine.party.add_item(REVIVE_POTION, 1)
+            engine.start_stage()
+            wins += engine.play_battle(make_policy())
+        return wins / battles
+
+    engine = BattleEngine(rng=GameRNG(1), stage=3)
+    engine.party.add_item(HEALTH_POTION, 2)
+    engine.start_stage()
+    worker = AutoBattleWorker(AutoBattlePlanner(budget_ms=budget_ms, seed=1))
+    start = time.perf_counter()
+    worker.submit(1, BattleSnapshot.from_engine(engine))
+    last = start
+    max_gap = 0.0
+    while worker.poll() is None:
+        time.sleep(0.001)
+        now = time.perf_counter()
+        max_gap = max(max_gap, now - last)
+        last = now
+    latency = time.perf_counter() - start
+    worker.stop()
+    return {
+        "default_battle_policy": win_rate(lambda: None),
+        f"otomatis ({rollouts} rollout)": win_rate(
+            lambda: AutoBattlePlanner(budget_ms=None, max_rollouts=rollouts, seed=1).policy),
+    }, latency, max_gap, worker.planner.last_rollouts
+
+
+# Peluang menang eksak EncounterOracle dibandingkan Monte Carlo, beserta waktu
+# hitung pertama dan pertanyaan ulang dari memo
+def bench_encounter_oracle(battles=2000):
+    cases = {
+        "tahap 1, HP rendah": (1, ({"hp": 30}, {"hp": 25})),
+        "boss tahap 3": (3, ({"attack": 45, "defense": 25, "max_hp": 160, "hp": 160, "xp": 60},
+                             {"attack": 30, "defense": 20, "xp": 90})),
+    }
+    results = {}
+    for name, (stage, changes) in cases.items():
+        data = snapshot(BattleEngine(rng=GameRNG(7), stage=stage))
+        for member, change in zip(data["members"], changes):
+            member.update(change)
+        engine = restore(data)
+        engine.start_stage()
+        oracle = EncounterOracle()
+        start = time.perf_counter()
+        odds = oracle.evaluate(engine)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        oracle.evaluate(engine)
+        cached = time.perf_counter() - start
+        rate = monte_carlo(data, battles)
+        probability = odds.win_probability
+        sigma = max((probability * (1 - probability) / battles) ** 0.5, 1e-12)
+        results[name] = (probability, rate, abs(rate - probability) / sigma, first, cached)
+    return results
+
+
+# Hitungan pertama EncounterOracle di awal tahap kampanye (oracle baru, terbaik dari repeats)
+def check_encounter_oracle_stages(stages=(1, 2), limit_ms=100, repeats=5):
+    results = {}
+    for stage in stages:
+        engine = restore(campaign_snapshot(stage))
+        engine.start_stage()
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            odds = EncounterOracle().evaluate(engine)
+            samples.append(time.perf_counter() - start)
+        best = min(samples)
+        results[stage] = (best, odds.states, best * 1e3 < limit_ms)
+    return results
+
+
+# Waktu ShopPlanner dan rata-rata tahap yang dilewati play_battle dengan/tanpa sarannya.
+# play_battle tidak memakai ramuan, jadi yang terukur di sini hanya efek perlengkapan.
+def bench_shop_planner(gold=1000, lookahead=5, seeds=200):
+    def stages_cleared(apply_plan):
+        total = 0
+        for seed in range(seeds):
+            engine = BattleEngine(rng=GameRNG(seed))
+            engine.party.gold = gold
+            if apply_plan:
+                for item, qty in plan.purchases.items():
+                    engine.party.spend_gold(item.price * qty)
+                    engine.party.add_item(item, qty)
+                for (_, changes), member in zip(plan.loadout, engine.party.members):
+                    for item in changes.values():
+                        member.equip_item(item, engine.party)
+            for _ in range(lookahead):
+                engine.start_stage()
+                if not engine.end_battle(engine.play_battle()):
+                    break
+                total += 1
+        return total / seeds
+
+    party = BattleEngine(rng=GameRNG(0)).party
+    party.gold = gold
+    planner = ShopPlanner(lookahead=lookahead)
+    samples = []
+    for _ in range(20):
+        start = time.perf_counter()
+        plan = planner.plan(party, 1)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2], samples[-1], plan, stages_cleared(False), stages_cleared(True)
+
+
+# Saran belanja untuk party dengan emas dan tahap berbeda: jumlah pembelian harus
+# bilangan bulat (tombol "Saran" memanggil range(jumlah))
+def check_shop_quantities(parties=60):
+    invalid = []
+    for seed in range(parties):
+        stage = 1 + seed % 6
+        engine = BattleEngine(rng=GameRNG(seed), stage=stage)
+        engine.party.gold = 200 + seed * 97
+        plan = ShopPlanner().plan(engine.party, stage)
+        if not isinstance(plan.cost, int) or any(not isinstance(qty, int) for qty in plan.purchases.values()):
+            invalid.append(seed)
+    return invalid
+
+
+# Waktu LoadoutSolver untuk inventaris count item perlengkapan acak per tujuan dan jumlah anggota
+# (anggota tambahan seperti loadout.py --members)
+def bench_loadout(count=300, repeats=5):
+    results = {}
+    for objective, members in ((OBJECTIVE_DAMAGE, 2), (OBJECTIVE_SURVIVAL, 2), (OBJECTIVE_SURVIVAL, 4)):
+        samples = []
+        for _ in range(repeats):
+            party = BattleEngine(rng=GameRNG(0)).party
+            for number in range(len(party.members), members):
+                party.add_member(Player(f"Hero {number + 1}"))
+            for item, qty in random_equipment(count):
+                party.add_item(item, qty)
+            start = time.perf_counter()
+            plan = LoadoutSolver(objective).solve(party, 1)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        results[(objective, members)] = (samples[len(samples) // 2], plan)
+    return results
+
+
+# Biaya menggambar ulang setelah setiap giliran, termasuk update_idletasks(): repaint penuh
+# seperti sebelum pelacakan widget kotor vs refresh_ui yang hanya memperbarui widget kotor.
+# Kedua mode memainkan giliran yang sama (seed sama, strategi default_battle_policy).
+def bench_ui_refresh(turns=500, seed=1):
+    import tkinter as tk
+    from tk_game_ui import RPGGameUI
+
+    root = tk.Tk()
+    try:
+        ui = RPGGameUI(root)
+        root.update()
+
+        def full_repaint():
+            # Lupakan teks dan status yang sudah tampil agar setiap widget benar-benar diset ulang
+            ui.shown_text.clear()
+            ui.monster_visible.clear()
+            ui.upgrade_buttons_state = None
+            ui.update_all_ui()
+
+        def measure(repaint):
+            ui.scheduler.cancel_all()
+            ui.session = GameSession(BattleEngine(rng=GameRNG(seed)))
+            session, engine = ui.session, ui.engine
+            session.run(COMMAND_START_STAGE)
+            ui.bind_model()
+            repaint()
+            root.update_idletasks()
+            samples = []
+            for _ in range(turns):
+                if engine.phase == PHASE_MONSTER:
+                    session.run(COMMAND_MONSTER_TURN)
+                elif engine.phase in (PHASE_WON, PHASE_LOST):
+                    if engine.phase == PHASE_WON:
+                        session.run(COMMAND_END_BATTLE, True)
+                    else:
+                        session.run(COMMAND_RESET)
+                    session.run(COMMAND_START_STAGE)
+                    ui.bind_model()
+                else:
+                    player = engine.next_player()
+                    action, target = default_battle_policy(engine, player)
+                    session.run(COMMAND_PLAYER_TURN, action, monster_index(engine, target))
+                start = time.perf_counter()
+                repaint()
+                root.update_idletasks()
+                samples.append(time.perf_counter() - start)
+            samples.sort()
+            return samples[len(samples) // 2], sum(samples) / len(samples)
+
+        return {"repaint penuh": measure(full_repaint), "refresh_ui": measure(ui.refresh_ui)}
+    finally:
+        root.destroy()
+
+
+# Latensi buka-sampai-interaktif jendela inventaris, toko, dan panel target
+def bench_popup_open(count=1000):
+    import tkinter as tk
+    from tk_game_ui import RPGGameUI
+
+    root = tk.Tk()
+    try:
+        ui = RPGGameUI(root)
+        root.update()
+        for _ in range(10):
+            ui.party.add_item(IRON_SWORD)
+
+        def measure(open_window, close_window):
+            samples = []
+            for _ in range(count):
+                start = time.perf_counter()
+                open_window()
+                root.update()
+                samples.append(time.perf_counter() - start)
+                close_window()
+                root.update()
+            samples.sort()
+            return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+        return {
+            "inventaris": measure(ui.open_inventory_window, ui.close_inventory_window),
+            "toko": measure(ui.open_shop_window, lambda: ui.close_popup_window(ui.shop_window)),
+            "panel target": measure(lambda: ui.choose_target(lambda target: None), ui.cancel_selection),
+        }
+    finally:
+        root.destroy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark game_logic.")
+    parser.add_argument("--ui", action="store_true", help="ukur juga latensi membuka jendela Tk dan biaya refresh UI per giliran")
+    args = parser.parse_args()
+
+    for name, seconds in bench_attack().items():
+        print(f"{name:<28} {seconds * 1e9:>10.0f} ns")
+    slotted, dict_based = bench_monster_memory()
+    print(f"{'byte per Monster (slots)':<28} {slotted:>10.0f} B")
+    print(f"{'byte per Monster (dict)':<28} {dict_based:>10.0f} B")
+    for name, seconds in bench_inventory_update().items():
+        print(f"{name:<28} {seconds * 1e9:>10.0f} ns")
+    for name, seconds in bench_loot_draw().items():
+        print(f"{name:<28} {seconds * 1e9:>10.0f} ns")
+    timings, size = bench_save_load()
+    for name, seconds in timings.items():
+        print(f"{name + f' ({size} B)':<28} {seconds * 1e9:>10.0f} ns")
+    count, large, failures = check_save_roundtrip()
+    status = "OK" if not failures else f"GAGAL {failures}"
+    print(f"{'simpan seed spawn':<28} {count - len(failures):>10}/{count}  ({large} seed >= 2^63) {status}")
+    timings, events_per_battle, size = bench_battle_events()
+    for name, seconds in timings.items():
+        print(f"{name:<28} {seconds * 1e6:>10.1f} us")
+    print(f"{'peristiwa per pertarungan':<28} {events_per_battle:>10.1f}    (log dirotasi {size} B)")
+    seconds, commands, differences = bench_replay()
+    status = "cocok" if not differences else f"{len(differences)} BEDA"
+    print(f"{'replay 100 tahap':<28} {seconds * 1e3:>10.1f} ms   ({commands} perintah, {status})")
+    results, table = bench_monster_ai()
+    for name, (win_rate, median, p99) in results.items():
+        print(f"{'AI boss ' + name:<28} {median * 1e3:>7.2f} ms (p99 {p99 * 1e3:.2f} ms), party menang {win_rate:.0%}")
+    print(f"{'tabel transposisi':<28} {len(table):>10} entri (hit {table.hits}, miss {table.misses})")
+    win_rates, latency, max_gap, rollouts = bench_auto_battle()
+    for name, rate in win_rates.items():
+        print(f"{'menang ' + name:<28} {rate:>10.0%}")
+    print(f"{'keputusan otomatis':<28} {latency * 1e3:>7.1f} ms ({rollouts} rollout, "
+          f"jeda loop utama maks {max_gap * 1e3:.1f} ms)")
+    for name, (probability, rate, z, first, cached) in bench_encounter_oracle().items():
+        print(f"{'peluang ' + name:<28} {probability:>10.1%}    (Monte Carlo {rate:.1%}, {z:.1f} sigma; "
+              f"{first * 1e3:.0f} ms, dari memo {cached * 1e6:.0f} us)")
+    for stage, (seconds, states, fast) in check_encounter_oracle_stages().items():
+        status = "OK" if fast else "GAGAL"
+        print(f"{'oracle tahap ' + str(stage):<28} {seconds * 1e3:>7.1f} ms ({states} keadaan, batas 100 ms) {status}")
+    median, worst, plan, before, after = bench_shop_planner()
+    print(f"{'saran belanja':<28} {median * 1e3:>7.2f} ms (maks {worst * 1e3:.2f} ms, {plan.combinations} kombinasi), "
+          f"tahap dilewati {before:.2f} -> {after:.2f}")
+    invalid = check_shop_quantities()
+    status = "OK" if not invalid else f"GAGAL (seed {invalid})"
+    print(f"{'jumlah beli bulat':<28} {60 - len(invalid):>10}/60  {status}")
+    for (objective, members), (median, plan) in bench_loadout().items():
+        status = "OK" if plan.exact else f"GAGAL (anggaran {DEFAULT_BUDGET_MS} ms habis)"
+        print(f"{'perlengkapan ' + objective:<28} {median * 1e3:>7.2f} ms (300 item, {members} anggota, "
+              f"{plan.explored} simpul, nilai {plan.baseline:.2f} -> {plan.value:.2f}) {status}")
+    for name, chi2, critical in check_loot_distribution():
+        status = "OK" if chi2 < critical else "GAGAL"
+        print(f"{'chi2 ' + name:<28} {chi2:>10.2f}    (kritis {critical:.2f}) {status}")
+    if args.ui:
+        for name, (median, p99) in bench_popup_open().items():
+            print(f"{'buka ' + name:<28} {median * 1e3:>7.2f} ms (p99 {p99 * 1e3:.2f} ms)")
+        for name, (median, mean) in bench_ui_refresh().items():
+            print(f"{'giliran ' + name:<28} {median * 1e6:>7.0f} us (rata-rata {mean * 1e6:.0f} us, 500 giliran)")
+
+
+if __name__ == "__main__":
+    main()
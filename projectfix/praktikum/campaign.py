@@ -0,0 +1,134 @@
+"""
+Simulasi kampanye penuh secara paralel.
+
+Setiap seed memainkan satu run tanpa UI: start_stage -> play_battle ->
+end_battle (gain_xp) -> belanja di toko -> tahap berikutnya, sampai party
+kalah (titik di mana UI memanggil reset_game) atau batas tahap tercapai.
+Seed dibagi ke semua core dengan ProcessPoolExecutor, lalu histogram tahap
+kekalahan setiap worker digabungkan. Hasilnya hanya bergantung pada daftar
+seed, bukan pada jumlah worker.
+
+Contoh:
+    python campaign.py --seeds 0-9999 --max-stages 60
+"""
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic import (
+    BattleEngine, GameRNG, ITEM_TYPE_EQUIPMENT, REVIVE_POTION, SHOP_ITEMS, get_item_slot
+)
+from monster_ai import MONSTER_AIS
+
+
+# Strategi belanja sederhana: hidupkan anggota yang mati, lalu beli
+# perlengkapan termahal yang terjangkau dan lebih baik dari slot saat ini
+def default_shop_policy(party):
+    for member in party.members:
+        if not member.is_alive and party.spend_gold(REVIVE_POTION.price):
+            member.use_potion(REVIVE_POTION, party=party)
+
+    equipment = sorted((item for item in SHOP_ITEMS if item.item_type == ITEM_TYPE_EQUIPMENT),
+                       key=lambda item: item.price, reverse=True)
+    for member in party.members:
+        for slot, current in member.equipped_items.items():
+            current_price = current.price if current else 0
+            for item in equipment:
+                if get_item_slot(item) != slot or item.price <= current_price:
+                    continue
+                if party.spend_gold(item.price):
+                    party.add_item(item, 1)
+                    member.equip_item(item, party)
+                    break
+
+
+def run_campaign(seed, max_stages=100, battle_policy=None, shop_policy=None, monster_ai=None):
+    """
+    Memainkan satu run untuk sebuah seed dan mengembalikan tahap tempat
+    party kalah, atau max_stages + 1 jika semua tahap dimenangkan.
+    """
+    shop_policy = shop_policy or default_shop_policy
+    engine = BattleEngine(rng=GameRNG(seed), monster_ai=monster_ai)
+    while engine.stage <= max_stages:
+        engine.start_stage()
+        if not engine.play_battle(battle_policy):
+            return engine.stage
+        engine.end_battle(won=True)
+        shop_policy(engine.party)
+    return engine.stage
+
+
+# Dijalankan di proses worker: histogram tahap kekalahan untuk sekumpulan seed.
+# AI monster dibuat baru per seed agar isi tabel transposisi tidak bergantung pada pembagian seed.
+def _run_seed_chunk(seeds, max_stages, monster_ai="random"):
+    return Counter(run_campaign(seed, max_stages, monster_ai=MONSTER_AIS[monster_ai]()) for seed in seeds)
+
+
+def run_campaigns(seeds, max_stages=100, workers=None, chunk_size=64, monster_ai="random"):
+    """
+    Menjalankan run_campaign untuk setiap seed di beberapa proses dan
+    mengembalikan Counter {tahap_kalah: jumlah_run}. monster_ai adalah nama
+    di monster_ai.MONSTER_AIS.
+    """
+    seeds = list(seeds)
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    histogram = Counter()
+    if workers == 1:
+        for chunk in chunks:
+            histogram.update(_run_seed_chunk(chunk, max_stages, monster_ai))
+        return histogram
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for partial in pool.map(_run_seed_chunk, chunks, [max_stages] * len(chunks), [monster_ai] * len(chunks)):
+            histogram.update(partial)
+    return histogram
+
+
+# Persentase run yang masih hidup ketika memasuki setiap tahap
+def survival_curve(histogram, max_stages):
+    total = sum(histogram.values())
+    remaining = total
+    curve = []
+    for stage in range(1, max_stages + 1):
+        curve.append((stage, histogram.get(stage, 0), remaining / total if total else 0.0))
+        remaining -= histogram.get(stage, 0)
+    return curve
+
+
+def format_histogram(histogram, max_stages):
+    lines = [f"{'Tahap':>5} {'Kalah':>8} {'Bertahan':>9}"]
+    for stage, lost, alive in survival_curve(histogram, max_stages):
+        if lost or alive:
+            lines.append(f"{stage:>5} {lost:>8} {alive:>9.1%}")
+    cleared = histogram.get(max_stages + 1, 0)
+    lines.append(f"Menyelesaikan {max_stages} tahap: {cleared}")
+    return "\n".join(lines)
+
+
+def _parse_seeds(text):
+    if "-" in text:
+        first, last = text.split("-")
+        return range(int(first), int(last) + 1)
+    return [int(s) for s in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulasi kampanye penuh secara paralel.")
+    parser.add_argument("--seeds", default="0-999", help="contoh: 0-999 atau 1,2,3")
+    parser.add_argument("--max-stages", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="default: semua core")
+    parser.add_argument("--monster-ai", choices=sorted(MONSTER_AIS), default="random")
+    args = parser.parse_args()
+
+    seeds = _parse_seeds(args.seeds)
+    start = time.perf_counter()
+    histogram = run_campaigns(seeds, args.max_stages, workers=args.workers, monster_ai=args.monster_ai)
+    elapsed = time.perf_counter() - start
+    print(format_histogram(histogram, args.max_stages))
+    print(f"{len(seeds)} run dalam {elapsed:.2f} detik")
+
+
+if __name__ == "__main__":
+    main()
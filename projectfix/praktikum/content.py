@@ -0,0 +1,152 @@
+"""
+Pemuat paket konten (item, toko, kurva statistik monster, tabel loot).
+
+Sumbernya berkas JSON. Hasil parse disimpan sebagai cache biner (marshal)
+di samping berkas sumber, sehingga peluncuran berikutnya tidak mem-parse
+JSON lagi selama ukuran dan waktu ubah sumber sama. Di dalam cache, setiap
+bagian tahap ("stages") disimpan terpisah dan baru dibaca saat tahap
+tersebut pertama kali dibutuhkan, sehingga paket konten besar tidak
+memperlambat peluncuran.
+
+Format sumber:
+    {"version": 1,
+     "items": [{"id", "name", "type", "stat_bonus", "heal_amount",
+                "mp_restore", "price", "description"}, ...],
+     "shop": [item_id, ...],
+     "stages": [{"first": 1, "last": null,
+                 "monsters": {jenis: {statistik: [dasar, per_tahap, batas?]}},
+                 "loot_tables": {jenis: {"chance", "extra_chance", "items"}}}]}
+Entri "items" tabel loot berupa item_id atau {"id", "weight", "rarity"}.
+"""
+import json
+import marshal
+import os
+from bisect import bisect_right
+
+CONTENT_FORMAT_VERSION = 1
+CACHE_MAGIC = b"RPGC"
+CACHE_SUFFIX = ".cache"
+
+DEFAULT_CONTENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content", "default.json")
+
+
+class ContentError(Exception):
+    pass
+
+
+class ContentPack:
+    """
+    Konten yang sudah dimuat. items dan shop tersedia langsung; bagian
+    tahap dimuat saat stage_section(stage) pertama kali memintanya.
+    """
+    def __init__(self, header, read_section):
+        self.items = header["items"]
+        self.shop = header["shop"]
+        self._ranges = header["ranges"]
+        self._firsts = [first for first, _ in self._ranges]
+        self._read_section = read_section
+        self._sections = {}
+
+    # Nomor bagian "stages" yang mencakup tahap ini
+    def section_index(self, stage):
+        i = bisect_right(self._firsts, stage) - 1
+        if i < 0:
+            raise ContentError(f"Tidak ada konten untuk tahap {stage}.")
+        first, last = self._ranges[i]
+        if last is not None and stage > last:
+            raise ContentError(f"Tidak ada konten untuk tahap {stage}.")
+        return i
+
+    # Bagian konten yang berlaku untuk tahap ini (dimuat sekali lalu disimpan)
+    def stage_section(self, stage):
+        i = self.section_index(stage)
+        section = self._sections.get(i)
+        if section is None:
+            section = self._sections[i] = self._read_section(i)
+        return section
+
+    def loaded_sections(self):
+        return len(self._sections)
+
+
+# Memecah data sumber menjadi header (dimuat langsung) dan bagian per tahap
+def _split(data):
+    if data.get("version") != CONTENT_FORMAT_VERSION:
+        raise ContentError(f"Versi konten tidak didukung: {data.get('version')}")
+    stages = sorted(data["stages"], key=lambda s: s["first"])
+    header = {
+        "items": data["items"],
+        "shop": data.get("shop", []),
+        "ranges": [(s["first"], s.get("last")) for s in stages],
+    }
+    sections = [{"monsters": s.get("monsters", {}), "loot_tables": s.get("loot_tables", {})} for s in stages]
+    return header, sections
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+# Layout cache: MAGIC | panjang header (4 byte) | header | bagian-bagian tahap
+def write_cache(cache_path, stamp, header, sections):
+    blobs = [marshal.dumps(section) for section in sections]
+    offsets = []
+    position = 0
+    for blob in blobs:
+        offsets.append((position, len(blob)))
+        position += len(blob)
+    header_blob = marshal.dumps((CONTENT_FORMAT_VERSION, stamp, header, offsets))
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CACHE_MAGIC)
+        f.write(len(header_blob).to_bytes(4, "little"))
+        f.write(header_blob)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, cache_path)
+
+
+def _open_cache(cache_path, stamp):
+    try:
+        with open(cache_path, "rb") as f:
+            if f.read(4) != CACHE_MAGIC:
+                return None
+            header_size = int.from_bytes(f.read(4), "little")
+            version, cached_stamp, header, offsets = marshal.loads(f.read(header_size))
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != CONTENT_FORMAT_VERSION or tuple(cached_stamp) != stamp:
+        return None
+    base = 8 + header_size
+
+    def read_section(i):
+        start, size = offsets[i]
+        with open(cache_path, "rb") as f:
+            f.seek(base + start)
+            return marshal.loads(f.read(size))
+
+    return ContentPack(header, read_section)
+
+
+def load_content(path=DEFAULT_CONTENT_PATH, use_cache=True):
+    """
+    Memuat paket konten dari path. Jika cache valid ada, JSON tidak di-parse
+    sama sekali; jika tidak, JSON di-parse dan cache ditulis ulang (gagal
+    menulis cache, mis. direktori hanya-baca, tidak dianggap error).
+    """
+    stamp = _source_stamp(path)
+    cache_path = path + CACHE_SUFFIX
+    if use_cache:
+        pack = _open_cache(cache_path, stamp)
+        if pack is not None:
+            return pack
+
+    with open(path, encoding="utf-8") as f:
+        header, sections = _split(json.load(f))
+    if use_cache:
+        try:
+            write_cache(cache_path, stamp, header, sections)
+        except OSError:
+            pass
+    return ContentPack(header, sections.__getitem__)
@@ -0,0 +1,829 @@
+"""
+Peluang menang eksak sebuah pertarungan lewat rantai Markov atas HP.
+
+Kerusakan di game_logic diskret (max(1, serangan - pertahanan), kritis 20%,
+hindaran lewat randint(1, 100)), sehingga hasil pertarungan bisa dihitung
+tanpa Monte Carlo. Model yang dihitung sama dengan BattleEngine.play_battle
+tanpa policy: setiap pemain hidup menyerang monster hidup pertama
+(default_battle_policy), lalu setiap monster memilih target acak dan
+mencoba serangan spesial (RandomMonsterAI, peluang special_chance).
+
+Keadaan rantai dibagi per rezim: (target, HP target saat rezim dimulai,
+HP monster sesudahnya, XP pemain) tetap sampai target dikalahkan, karena
+XP dari monster bisa membuat pemain naik level di tengah pertarungan. Di
+dalam rezim yang tersisa hanya HP pemain, MP monster, dan HP target. HP
+yang selalu berakhir sama (misalnya sama-sama mati oleh setiap serangan
+yang mungkin) digabung menjadi satu kelas, jadi kisi HP yang rapat tidak
+membuat keadaan meledak. Kelas HP target hanya membedakan kerusakan dari
+pemain yang masih hidup.
+
+Peluang disebarkan maju dari keadaan awal, rezim demi rezim. Selama
+pemain hidupnya tetap, sebaran HP target per ronde tidak bergantung pada
+HP pemain, jadi dihitung sekali per rezim (rantai target) dan cukup
+sebaran party yang disebarkan per ronde. Keadaan sesudah pemain gugur
+disebarkan satu per satu: HP hanya berkurang di dalam rezim, sehingga
+satu-satunya siklus adalah ronde tanpa perubahan (semua serangan
+meleset), yang diselesaikan langsung. Peluang di bawah _NEGLIGIBLE
+diabaikan; hasilnya berbeda dari rantai penuh sekitar 1e-13.
+
+Hasil per keadaan disimpan dalam memo per vektor statistik party dan
+monster, sehingga pertanyaan berikutnya di pertarungan yang sama cukup
+berupa pencarian di memo, dan transisi yang sudah disusun dipakai lagi
+untuk keadaan lain. Hitungan pertama untuk tahap 1 selesai dalam
+beberapa milidetik dan untuk tahap 2 dalam sekitar 30 milidetik, tetapi
+gelombang besar bisa jauh lebih lama. Karena itu UI menghitungnya lewat
+EncounterOracleWorker di thread lain, dan max_states membatasi ukuran
+rantai.
+
+Contoh:
+    python encounter_oracle.py --stage 3 --check 20000
+"""
+import argparse
+import queue
+import threading
+import time
+from collections import OrderedDict
+from heapq import heappop, heappush
+
+from game_logic import (
+    BOSS_SPECIAL_MP_COST, KILL_HEAL, KILL_XP, MONSTER_SPECIAL_CHANCE, PLAYER_CRIT_CHANCE, BattleEngine, BossMonster,
+    GameRNG, MonsterPool, PHASE_PLAYER, PooledMonster, RandomMonsterAI
+)
+from savegame import restore, snapshot
+
+# Batas keadaan per pertarungan sebelum oracle menyerah (gelombang besar terlalu luas)
+DEFAULT_MAX_STATES = 50000
+
+
+# Peluang yang diabaikan: sisa peluang target belum kalah, dan keadaan yang
+# peluangnya (dikali peluang target belum kalah) lebih kecil dari ini
+_NEGLIGIBLE = 1e-15
+
+
+class EncounterTooLarge(Exception):
+    pass
+
+
+class EncounterOdds:
+    """Peluang menang dan harapan jumlah ronde sampai pertarungan selesai."""
+    __slots__ = ("win_probability", "expected_rounds", "states")
+
+    def __init__(self, win_probability, expected_rounds, states):
+        self.win_probability = win_probability
+        self.expected_rounds = expected_rounds
+        self.states = states
+
+    def message(self):
+        return f"Peluang menang {self.win_probability:.1%} (sekitar {self.expected_rounds:.1f} ronde)"
+
+    __str__ = message
+
+
+def _evade_chance(evasion):
+    return min(100, max(0, evasion)) / 100
+
+
+# Pemain yang masih hidup di keadaan party (HP pemain, MP monster)
+def _alive(party):
+    return tuple(value > 0 for value in party[0])
+
+
+class _Encounter:
+    """
+    Rantai Markov untuk satu kombinasi statistik party dan monster.
+
+    Rezim (target, HP monster sesudahnya, XP pemain) tetap selama tidak ada
+    monster yang dikalahkan. Di dalam rezim, fase pemain hanya mengubah HP
+    target dan fase monster hanya mengubah keadaan party (HP pemain, MP
+    monster), jadi keduanya disusun terpisah: rantai HP target per pemain
+    hidup (_chain) dan transisi party per nomor keadaan (_monster_phase).
+    _spread menggabungkan keduanya sambil menyebarkan peluang maju.
+    """
+    def __init__(self, players, monsters, special_roll, max_states):
+        # players: (max_hp, serangan, pertahanan, hindaran, pengali kritis, xp)
+        # monsters: (max_hp, serangan, pertahanan, peluang hindar, boss?)
+        self.players = players
+        self.monsters = monsters
+        self.special_roll = special_roll
+        self.max_states = max_states
+        self._stats = {}
+        self._player_rows = {}
+        # Keadaan party per rezim diberi nomor (posisinya di _parties, pemain hidupnya
+        # di _living) agar dict di penyebaran berkunci bilangan bulat;
+        # _monster_moves[rezim][nomor] = transisinya
+        self._parties = {}
+        self._living = {}
+        self._party_numbers = {}
+        self._monster_moves = {}
+        self._monster_turns = {}
+        self._hp_classes = {}
+        self._regime_classes = {}
+        self._target_class_tables = {}
+        self._projections = {}
+        self._chains = {}
+        self._kill_tables = {}
+        self._hit_tables = {}
+        # Jawaban per (keadaan, pemain pertama)
+        self._answers = {}
+
+    # Rezim: (target, HP target saat rezim dimulai, HP monster sesudahnya, XP pemain).
+    # XP yang tidak lagi memengaruhi apa pun disamakan: dengan satu monster tersisa,
+    # kekalahan berikutnya mengakhiri pertarungan sehingga hanya level yang penting
+    @staticmethod
+    def regime(target, top, rest, xps):
+        if not any(rest):
+            xps = tuple(xp - xp % 100 for xp in xps)
+        return target, top, rest, xps
+
+    # Statistik pemain i dengan total XP xp (setiap 100 XP = satu level)
+    def _leveled(self, i, xp):
+        key = (i, xp)
+        stats = self._stats.get(key)
+        if stats is None:
+            max_hp, attack, defense, evasion, crit, _ = self.players[i]
+            ups = xp // 100
+            max_hp += 10 * ups
+            attack += 5 * ups
+            defense += 5 * ups
+            evade = _evade_chance(evasion + 5 * ups)
+            # Kerusakan ke monster j: (biasa, kritis); kerusakan dari monster j: (biasa, spesial)
+            dealt = [(max(1, attack - foe_defense), int(max(1, attack - foe_defense) * crit))
+                     for _, _, foe_defense, _, _ in self.monsters]
+            taken = [(max(1, foe_attack - defense),
+                      max(1, foe_attack * 3 - defense) if boss else max(1, int(foe_attack * 1.5) - defense))
+                     for _, foe_attack, _, _, boss in self.monsters]
+            stats = self._stats[key] = (max_hp, evade, dealt, taken)
+        return stats
+
+    def _hp_class(self, i, xp, target, rest):
+        """
+        Kelas HP pemain i dalam rezim (target, monster hidup sesudahnya rest):
+        dua HP setara jika setiap kerusakan yang mungkin membawa keduanya ke
+        kelas yang sama (atau sama-sama mati) dan regenerasi saat rezim
+        berakhir juga membawa keduanya ke kelas yang sama di rezim berikutnya.
+        Keadaan party cukup menyimpan wakil kelasnya, HP terkecil di kelas
+        itu. classes[hp] = wakil kelas.
+        """
+        following = next((k for k, value in enumerate(rest) if value), None)
+        if following is None:
+            xp -= xp % 100
+        key = (i, xp, target, rest)
+        classes = self._hp_classes.get(key)
+        if classes is not None:
+            return classes
+        max_hp, _, _, taken = self._leveled(i, xp)
+        damages = sorted({damage for j in [target] + [target + 1 + k for k, value in enumerate(rest) if value]
+                          for damage in taken[j]})
+        if following is not None:
+            next_target = target + following + 1
+            next_rest = rest[following + 1:]
+            # Rezim berikutnya jika pemain lain yang mengalahkan target, atau pemain ini
+            same = self._hp_class(i, xp, next_target, next_rest)
+            killed = self._hp_class(i, xp + KILL_XP, next_target, next_rest)
+        classes = [0] * (max_hp + 1)
+        representatives = {}
+        for hp in range(1, max_hp + 1):
+            signature = tuple(classes[hp - damage] if hp > damage else 0 for damage in damages)
+            if following is not None:
+                signature += (same[hp], killed[self._kill_heal(i, hp, xp)])
+            classes[hp] = representatives.setdefault(signature, hp)
+        self._hp_classes[key] = classes
+        return classes
+
+    # Tabel kelas HP setiap pemain di rezim ini (kelas[0] = 0 untuk pemain mati)
+    def _classes(self, regime):
+        classes = self._regime_classes.get(regime)
+        if classes is None:
+            target, _, rest, xps = regime
+            alive = tuple(value > 0 for value in rest)
+            classes = self._regime_classes[regime] = [self._hp_class(i, xp, target, alive)
+                                                      for i, xp in enumerate(xps)]
+        return classes
+
+    # HP pemain diganti wakil kelasnya di rezim ini
+    def _merge(self, regime, hps):
+        return tuple(classes[hp] for classes, hp in zip(self._classes(regime), hps))
+
+    # HP setelah heal(50) lalu naik level (max_hp +10 dan heal(10) per level)
+    def _kill_heal(self, i, hp, xp):
+        hp = min(self._leveled(i, xp)[0], hp + KILL_HEAL)
+        for level in range(xp // 100, (xp + KILL_XP) // 100):
+            hp = min(self.players[i][0] + 10 * (level + 1), hp + 10)
+        return hp
+
+    def _target_classes(self, regime, alive):
+        """
+        Kelas HP target di rezim ini selama pemain hidupnya alive, hanya untuk
+        HP yang bisa dicapai dari HP awal rezim: dua HP setara jika setiap
+        kerusakan pemain hidup (biasa atau kritis) membawa keduanya ke kelas
+        yang sama, atau mengalahkan target dari keduanya. Kerusakan pemain yang
+        sudah gugur tidak dihitung, jadi kelas sesudahnya lebih kasar.
+        (index[hp] = kelas, wakil[kelas] = HP terkecilnya), kelas 0 = kalah.
+        """
+        target, top, _, xps = regime
+        hits = [self._leveled(i, xp)[2][target] for i, xp in enumerate(xps)]
+        key = (top, tuple(hits), alive)
+        classes = self._target_class_tables.get(key)
+        if classes is None:
+            # HP yang bisa dicapai dihitung dengan semua pemain, sehingga kelas
+            # sesudah pemain gugur juga mencakup HP sebelumnya (_projection)
+            reachable = {top}
+            pending = [top]
+            while pending:
+                hp = pending.pop()
+                for damage in {damage for damages in hits for damage in damages}:
+                    if hp > damage and hp - damage not in reachable:
+                        reachable.add(hp - damage)
+                        pending.append(hp - damage)
+            damages = sorted({damage for damages, value in zip(hits, alive) if value for damage in damages})
+            index = [0] * (top + 1)
+            representatives = [None]
+            signatures = {}
+            for hp in sorted(reachable):
+                signature = tuple(index[hp - damage] if hp > damage else 0 for damage in damages)
+                if signature not in signatures:
+                    signatures[signature] = len(representatives)
+                    representatives.append(hp)
+                index[hp] = signatures[signature]
+            classes = self._target_class_tables[key] = (index, representatives)
+        return classes
+
+    def _player_phase(self, regime, alive, start):
+        """
+        Fase pemain mulai dari posisi start untuk setiap kelas HP target: rows[kelas] =
+        (peluang semua meleset, [(peluang, kelas lebih rendah)], [(peluang, pemain yang mengalahkan)]).
+        Setiap pemain hidup menyerang target; kekalahan target mengakhiri rezim.
+        """
+        key = (regime, alive, start)
+        rows = self._player_rows.get(key)
+        if rows is not None:
+            return rows
+        target, _, _, xps = regime
+        evade = self.monsters[target][3]
+        index, representatives = self._target_classes(regime, alive)
+        hits = [(i,) + self._leveled(i, xps[i])[2][target]
+                for i in range(start, len(alive)) if alive[i]]
+        rows = [None]
+        for hp in representatives[1:]:
+            dist = {hp: 1.0}
+            kills = []
+            for i, normal, crit in hits:
+                step = {}
+                killed = 0.0
+                for value, probability in dist.items():
+                    if evade > 0:
+                        step[value] = step.get(value, 0.0) + probability * evade
+                    for share, damage in ((1 - PLAYER_CRIT_CHANCE, normal), (PLAYER_CRIT_CHANCE, crit)):
+                        share *= (1 - evade) * probability
+                        if share <= 0:
+                            continue
+                        if value > damage:
+                            step[value - damage] = step.get(value - damage, 0.0) + share
+                        else:
+                            killed += share
+                if killed > 0:
+                    kills.append((killed, i))
+                dist = step
+            loop = dist.pop(hp, 0.0)
+            lower = {}
+            for value, probability in dist.items():
+                lower[index[value]] = lower.get(index[value], 0.0) + probability
+            rows.append((loop, [(probability, value) for value, probability in lower.items()], kills))
+        self._player_rows[key] = rows
+        return rows
+
+    def _hits(self, regime, j):
+        """
+        Serangan monster j ke setiap pemain di rezim ini, per wakil kelas HP:
+        hits[spesial boss?][i][hp] = [(peluang, wakil kelas HP berikutnya, memakai MP?)].
+        Spesial boss tidak bisa dihindari dan hanya tersedia selama MP-nya cukup.
+        """
+        key = (regime, j)
+        hits = self._hit_tables.get(key)
+        if hits is not None:
+            return hits
+        _, _, _, xps = regime
+        boss = self.monsters[j][4]
+        special_share = self.special_roll * MONSTER_SPECIAL_CHANCE
+        hits = ([], [])
+        for i, classes in enumerate(self._classes(regime)):
+            _, evade, _, taken = self._leveled(i, xps[i])
+            normal, special = taken[j]
+            if boss:
+                variants = (((1.0, normal, True, False),),
+                            ((self.special_roll, special, False, True), (1 - self.special_roll, normal, True, False)))
+            else:
+                branches = ((special_share, special, True, False), (1 - special_share, normal, True, False))
+                variants = (branches, branches)
+            for rows, branches in zip(hits, variants):
+                row = {}
+                for hp in set(classes[1:]):
+                    outcomes = {}
+                    for share, damage, evadable, spends in branches:
+                        if evadable and evade > 0:
+                            outcomes[(hp, spends)] = outcomes.get((hp, spends), 0.0) + share * evade
+                            share *= 1 - evade
+                        if share <= 0:
+                            continue
+                        value = classes[hp - damage] if hp > damage else 0
+                        outcomes[(value, spends)] = outcomes.get((value, spends), 0.0) + share
+                    row[hp] = [(share, value, spends) for (value, spends), share in outcomes.items()]
+                rows.append(row)
+        self._hit_tables[key] = hits
+        return hits
+
+    # Nomor keadaan party (HP pemain, MP monster) di rezim ini
+    def _number(self, regime, party):
+        numbers = self._party_numbers.get(regime)
+        if numbers is None:
+            numbers = self._party_numbers[regime] = {}
+            self._parties[regime] = []
+            self._living[regime] = []
+        number = numbers.get(party)
+        if number is None:
+            number = numbers[party] = len(numbers)
+            self._parties[regime].append(party)
+            self._living[regime].append(_alive(party))
+        return number
+
+    def _monster_turn(self, regime, j, turns, number):
+        """
+        Serangan monster j dari keadaan party bernomor number:
+        [(nomor berikutnya, peluang)], nomor None jika semua pemain mati.
+        Monster memilih target acak di antara pemain hidup. turns: tabel
+        simpanan monster j di rezim ini.
+        """
+        hps, mps = self._parties[regime][number]
+        living = [i for i, value in enumerate(hps) if value > 0]
+        pick = 1.0 / len(living)
+        special = self.monsters[j][4] and mps[j] >= BOSS_SPECIAL_MP_COST
+        spent = mps[:j] + (mps[j] - BOSS_SPECIAL_MP_COST,) + mps[j + 1:] if special else mps
+        rows = self._hits(regime, j)[special]
+        step = {}
+        for i in living:
+            for share, value, spends in rows[i][hps[i]]:
+                # HP pemain lain sudah berupa wakil kelas, cukup HP pemain ini yang berubah
+                next_hps = hps[:i] + (value,) + hps[i + 1:]
+                following = self._number(regime, (next_hps, spent if spends else mps)) if value or len(living) > 1 else None
+                step[following] = step.get(following, 0.0) + share * pick
+        moves = turns[number] = list(step.items())
+        return moves
+
+    def _monster_phase(self, regime, number):
+        """
+        Fase monster dari keadaan party bernomor number:
+        ([(peluang, nomor berikutnya)] dengan pemain hidup yang sama,
+        [(peluang, nomor berikutnya, pemain hidup)] yang kehilangan pemain).
+        Keadaan yang semua pemainnya mati tidak dicatat (kalah). Monster
+        bergiliran lewat _monster_turn, jadi keadaan antara dipakai bersama.
+        """
+        table = self._monster_moves.setdefault(regime, {})
+        moves = table.get(number)
+        if moves is not None:
+            return moves
+        target, _, rest, _ = regime
+        dist = {number: 1.0}
+        for j in range(target, len(self.monsters)):
+            if j > target and not rest[j - target - 1]:
+                continue
+            turns = self._monster_turns.setdefault((regime, j), {})
+            step = {}
+            for current, probability in dist.items():
+                if current is None:
+                    continue
+                for following, share in turns.get(current) or self._monster_turn(regime, j, turns, current):
+                    step[following] = step.get(following, 0.0) + share * probability
+            dist = step
+        living = self._living[regime]
+        alive = living[number]
+        kept = []
+        lost = []
+        for following, probability in dist.items():
+            if following is not None:
+                fewer = living[following]
+                if fewer == alive:
+                    kept.append((probability, following))
+                else:
+                    lost.append((probability, following, fewer))
+        moves = table[number] = (kept, lost)
+        return moves
+
+    # Setelah pemain i mengalahkan target: (rezim berikutnya, per pemain tabel HP -> wakil
+    # kelas di rezim itu, dengan heal dan naik level pemain i); None jika itu monster terakhir
+    def _after_kill(self, regime, i):
+        key = (regime, i)
+        if key in self._kill_tables:
+            return self._kill_tables[key]
+        target, _, rest, xps = regime
+        following = next((k for k, value in enumerate(rest) if value > 0), None)
+        after = None
+        if following is not None:
+            next_xps = xps[:i] + (xps[i] + KILL_XP,) + xps[i + 1:]
+            next_regime = self.regime(target + following + 1, rest[following], rest[following + 1:], next_xps)
+            maps = list(self._classes(next_regime))
+            healed = maps[i]
+            maps[i] = [healed[self._kill_heal(i, hp, xps[i])] if hp else 0 for hp in range(len(self._classes(regime)[i]))]
+            after = (next_regime, maps)
+        self._kill_tables[key] = after
+        return after
+
+    def _settle_kills(self, regime, alive, killed, pending):
+        """
+        killed[i][nomor]: peluang pemain i mengalahkan target dari keadaan
+        party bernomor itu. Peluangnya masuk ke kelompok rezim berikutnya
+        (dari posisi i + 1) di pending; mengembalikan peluang menang dari
+        kekalahan monster terakhir.
+        """
+        win = 0.0
+        parties = self._parties[regime]
+        for i, row in killed.items():
+            after = self._after_kill(regime, i)
+            if after is None:
+                win += sum(row.values())
+                continue
+            next_regime, maps = after
+            group = pending.setdefault((next_regime, i + 1, alive), {})
+            for number, mass in row.items():
+                hps, mps = parties[number]
+                following = self._number(next_regime, (tuple(map(list.__getitem__, maps, hps)), mps))
+                group[following] = group.get(following, 0.0) + mass
+        return win
+
+    def _chain(self, regime, start, alive):
+        """
+        HP target per fase pemain sejak rezim dimulai (HP awal rezim, posisi
+        start) selama pemain hidupnya tetap alive: [(peluang target belum kalah
+        per kelas, [(peluang, pemain yang mengalahkan)])] untuk fase 1, 2, ...
+        sampai sisa peluangnya di bawah _NEGLIGIBLE. None jika itu butuh lebih
+        dari dua kali jumlah kelas fase (serangan hampir selalu meleset);
+        keadaannya lalu disebarkan satu per satu seperti setelah pemain gugur.
+        """
+        key = (regime, start, alive)
+        if key in self._chains:
+            return self._chains[key]
+        index, representatives = self._target_classes(regime, alive)
+        dist = [0.0] * len(representatives)
+        dist[index[regime[1]]] = 1.0
+        if start and not any(alive[start:]):
+            # Tidak ada pemain tersisa di ronde ini: sama dengan mulai dari ronde berikutnya
+            chain = self._chain(regime, 0, alive)
+            chain = self._chains[key] = [(dist, [])] + chain if chain is not None else None
+            return chain
+        rows = self._player_phase(regime, alive, start)
+        chain = []
+        while chain is not None:
+            step = [0.0] * len(dist)
+            kills = {}
+            for level, mass in enumerate(dist):
+                if mass:
+                    loop, moves, killers = rows[level]
+                    step[level] += mass * loop
+                    for probability, lower in moves:
+                        step[lower] += mass * probability
+                    for probability, i in killers:
+                        kills[i] = kills.get(i, 0.0) + mass * probability
+            chain.append((step, [(probability, i) for i, probability in kills.items()]))
+            if sum(step) < _NEGLIGIBLE:
+                break
+            if len(chain) > 2 * len(representatives):
+                chain = None
+            dist = step
+            rows = self._player_phase(regime, alive, 0)
+        self._chains[key] = chain
+        return chain
+
+    # Kelas HP target untuk pemain hidup alive -> kelas untuk pemain hidup fewer (lebih kasar)
+    def _projection(self, regime, alive, fewer):
+        key = (regime, alive, fewer)
+        projection = self._projections.get(key)
+        if projection is None:
+            index = self._target_classes(regime, fewer)[0]
+            projection = self._projections[key] = [0] + [index[hp] for hp in self._target_classes(regime, alive)[1][1:]]
+        return projection
+
+    # Menambah scale * vector (peluang per kelas HP target) ke keadaan state kelompok group
+    @staticmethod
+    def _add_vector(group, state, vector, scale):
+        known = group.get(state)
+        if known is None:
+            group[state] = [scale * value for value in vector]
+        else:
+            group[state] = [total + scale * value for total, value in zip(known, vector)]
+
+    # vector atas kelas HP target untuk pemain hidup alive, dipetakan ke kelas untuk fewer
+    def _project(self, regime, alive, fewer, vector):
+        projection = self._projection(regime, alive, fewer)
+        projected = [0.0] * len(self._target_classes(regime, fewer)[1])
+        for level, value in enumerate(vector):
+            projected[projection[level]] += value
+        return projected
+
+    def _spread(self, regime, start, number):
+        """
+        Menyebarkan peluang maju dari keadaan party bernomor number di rezim
+        ini (giliran pemain start). Peluang dikumpulkan per kelompok di
+        pending: (rezim, posisi, pemain hidup) -> {nomor: peluang} untuk
+        rezim yang baru dimasuki dari posisi itu (HP target penuh), dan
+        (rezim, None, pemain hidup) -> {(posisi, nomor): peluang per kelas HP
+        target} untuk keadaan sesudah pemain gugur. Kelompok diselesaikan
+        menurut urutan target, lalu jumlah pemain hidup menurun, sehingga
+        semua peluang yang masuk ke sebuah kelompok sudah terkumpul saat
+        kelompok itu disebarkan. Mengembalikan (peluang menang, harapan
+        ronde sesudah ronde ini).
+        """
+        alive = self._living[regime][number]
+        pending = {(regime, start, alive): {number: 1.0}}
+        win = rounds = 0.0
+        while pending:
+            key = min(pending, key=lambda key: (key[0][0], -sum(key[2]), key[1] is None))
+            group = pending.pop(key)
+            regime, start, alive = key
+            if start is None:
+                won, spent = self._spread_states(regime, alive, group, pending)
+            else:
+                won, spent = self._spread_entries(regime, start, alive, group, pending)
+            win += won
+            rounds += spent
+            if self.states() > self.max_states:
+                raise EncounterTooLarge(f"Lebih dari {self.max_states} keadaan.")
+        return win, rounds
+
+    def _spread_entries(self, regime, start, alive, parties, pending):
+        """
+        Kelompok yang baru memasuki rezim dari posisi start. Sebaran HP
+        target per fase tidak bergantung pada keadaan party selama tidak
+        ada pemain yang gugur, jadi cukup sebaran party yang disebarkan per
+        ronde, dikalikan rantai HP target (_chain). Keadaan yang peluangnya,
+        dikali peluang target belum kalah, di bawah _NEGLIGIBLE diabaikan.
+        """
+        chain = self._chain(regime, start, alive)
+        if chain is None:
+            index, representatives = self._target_classes(regime, alive)
+            vector = [0.0] * len(representatives)
+            vector[index[regime[1]]] = 1.0
+            group = pending.setdefault((regime, None, alive), {})
+            for number, mass in parties.items():
+                self._add_vector(group, (start, number), vector, mass)
+            return 0.0, 0.0
+        table = self._monster_moves.setdefault(regime, {})
+        rounds = 0.0
+        # Peluang target dikalahkan pemain i dari setiap keadaan party, dijumlahkan atas semua fase
+        killed = {}
+        for dist, kills in chain:
+            for probability, i in kills:
+                row = killed.setdefault(i, {})
+                for number, mass in parties.items():
+                    row[number] = row.get(number, 0.0) + probability * mass
+            remaining = sum(dist)
+            following = {}
+            lost = {}
+            for number, mass in parties.items():
+                if mass * remaining < _NEGLIGIBLE:
+                    continue
+                kept, fallen = table.get(number) or self._monster_phase(regime, number)
+                for chance, state in kept:
+                    following[state] = following.get(state, 0.0) + mass * chance
+                for chance, state, fewer in fallen:
+                    lost[state, fewer] = lost.get((state, fewer), 0.0) + mass * chance
+            # Ronde berikutnya dihitung jika target belum kalah dan masih ada pemain hidup
+            rounds += remaining * sum(following.values())
+            projected = {}
+            for (state, fewer), mass in lost.items():
+                if fewer not in projected:
+                    projected[fewer] = self._project(regime, alive, fewer, dist)
+                self._add_vector(pending.setdefault((regime, None, fewer), {}), (0, state), projected[fewer], mass)
+            parties = following
+        return self._settle_kills(regime, alive, killed, pending), rounds
+
+    def _spread_states(self, regime, alive, groups, pending):
+        """
+        Kelompok sesudah pemain gugur, atau rezim yang serangannya hampir
+        selalu meleset: {(posisi, nomor): peluang per kelas HP target}. HP
+        dan MP hanya berkurang, jadi keadaan party diselesaikan satu per satu
+        menurut jumlah HP dan MP menurun: saat diambil, semua peluang yang
+        masuk ke sana sudah terkumpul. Satu-satunya siklus adalah ronde yang
+        tidak mengubah party (semua serangan monster meleset, peluang b), jadi
+        peluang awal ronde x per kelas memenuhi x = v + b * P(x) dengan P fase
+        pemain. P tidak pernah menaikkan kelas, sehingga x diselesaikan dari
+        kelas tertinggi.
+        """
+        size = len(self._target_classes(regime, alive)[1])
+        parties = self._parties[regime]
+
+        def push(start, number):
+            hps, mps = parties[number]
+            heappush(heap, (-sum(hps) - sum(mps), -start, number))
+
+        heap = []
+        for start, number in groups:
+            push(start, number)
+        rounds = 0.0
+        killed = {}
+        while heap:
+            _, start, number = heappop(heap)
+            start = -start
+            vector = groups.pop((start, number))
+            rows = self._player_phase(regime, alive, start)
+            kept, fallen = self._monster_phase(regime, number)
+            stay = sum(chance for chance, following in kept if following == number) if start == 0 else 0.0
+            # inflow[kelas]: masuk dari kelas lebih tinggi di fase pemain; after: sesudah fase pemain
+            inflow = [0.0] * size
+            after = [0.0] * size
+            for level in range(size - 1, 0, -1):
+                loop, moves, kills = rows[level]
+                mass = vector[level] + stay * inflow[level]
+                if mass < _NEGLIGIBLE:
+                    continue
+                if stay * loop >= 1 - 1e-12:
+                    # Tidak ada serangan yang bisa kena: play_battle berakhir kalah karena max_turns
+                    rounds = float("inf")
+                    continue
+                mass /= 1 - stay * loop
+                if start == 0:
+                    rounds += mass
+                after[level] = loop * mass + inflow[level]
+                for probability, lower in moves:
+                    inflow[lower] += probability * mass
+                for probability, i in kills:
+                    row = killed.setdefault(i, {})
+                    row[number] = row.get(number, 0.0) + probability * mass
+            for chance, following in kept:
+                if start == 0 and following == number:
+                    continue
+                if (0, following) not in groups:
+                    push(0, following)
+                self._add_vector(groups, (0, following), after, chance)
+            for chance, following, fewer in fallen:
+                projected = self._project(regime, alive, fewer, after)
+                self._add_vector(pending.setdefault((regime, None, fewer), {}), (0, following), projected, chance)
+        return self._settle_kills(regime, alive, killed, pending), rounds
+
+    # Keadaan party yang transisi fase monsternya sudah disusun
+    def states(self):
+        return sum(map(len, self._monster_moves.values()))
+
+    def solve(self, state, first_player=0):
+        """(peluang menang, harapan ronde) dari giliran first_player pada keadaan ini."""
+        hps, mhps, mps = state
+        if not any(hps):
+            return 0.0, 0.0
+        target = next((j for j, value in enumerate(mhps) if value > 0), None)
+        if target is None:
+            return 1.0, 0.0
+        answer = self._answers.get((state, first_player))
+        if answer is None:
+            regime = self.regime(target, mhps[target], mhps[target + 1:], tuple(player[5] for player in self.players))
+            win, rounds = self._spread(regime, first_player, self._number(regime, (self._merge(regime, hps), mps)))
+            # Ronde ini dihitung juga
+            answer = self._answers[(state, first_player)] = (win, 1 + rounds)
+        return answer
+
+
+class EncounterOracle:
+    """
+    Menghitung EncounterOdds untuk keadaan BattleEngine saat ini. Rantai per
+    kombinasi statistik disimpan (paling banyak max_cached, LRU), jadi
+    pertanyaan ulang di pertarungan yang sama hanya berupa pencarian memo.
+    """
+    def __init__(self, max_cached=8, max_states=DEFAULT_MAX_STATES):
+        self.max_cached = max_cached
+        self.max_states = max_states
+        self._encounters = OrderedDict()
+
+    def _encounter(self, key):
+        encounter = self._encounters.get(key)
+        if encounter is None:
+            encounter = self._encounters[key] = _Encounter(*key, self.max_states)
+            if len(self._encounters) > self.max_cached:
+                self._encounters.popitem(last=False)
+        else:
+            self._encounters.move_to_end(key)
+        return encounter
+
+    @staticmethod
+    def query(engine):
+        """
+        Pertanyaan untuk solve() sebagai tuple biasa (tanpa objek engine),
+        sehingga aman dikirim ke thread lain: (statistik, keadaan, pemain pertama).
+        """
+        if engine.phase != PHASE_PLAYER:
+            raise ValueError("EncounterOracle hanya menghitung dari fase pemain.")
+        if type(engine.monster_ai) is not RandomMonsterAI:
+            raise ValueError("EncounterOracle hanya memodelkan RandomMonsterAI.")
+        members = engine.party.members
+        if isinstance(engine.monsters, MonsterPool):
+            monsters = [PooledMonster(engine.monsters, i) for i in range(len(engine.monsters))]
+        else:
+            monsters = engine.monsters
+        players = tuple((m.max_hp, m.attack_stat, m.defense_stat, m.evasion_stat,
+                         2 + m.total_critical_damage_bonus() / 100, m.xp) for m in members)
+        foes = tuple((m.max_hp, m.attack_stat, m.defense_stat, _evade_chance(m.evasion_stat),
+                      m.kind == BossMonster.kind)
+                     for m in monsters)
+        state = (tuple(m.hp if m.is_alive else 0 for m in members),
+                 tuple(m.hp if m.is_alive else 0 for m in monsters),
+                 tuple(m.mp for m in monsters))
+        return (players, foes, engine.monster_ai.special_chance), state, engine.current_player_index
+
+    def solve(self, query):
+        key, state, first_player = query
+        encounter = self._encounter(key)
+        win, rounds = encounter.solve(state, first_player)
+        # Penjumlahan float bisa melewati 1 sedikit
+        return EncounterOdds(min(1.0, max(0.0, win)), rounds, encounter.states())
+
+    def evaluate(self, engine):
+        """Peluang menang dari giliran pemain saat ini (fase pemain)."""
+        return self.solve(self.query(engine))
+
+
+class EncounterOracleWorker:
+    """
+    Menjalankan EncounterOracle di thread latar agar UI tidak tertahan saat
+    rantai pertarungan baru dihitung. submit(token, query) mengantrekan
+    pertanyaan; poll() mengembalikan (token, EncounterOdds atau None) tanpa
+    memblokir. None berarti pertarungan terlalu besar untuk dihitung.
+    """
+    def __init__(self, oracle):
+        self.oracle = oracle
+        self.requests = queue.Queue()
+        self.answers = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="encounter-oracle", daemon=True)
+        self._thread.start()
+
+    def submit(self, token, query):
+        self.requests.put((token, query))
+
+    def poll(self):
+        try:
+            return self.answers.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            token, query = request
+            try:
+                odds = self.oracle.solve(query)
+            except EncounterTooLarge:
+                odds = None
+            self.answers.put((token, odds))
+
+    def stop(self):
+        self.requests.put(None)
+
+
+# Monte Carlo dengan play_battle sebagai pembanding, dari snapshot awal tahap;
+# setiap pertarungan memakai seed sendiri (party dan monster)
+def monte_carlo(data, battles, seed_offset=0):
+    wins = 0
+    for seed in range(seed_offset, seed_offset + battles):
+        engine = restore(dict(data, seed=seed))
+        engine.start_stage()
+        wins += engine.play_battle()
+    return wins / battles
+
+
+# Snapshot party di awal tahap ke-stage setelah memainkan kampanye bawaan dengan seed ini
+def campaign_snapshot(stage, seed=0):
+    engine = BattleEngine(rng=GameRNG(seed))
+    while engine.stage < stage:
+        engine.start_stage()
+        if not engine.end_battle(engine.play_battle()):
+            break
+    return snapshot(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peluang menang eksak pertarungan awal sebuah tahap.")
+    parser.add_argument("--stage", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="seed kampanye yang dimainkan sampai tahap itu")
+    parser.add_argument("--max-states", type=int, default=DEFAULT_MAX_STATES)
+    parser.add_argument("--check", type=int, default=0, help="bandingkan dengan N pertarungan Monte Carlo")
+    args = parser.parse_args()
+
+    data = campaign_snapshot(args.stage, args.seed)
+    if data["stage"] < args.stage:
+        print(f"Party dengan seed {args.seed} sudah kalah di tahap {data['stage']}.")
+    engine = restore(data)
+    engine.start_stage()
+    oracle = EncounterOracle(max_states=args.max_states)
+    start = time.perf_counter()
+    odds = oracle.evaluate(engine)
+    elapsed = time.perf_counter() - start
+    print(f"Tahap {engine.stage}: {odds.message()} - {odds.states} keadaan, {elapsed * 1e3:.1f} ms")
+    start = time.perf_counter()
+    oracle.evaluate(engine)
+    print(f"Pertanyaan ulang (memo): {(time.perf_counter() - start) * 1e6:.0f} us")
+    if args.check:
+        rate = monte_carlo(data, args.check)
+        error = (odds.win_probability * (1 - odds.win_probability) / args.check) ** 0.5
+        print(f"Monte Carlo {args.check} pertarungan: {rate:.1%} "
+              f"(selisih {abs(rate - odds.win_probability) / max(error, 1e-12):.1f} sigma)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,60 @@
+import hashlib
 import random
+from collections import Counter
 from abc import ABC, abstractmethod
+from itertools import repeat, starmap
+
+from content import load_content
+
+# Sumber angka acak yang bisa di-seed dan dipecah per pertarungan/entitas
+class GameRNG:
+    """
+    Pembungkus random.Random yang dapat disuntikkan ke karakter dan
+    BattleEngine. spawn(key) membuat aliran turunan yang deterministik
+    (tidak bergantung pada urutan pemakaian aliran lain); fork() membuat
+    aliran turunan baru yang berbeda pada setiap panggilan. draw(n)
+    mengembalikan n lemparan berikutnya sebagai list, sama dengan n kali
+    memanggil random() (dipakai LootTable.draw_many).
+    """
+    def __init__(self, seed=None):
+        self.seed = seed if seed is not None else random.randrange(2 ** 63)
+        self._random = random.Random(self.seed)
+        self.random = self._random.random
+        self._forks = 0
+
+    def randint(self, a, b):
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    # n angka dalam [0, 1) sekaligus; sama dengan n kali memanggil random()
+    def draw(self, n):
+        return list(starmap(self.random, repeat((), n)))
+
+    def spawn(self, key):
+        digest = hashlib.blake2b(f"{self.seed}/{key}".encode(), digest_size=8).digest()
+        return GameRNG(int.from_bytes(digest, "little"))
+
+    # Aliran turunan baru per panggilan (kunci spawn berurutan "fork-1", "fork-2", ...)
+    def fork(self):
+        self._forks += 1
+        return self.spawn(f"fork-{self._forks}")
+
+# RNG bersama untuk objek yang dibuat tanpa rng eksplisit
+default_rng = GameRNG()
 
 # Jenis item
 ITEM_TYPE_POTION = "potion"
 ITEM_TYPE_EQUIPMENT = "equipment"
 
 class Item:
-    def __init__(self, name, item_type, stat_bonus=None, heal_amount=0, mp_restore=0, price=0, description=""):
+    __slots__ = ("item_id", "name", "item_type", "stat_bonus", "heal_amount", "mp_restore", "price", "description")
+
+    def __init__(self, name, item_type, stat_bonus=None, heal_amount=0, mp_restore=0, price=0, description="",
+                 item_id=None):
+        # ID stabil untuk inventaris dan UI; default-nya nama item
+        self.item_id = item_id if item_id is not None else name
         self.name = name
         self.item_type = item_type
         self.stat_bonus = stat_bonus or {}
@@ -29,85 +77,539 @@ class Item:
         else:
             return self.name
 
+# Registri item: pencarian O(1) berdasarkan ID maupun nama
+class ItemCatalog:
+    def __init__(self, items=()):
+        self._by_id = {}
+        self._by_name = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        existing = self._by_id.get(item.item_id)
+        if existing is not None and existing is not item:
+            raise ValueError(f"ID item '{item.item_id}' sudah dipakai oleh {existing.name}.")
+        self._by_id[item.item_id] = item
+        self._by_name.setdefault(item.name, item)
+        return item
+
+    # Seperti add, tetapi ID yang sudah dipakai item lain diganti ID turunan unik ("nama#2", "nama#3", ...)
+    def register(self, item):
+        existing = self._by_id.get(item.item_id)
+        if existing is not None and existing is not item:
+            base, n = item.item_id, 2
+            while f"{base}#{n}" in self._by_id:
+                n += 1
+            item.item_id = f"{base}#{n}"
+        return self.add(item)
+
+    def get(self, item_id, default=None):
+        return self._by_id.get(item_id, default)
+
+    def by_name(self, name, default=None):
+        return self._by_name.get(name, default)
+
+    def __getitem__(self, item_id):
+        return self._by_id[item_id]
+
+    def __contains__(self, item_id):
+        return item_id in self._by_id
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __len__(self):
+        return len(self._by_id)
+
+# Item dari satu entri "items" paket konten
+def item_from_data(data):
+    return Item(data["name"], data["type"], stat_bonus=data.get("stat_bonus"),
+                heal_amount=data.get("heal_amount", 0), mp_restore=data.get("mp_restore", 0),
+                price=data.get("price", 0), description=data.get("description", ""), item_id=data["id"])
+
+# Konten permainan (item, toko, kurva statistik monster, tabel loot) dimuat dari content/default.json
+CONTENT = load_content()
+ITEM_CATALOG = ItemCatalog(item_from_data(data) for data in CONTENT.items)
+
 # Definisi semua item yang tersedia
-HEALTH_POTION = Item("Ramuan Kesehatan", ITEM_TYPE_POTION, heal_amount=50, price=30, description="Memulihkan 50 HP")
-MP_POTION = Item("Ramuan Mana", ITEM_TYPE_POTION, mp_restore=30, price=25, description="Memulihkan 30 MP")
-REVIVE_POTION = Item("Ramuan Kebangkitan", ITEM_TYPE_POTION, price=150, description="Menghidupkan kembali karakter yang mati dengan 50% HP dan MP")
+HEALTH_POTION = ITEM_CATALOG["health_potion"]
+MP_POTION = ITEM_CATALOG["mp_potion"]
+REVIVE_POTION = ITEM_CATALOG["revive_potion"]
+
+WOODEN_SWORD = ITEM_CATALOG["wooden_sword"]
+IRON_SWORD = ITEM_CATALOG["iron_sword"]
+
+LEATHER_ARMOR = ITEM_CATALOG["leather_armor"]
+CHAINMAIL_ARMOR = ITEM_CATALOG["chainmail_armor"]
+
+LUCKY_CHARM = ITEM_CATALOG["lucky_charm"]
+CRIT_RING = ITEM_CATALOG["crit_ring"]
+
+MAGIC_STAFF = ITEM_CATALOG["magic_staff"]
+MYSTIC_ROBE = ITEM_CATALOG["mystic_robe"]
+MAGIC_RING = ITEM_CATALOG["magic_ring"]
+
+# Item yang dijual di toko
+SHOP_ITEMS = [ITEM_CATALOG[item_id] for item_id in CONTENT.shop]
+
+# Statistik yang dibaca dari kurva monster, sesuai urutan argumen Character
+MONSTER_STAT_FIELDS = ("hp", "mp", "attack", "defense", "evasion")
+_monster_stats = {}
+_loot_tables = {}
+
+# Kurva [dasar, per_tahap, batas?] -> nilai untuk tahap tertentu
+def curve_value(curve, stage):
+    value = curve[0] + curve[1] * stage
+    if len(curve) > 2 and curve[2] is not None:
+        value = min(curve[2], value)
+    return value
+
+# (hp, mp, serangan, pertahanan, hindaran) untuk jenis monster pada tahap tersebut
+def monster_base_stats(kind, stage):
+    key = (kind, stage)
+    stats = _monster_stats.get(key)
+    if stats is None:
+        curves = CONTENT.stage_section(stage)["monsters"][kind]
+        stats = _monster_stats[key] = tuple(curve_value(curves[field], stage) for field in MONSTER_STAT_FIELDS)
+    return stats
+
+# Tabel alias Walker (metode Vose): undian berbobot O(1) dengan satu angka acak
+class AliasTable:
+    __slots__ = ("prob", "alias", "size")
+
+    def __init__(self, weights):
+        size = len(weights)
+        total = sum(weights)
+        if size == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("Bobot harus tidak kosong, tidak negatif, dan berjumlah positif.")
+        scaled = [w * size / total for w in weights]
+        # Kolom yang tersisa di akhir (termasuk sisa pembulatan) dianggap penuh
+        prob = [1.0] * size
+        alias = list(range(size))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        self.prob = prob
+        self.alias = alias
+        self.size = size
+
+    # Bobot seragam memberi hasil yang sama persis dengan GameRNG.choice
+    def draw(self, rng):
+        u = rng.random() * self.size
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+    def draw_many(self, rng, n):
+        prob = self.prob
+        alias = self.alias
+        size = self.size
+        result = []
+        for u in rng.draw(n):
+            u *= size
+            i = int(u)
+            result.append(i if u - i < prob[i] else alias[i])
+        return result
+
+class LootTable:
+    """
+    Tabel loot yang dikompilasi sekali: items[i] dengan bobot weights[i]
+    dan tingkat kelangkaan rarities[i]. draw/draw_many mengundi seluruh
+    tabel; draw_rarity mengundi hanya item dari satu tingkat kelangkaan.
+    """
+    __slots__ = ("chance", "extra_chance", "items", "weights", "rarities", "_alias", "_by_rarity")
+
+    def __init__(self, chance, extra_chance, items, weights=None, rarities=None):
+        self.chance = chance
+        self.extra_chance = extra_chance
+        self.items = items
+        self.weights = weights if weights is not None else [1] * len(items)
+        self.rarities = rarities if rarities is not None else [None] * len(items)
+        self._alias = AliasTable(self.weights)
+        tiers = {}
+        for item, weight, rarity in zip(self.items, self.weights, self.rarities):
+            if rarity is not None:
+                tier_items, tier_weights = tiers.setdefault(rarity, ([], []))
+                tier_items.append(item)
+                tier_weights.append(weight)
+        self._by_rarity = {rarity: (tier_items, AliasTable(tier_weights))
+                           for rarity, (tier_items, tier_weights) in tiers.items()}
+
+    @classmethod
+    def from_data(cls, data, catalog):
+        items, weights, rarities = [], [], []
+        for entry in data["items"]:
+            if isinstance(entry, str):
+                entry = {"id": entry}
+            items.append(catalog[entry["id"]])
+            weights.append(entry.get("weight", 1))
+            rarities.append(entry.get("rarity"))
+        return cls(data.get("chance", 1), data.get("extra_chance", 0), items, weights, rarities)
+
+    def draw(self, rng):
+        return self.items[self._alias.draw(rng)]
+
+    # n undian sekaligus untuk simulasi
+    def draw_many(self, rng, n):
+        items = self.items
+        return [items[i] for i in self._alias.draw_many(rng, n)]
+
+    def draw_rarity(self, rng, rarity):
+        tier_items, alias = self._by_rarity[rarity]
+        return tier_items[alias.draw(rng)]
+
+    def rarity_tiers(self):
+        return list(self._by_rarity)
+
+# Tabel dikompilasi sekali per (jenis, bagian konten) dan dipakai ulang oleh semua tahap di bagian itu
+def loot_table(kind, stage):
+    key = (kind, stage)
+    table = _loot_tables.get(key)
+    if table is None:
+        compiled_key = (kind, CONTENT.section_index(stage))
+        table = _loot_tables.get(compiled_key)
+        if table is None:
+            data = CONTENT.stage_section(stage)["loot_tables"][kind]
+            table = _loot_tables[compiled_key] = LootTable.from_data(data, ITEM_CATALOG)
+        _loot_tables[key] = table
+    return table
+
+# Menentukan slot perlengkapan berdasarkan bonus statistik
+def get_item_slot(item):
+    if "attack" in item.stat_bonus:
+        return "weapon"
+    if "defense" in item.stat_bonus:
+        return "armor"
+    # Item yang tidak memiliki bonus serangan atau pertahanan akan masuk slot aksesori
+    return "accessory"
+
+# Jenis perubahan model yang dikirim ke on_change(obj, kind), dipakai UI
+# untuk memperbarui hanya widget yang terpengaruh
+CHANGE_HP = "hp"
+CHANGE_MP = "mp"
+CHANGE_STATS = "stats"
+CHANGE_LEVEL = "level"
+CHANGE_EQUIPMENT = "equipment"
+CHANGE_GOLD = "gold"
+CHANGE_INVENTORY = "inventory"
+
+# Jenis peristiwa pertarungan yang dikirim ke on_event(kind, fields); fields
+# adalah tuple sesuai urutan EVENT_FIELDS[kind] (karakter dikirim sebagai objek)
+EVENT_BATTLE_START = "battle_start"
+EVENT_ATTACK = "attack"
+EVENT_EVADE = "evade"
+EVENT_CRIT = "crit"
+EVENT_DAMAGE = "damage"
+EVENT_DEFEAT = "defeat"
+EVENT_LOOT = "loot"
+EVENT_LEVEL_UP = "level_up"
+EVENT_BATTLE_END = "battle_end"
+
+EVENT_FIELDS = {
+    EVENT_BATTLE_START: ("battle", "stage", "monsters"),
+    EVENT_ATTACK: ("source", "target", "special"),
+    EVENT_EVADE: ("source", "target"),
+    EVENT_CRIT: ("source", "target", "multiplier"),
+    EVENT_DAMAGE: ("target", "amount", "hp"),
+    EVENT_DEFEAT: ("target",),
+    EVENT_LOOT: ("items",),
+    EVENT_LEVEL_UP: ("source", "level"),
+    EVENT_BATTLE_END: ("battle", "stage", "won", "xp", "gold"),
+}
+
+# Gaya serangan pada AttackResult (menentukan teks pesannya)
+ATTACK_NORMAL = "normal"
+ATTACK_SPECIAL = "special"
+ATTACK_SAGE = "sage"
+ATTACK_BOSS = "boss"
+
+ATTACK_LABELS = {
+    ATTACK_SPECIAL: "SERANGAN SPESIAL",
+    ATTACK_SAGE: "SERANGAN SAGE SPESIAL",
+    ATTACK_BOSS: "SERANGAN SPESIAL BOSS",
+}
 
-WOODEN_SWORD = Item("Pedang Kayu", ITEM_TYPE_EQUIPMENT, stat_bonus={"attack": 5}, price=100, description="Pedang dasar, +5 Serangan")
-IRON_SWORD = Item("Pedang Besi", ITEM_TYPE_EQUIPMENT, stat_bonus={"attack": 10}, price=250, description="Pedang baja, +10 Serangan")
+# Parameter pertarungan, juga dipakai model analitis (encounter_oracle, shop_planner)
+PLAYER_CRIT_CHANCE = 0.2
+# Peluang Monster.special_attack benar-benar menjadi serangan spesial
+MONSTER_SPECIAL_CHANCE = 0.25
+# Peluang RandomMonsterAI mencoba serangan spesial
+MONSTER_AI_SPECIAL_CHANCE = 0.2
+BOSS_SPECIAL_MP_COST = 20
+# Pemulihan dan XP pemain yang mengalahkan monster
+KILL_HEAL = 50
+KILL_MP_RESTORE = 30
+KILL_XP = 50
 
-LEATHER_ARMOR = Item("Baju Zirah Kulit", ITEM_TYPE_EQUIPMENT, stat_bonus={"defense": 5}, price=120, description="Baju zirah dasar, +5 Pertahanan")
-CHAINMAIL_ARMOR = Item("Baju Zirah Rantai", ITEM_TYPE_EQUIPMENT, stat_bonus={"defense": 12}, price=300, description="Baju zirah kuat, +12 Pertahanan")
 
-LUCKY_CHARM = Item("Jimat Keberuntungan", ITEM_TYPE_EQUIPMENT, stat_bonus={"evasion": 5}, price=180, description="+5% Menghindar")
-CRIT_RING = Item("Cincin Kritis", ITEM_TYPE_EQUIPMENT, stat_bonus={"critical_damage": 10}, price=200, description="+10% Bonus Kerusakan Kritis")
+class AttackResult:
+    """
+    Hasil satu serangan. damage None berarti serangan meleset; loot diisi
+    (list, bisa kosong) jika target dikalahkan oleh pemain. Pesan baru
+    disusun saat message()/str() dipanggil, bukan saat menyerang.
+    """
+    __slots__ = ("attacker", "target", "style", "damage", "crit", "loot", "defended")
+    ok = True
 
-MAGIC_STAFF = Item("Tongkat Sihir", ITEM_TYPE_EQUIPMENT, stat_bonus={"attack": 7, "mp": 20}, price=200, description="Tongkat sihir, +7 Serangan & +20 MP")
-MYSTIC_ROBE = Item("Jubah Mistis", ITEM_TYPE_EQUIPMENT, stat_bonus={"defense": 3, "mp": 15}, price=250, description="Jubah penyihir, +3 Pertahanan & +15 MP")
-MAGIC_RING = Item("Cincin Sihir", ITEM_TYPE_EQUIPMENT, stat_bonus={"evasion": 4, "mp": 10}, price=150, description="Cincin sihir, +4% Hindaran & +10 MP")
+    def __init__(self, attacker, target, style, damage=None, crit=False):
+        self.attacker = attacker
+        self.target = target
+        self.style = style
+        self.damage = damage
+        self.crit = crit
+        self.loot = None
+        self.defended = False
+
+    @property
+    def missed(self):
+        return self.damage is None
+
+    @property
+    def defeated(self):
+        return self.loot is not None
+
+    def message(self):
+        name = self.attacker.name
+        if self.damage is None:
+            text = f"Serangan {name} meleset!" if self.style == ATTACK_NORMAL else f"Serangan spesial {name} meleset!"
+        elif self.loot is not None:
+            loot_str = ', '.join(item.name for item in self.loot) if self.loot else "tidak ada loot"
+            text = (f"{name} mengalahkan {self.target.name}! Mendapatkan {loot_str}. "
+                    f"Regenerasi 50 HP, 30 MP, dan 50 XP.")
+        elif self.crit:
+            text = f"Serangan Kritis! {name} memberikan {self.damage} kerusakan!"
+        elif self.style == ATTACK_NORMAL:
+            text = f"{name} menyerang dan memberikan {self.damage} kerusakan!"
+        else:
+            text = f"{name} menggunakan {ATTACK_LABELS[self.style]} dan memberikan {self.damage} kerusakan!"
+        if self.defended:
+            text += " (Bertahan!)"
+        return text
+
+    __str__ = message
+
+
+# Kode hasil aksi non-serangan (upgrade, perlengkapan, ramuan, bertahan, ...)
+RESULT_NO_MP = "no_mp"
+RESULT_DEFEND = "defend"
+RESULT_INVALID_ACTION = "invalid_action"
+RESULT_GAME_OVER = "game_over"
+RESULT_NO_UPGRADE_POINTS = "no_upgrade_points"
+RESULT_INVALID_STAT = "invalid_stat"
+RESULT_UPGRADED = "upgraded"
+RESULT_NOT_EQUIPMENT = "not_equipment"
+RESULT_ALREADY_EQUIPPED = "already_equipped"
+RESULT_NOT_IN_INVENTORY = "not_in_inventory"
+RESULT_EQUIPPED = "equipped"
+RESULT_INVALID_SLOT = "invalid_slot"
+RESULT_SLOT_EMPTY = "slot_empty"
+RESULT_UNEQUIPPED = "unequipped"
+RESULT_NOT_POTION = "not_potion"
+RESULT_REVIVED = "revived"
+RESULT_POTION_USED = "potion_used"
+
+# Penyusun pesan per kode; argumennya adalah values milik ActionResult
+RESULT_MESSAGES = {
+    RESULT_NO_MP: lambda: "MP tidak cukup untuk serangan spesial!",
+    RESULT_DEFEND: lambda player: f"{player.name} bersiap untuk bertahan!",
+    RESULT_INVALID_ACTION: lambda: "Aksi tidak valid.",
+    RESULT_GAME_OVER: lambda: GAME_OVER_MESSAGE,
+    RESULT_NO_UPGRADE_POINTS: lambda: "Tidak ada poin peningkatan yang tersedia.",
+    RESULT_INVALID_STAT: lambda: "Stat tidak valid.",
+    RESULT_UPGRADED: lambda stat, points: f"{stat.capitalize()} ditingkatkan! Poin tersisa: {points}",
+    RESULT_NOT_EQUIPMENT: lambda: "Tidak dapat melengkapi item ini.",
+    RESULT_ALREADY_EQUIPPED: lambda item, player: f"{item.name} sudah dilengkapi oleh {player.name}.",
+    RESULT_NOT_IN_INVENTORY: lambda item: f"{item.name} tidak tersedia di inventaris.",
+    RESULT_EQUIPPED: lambda item, slot: f"Melengkapi {item.name} di slot {slot}.",
+    RESULT_INVALID_SLOT: lambda: "Slot tidak valid.",
+    RESULT_SLOT_EMPTY: lambda slot: f"Tidak ada item yang terpasang di slot {slot}.",
+    RESULT_UNEQUIPPED: lambda item, slot: f"Item {item.name} dilepas dari slot {slot}.",
+    RESULT_NOT_POTION: lambda: "Item ini bukan ramuan.",
+    RESULT_REVIVED: lambda player: f"{player.name} dihidupkan kembali dengan 50% HP dan MP!",
+    RESULT_POTION_USED: lambda item: f"Menggunakan {item.name}.",
+}
+
+
+class ActionResult:
+    """
+    Hasil aksi non-serangan: kode RESULT_*, ok (aksi benar-benar terjadi),
+    dan nilai pendukung untuk pesannya. Pesan disusun saat ditampilkan.
+    """
+    __slots__ = ("code", "ok", "values")
+
+    def __init__(self, code, ok, *values):
+        self.code = code
+        self.ok = ok
+        self.values = values
+
+    def message(self):
+        return RESULT_MESSAGES[self.code](*self.values)
+
+    __str__ = message
 
 # Kelas untuk mengatur party (kelompok karakter)
 class Party:
-    def __init__(self, members=None):
+    def __init__(self, members=None, catalog=None):
         self.members = members if members else []
+        # Inventaris bersama: {item_id: jumlah}; objek Item dicari lewat catalog milik party sendiri
+        # (salinan ITEM_CATALOG) sehingga item baru tidak pernah masuk ke katalog global
+        self.catalog = catalog if catalog is not None else ItemCatalog(ITEM_CATALOG)
         self.inventory = {}
         self.gold = 0
+        # Indeks balik perlengkapan: {item_id: {(anggota, slot), ...}}
+        self.equipped_index = {}
+        for member in self.members:
+            self._adopt(member)
+        self.on_change = None
+        # on_item_change(item, jumlah_baru) agar daftar inventaris cukup memperbarui satu baris
+        self.on_item_change = None
+
+    def _changed(self, kind):
+        if self.on_change is not None:
+            self.on_change(self, kind)
+
+    def _item_changed(self, item):
+        if self.on_item_change is not None:
+            self.on_item_change(item, self.inventory.get(item.item_id, 0))
+        self._changed(CHANGE_INVENTORY)
 
     def add_gold(self, amount):
         self.gold += amount
+        self._changed(CHANGE_GOLD)
 
     def spend_gold(self, amount):
         if self.gold < amount:
             return False
         self.gold -= amount
+        self._changed(CHANGE_GOLD)
         return True
 
+    # Item yang belum dikenal katalog party (mis. jarahan buatan) didaftarkan saat pertama masuk;
+    # item berbeda dengan ID yang sama mendapat ID turunan unik
     def add_item(self, item, quantity=1):
-        self.inventory[item] = self.inventory.get(item, 0) + quantity
+        if self.catalog.get(item.item_id) is not item:
+            self.catalog.register(item)
+        self.inventory[item.item_id] = self.inventory.get(item.item_id, 0) + quantity
+        self._item_changed(item)
 
     def remove_item(self, item, quantity=1):
-        jumlah_sekarang = self.inventory.get(item, 0)
+        jumlah_sekarang = self.inventory.get(item.item_id, 0)
         if jumlah_sekarang < quantity:
             return False
-        self.inventory[item] = jumlah_sekarang - quantity
-        if self.inventory[item] <= 0:
-            del self.inventory[item]
+        self.inventory[item.item_id] = jumlah_sekarang - quantity
+        if self.inventory[item.item_id] <= 0:
+            del self.inventory[item.item_id]
+        self._item_changed(item)
         return True
 
+    def quantity(self, item):
+        return self.inventory.get(item.item_id, 0)
+
+    # Pasangan (Item, jumlah) untuk semua isi inventaris
+    def inventory_items(self):
+        catalog = self.catalog
+        return [(catalog[item_id], qty) for item_id, qty in self.inventory.items()]
+
     def total_members(self):
         return len(self.members)
 
     def is_item_equipped_by_any(self, item, excluding_member=None):
         """
         Memeriksa apakah item tertentu dilengkapi oleh anggota party mana pun,
-        opsional tidak termasuk anggota tertentu.
+        opsional tidak termasuk anggota tertentu. O(1) lewat equipped_index.
         """
-        for member in self.members:
-            if member == excluding_member:
-                continue
-            if item in member.equipped_items.values():
-                return True
-        return False
+        owners = self.equipped_index.get(item.item_id)
+        if not owners:
+            return False
+        if excluding_member is None:
+            return True
+        excluded = sum((excluding_member, slot) in owners for slot in EQUIPMENT_SLOTS)
+        return len(owners) > excluded
 
     def count_item_equipped(self, item):
         """
-        Menghitung berapa banyak item spesifik (berdasarkan objek) yang
-        saat ini dilengkapi oleh semua anggota party.
+        Menghitung berapa banyak item spesifik yang saat ini dilengkapi oleh
+        semua anggota party. O(1) lewat equipped_index.
         """
-        count = 0
-        for member in self.members:
-            for equipped_item in member.equipped_items.values():
-                if equipped_item == item:
-                    count += 1
-        return count
+        return len(self.equipped_index.get(item.item_id, ()))
+
+    def add_member(self, member):
+        self.members.append(member)
+        self._adopt(member)
+
+    # Menghubungkan anggota ke party dan mencatat perlengkapan yang sudah dipakainya
+    def _adopt(self, member):
+        member.party = self
+        for slot, item in member.equipped_items.items():
+            if item is not None:
+                self._record_equipped(member, slot, item)
+
+    # Dipanggil Player.equip_item / unequip_item untuk menjaga indeks balik
+    def _record_equipped(self, member, slot, item):
+        self.equipped_index.setdefault(item.item_id, set()).add((member, slot))
+
+    def _record_unequipped(self, member, slot, item):
+        owners = self.equipped_index.get(item.item_id)
+        if owners is not None:
+            owners.discard((member, slot))
+            if not owners:
+                del self.equipped_index[item.item_id]
 
     def get_living_members(self):
         return [member for member in self.members if member.is_alive]
 
+# Nama slot perlengkapan, sesuai urutan tampilan di UI
+EQUIPMENT_SLOTS = ("weapon", "armor", "accessory")
+
+# Tiga slot perlengkapan tetap dengan antarmuka seperti dict
+class EquipmentSlots:
+    __slots__ = EQUIPMENT_SLOTS
+
+    def __init__(self):
+        self.weapon = None
+        self.armor = None
+        self.accessory = None
+
+    def __getitem__(self, slot):
+        if slot not in EQUIPMENT_SLOTS:
+            raise KeyError(slot)
+        return getattr(self, slot)
+
+    def __setitem__(self, slot, item):
+        if slot not in EQUIPMENT_SLOTS:
+            raise KeyError(slot)
+        setattr(self, slot, item)
+
+    def __contains__(self, slot):
+        return slot in EQUIPMENT_SLOTS
+
+    def __iter__(self):
+        return iter(EQUIPMENT_SLOTS)
+
+    def get(self, slot, default=None):
+        return getattr(self, slot) if slot in EQUIPMENT_SLOTS else default
+
+    def keys(self):
+        return EQUIPMENT_SLOTS
+
+    def values(self):
+        return (self.weapon, self.armor, self.accessory)
+
+    def items(self):
+        return (("weapon", self.weapon), ("armor", self.armor), ("accessory", self.accessory))
+
 # Kelas dasar karakter (abstract)
 class Character(ABC):
-    def __init__(self, name, max_hp, max_mp, attack, defense, evasion):
+    __slots__ = ("rng", "_name", "_max_hp", "_hp", "_max_mp", "_mp", "_base_attack", "_base_defense",
+                 "_base_evasion", "_alive", "equipped_items", "_stats_cache", "on_change", "on_event")
+
+    def __init__(self, name, max_hp, max_mp, attack, defense, evasion, rng=None):
+        self.rng = rng or default_rng
         self._name = name
         self._max_hp = max_hp
         self._hp = max_hp
@@ -117,7 +619,10 @@ class Character(ABC):
         self._base_defense = defense
         self._base_evasion = evasion
         self._alive = True
-        self.equipped_items = {"weapon": None, "armor": None, "accessory": None}
+        self.equipped_items = EquipmentSlots()
+        self._stats_cache = None
+        self.on_change = None
+        self.on_event = None
 
     # Properti dasar karakter
     @property
@@ -132,43 +637,81 @@ class Character(ABC):
     def max_mp(self): return self._max_mp
     @property
     def attack_stat(self):
-        bonus = sum(item.stat_bonus.get("attack", 0) for item in self.equipped_items.values() if item)
-        return self._base_attack + bonus
+        return (self._stats_cache or self._derived_stats())[0]
     @property
     def defense_stat(self):
-        bonus = sum(item.stat_bonus.get("defense", 0) for item in self.equipped_items.values() if item)
-        return self._base_defense + bonus
+        return (self._stats_cache or self._derived_stats())[1]
     @property
     def evasion_stat(self):
-        bonus = sum(item.stat_bonus.get("evasion", 0) for item in self.equipped_items.values() if item)
-        return min(100, self._base_evasion + bonus)
+        return (self._stats_cache or self._derived_stats())[2]
     @property
     def is_alive(self): return self._alive
 
+    # Statistik turunan (dasar + perlengkapan) dihitung sekali lalu disimpan
+    # sampai invalidate_stats dipanggil (equip, unequip, naik level, upgrade)
+    def _derived_stats(self):
+        attack = defense = evasion = critical_damage = 0
+        for item in self.equipped_items.values():
+            if item:
+                bonus = item.stat_bonus
+                attack += bonus.get("attack", 0)
+                defense += bonus.get("defense", 0)
+                evasion += bonus.get("evasion", 0)
+                critical_damage += bonus.get("critical_damage", 0)
+        self._stats_cache = (
+            self._base_attack + attack,
+            self._base_defense + defense,
+            min(100, self._base_evasion + evasion),
+            critical_damage,
+        )
+        return self._stats_cache
+
+    def invalidate_stats(self):
+        self._stats_cache = None
+        self._changed(CHANGE_STATS)
+
+    # Memberi tahu pendengar (misalnya UI) bahwa bagian tertentu berubah
+    def _changed(self, kind):
+        if self.on_change is not None:
+            self.on_change(self, kind)
+
+    # Mengirim peristiwa pertarungan (misalnya ke log pertarungan)
+    def _emit(self, kind, *fields):
+        if self.on_event is not None:
+            self.on_event(kind, fields)
+
     # Fungsi menerima kerusakan
     def take_damage(self, damage):
+        was_alive = self._alive
         self._hp -= max(0, damage)
         if self._hp <= 0:
             self._hp = 0
             self._alive = False
+        self._changed(CHANGE_HP)
+        self._emit(EVENT_DAMAGE, self, damage, self._hp)
+        if was_alive and not self._alive:
+            self._emit(EVENT_DEFEAT, self)
 
     # Fungsi menyembuhkan karakter
     def heal(self, amount):
         if not self._alive:
             return
         self._hp = min(self._max_hp, self._hp + amount)
+        self._changed(CHANGE_HP)
 
     # Fungsi memulihkan MP
     def restore_mp(self, amount):
         self._mp = min(self._max_mp, self._mp + amount)
+        self._changed(CHANGE_MP)
 
     # Fungsi mengurangi MP
     def reduce_mp(self, amount):
         self._mp = max(0, self._mp - amount)
+        self._changed(CHANGE_MP)
 
     # Cek apakah karakter menghindar dari serangan
     def try_evade(self):
-        return random.randint(1, 100) <= self.evasion_stat
+        return self.rng.randint(1, 100) <= self.evasion_stat
 
     @abstractmethod
     def attack(self, target): pass
@@ -177,15 +720,21 @@ class Character(ABC):
 
 # Kelas karakter pemain
 class Player(Character):
-    def __init__(self, name="Hero"):
-        super().__init__(name, max_hp=100, max_mp=50, attack=20, defense=10, evasion=10)
+    __slots__ = ("xp", "level", "upgrade_points", "party")
+
+    def __init__(self, name="Hero", rng=None):
+        super().__init__(name, max_hp=100, max_mp=50, attack=20, defense=10, evasion=10, rng=rng)
         self.xp = 0
         self.level = 1
         self.upgrade_points = 0
+        # Party tempat pemain ini menjadi anggota (diisi oleh Party)
+        self.party = None
 
     # Tambah XP dan naik level
     def gain_xp(self, amount):
         self.xp += amount
+        if self.xp >= 100:
+            self.invalidate_stats()
         while self.xp >= 100:
             self.xp -= 100
             self.level += 1
@@ -197,55 +746,59 @@ class Player(Character):
             self._base_attack += 5
             self._base_defense += 5
             self._base_evasion = min(100, self._base_evasion + 5)
+            self._emit(EVENT_LEVEL_UP, self, self.level)
+        self._changed(CHANGE_LEVEL)
 
     # Hitung total bonus kerusakan kritis
     def total_critical_damage_bonus(self):
-        return sum(item.stat_bonus.get("critical_damage", 0) for item in self.equipped_items.values() if item)
+        return (self._stats_cache or self._derived_stats())[3]
 
     # Serangan biasa
     def attack(self, target):
+        self._emit(EVENT_ATTACK, self, target, False)
         if target.try_evade():
-            return f"Serangan {self.name} meleset!"
+            self._emit(EVENT_EVADE, self, target)
+            return AttackResult(self, target, ATTACK_NORMAL)
         damage = max(1, self.attack_stat - target.defense_stat)
-        if random.random() < 0.2:
+        crit = self.rng.random() < PLAYER_CRIT_CHANCE
+        if crit:
             crit_multiplier = 2 + (self.total_critical_damage_bonus() / 100)
             damage = int(damage * crit_multiplier)
-            target.take_damage(damage)
-            if not target.is_alive:
-                return self.handle_monster_defeat(target, damage, crit=True)
-            return f"Serangan Kritis! {self.name} memberikan {damage} kerusakan!"
+            self._emit(EVENT_CRIT, self, target, crit_multiplier)
         target.take_damage(damage)
+        result = AttackResult(self, target, ATTACK_NORMAL, damage, crit)
         if not target.is_alive:
-            return self.handle_monster_defeat(target, damage)
-        return f"{self.name} menyerang dan memberikan {damage} kerusakan!"
-
-    # Penanganan ketika monster dikalahkan
-    def handle_monster_defeat(self, monster, damage, crit=False):
-        self.heal(50)
-        self.restore_mp(30)
-        self.gain_xp(50)
-        loot = monster.drop_loot()
-        loot_str = ', '.join(item.name for item in loot) if loot else "tidak ada loot"
-        return f"{self.name} mengalahkan {monster.name}! Mendapatkan {loot_str}. Regenerasi 50 HP, 30 MP, dan 50 XP."
+            result.loot = self.handle_monster_defeat(target)
+        return result
+
+    # Penanganan ketika monster dikalahkan; mengembalikan loot yang dijatuhkan
+    def handle_monster_defeat(self, monster):
+        self.heal(KILL_HEAL)
+        self.restore_mp(KILL_MP_RESTORE)
+        self.gain_xp(KILL_XP)
+        return monster.drop_loot()
 
     # Serangan spesial
     def special_attack(self, target):
         mp_cost = 15
         if self._mp < mp_cost:
-            return "MP tidak cukup untuk serangan spesial!"
+            return ActionResult(RESULT_NO_MP, False)
         self.reduce_mp(mp_cost)
+        self._emit(EVENT_ATTACK, self, target, True)
         if target.try_evade():
-            return f"Serangan spesial {self.name} meleset!"
+            self._emit(EVENT_EVADE, self, target)
+            return AttackResult(self, target, ATTACK_SPECIAL)
         damage = max(1, (self.attack_stat * 2) - target.defense_stat)
         target.take_damage(damage)
+        result = AttackResult(self, target, ATTACK_SPECIAL, damage)
         if not target.is_alive:
-            return self.handle_monster_defeat(target, damage)
-        return f"{self.name} menggunakan SERANGAN SPESIAL dan memberikan {damage} kerusakan!"
+            result.loot = self.handle_monster_defeat(target)
+        return result
 
     # Peningkatan statistik karakter
     def upgrade_stat(self, stat):
         if self.upgrade_points <= 0:
-            return "Tidak ada poin peningkatan yang tersedia."
+            return ActionResult(RESULT_NO_UPGRADE_POINTS, False)
         if stat == "attack":
             self._base_attack += 5
         elif stat == "defense":
@@ -259,78 +812,90 @@ class Player(Character):
             self._max_hp += 10
             self.heal(10)
         else:
-            return "Stat tidak valid."
+            return ActionResult(RESULT_INVALID_STAT, False)
         self.upgrade_points -= 1
-        return f"{stat.capitalize()} ditingkatkan! Poin tersisa: {self.upgrade_points}"
+        self.invalidate_stats()
+        self._changed(CHANGE_LEVEL)
+        return ActionResult(RESULT_UPGRADED, True, stat, self.upgrade_points)
 
     # Melengkapi item ke karakter
     def equip_item(self, item, party):
         # Memastikan item adalah tipe perlengkapan
         if item.item_type != ITEM_TYPE_EQUIPMENT:
-            return "Tidak dapat melengkapi item ini."
+            return ActionResult(RESULT_NOT_EQUIPMENT, False)
 
         # Memastikan item spesifik ini belum dilengkapi oleh karakter ini
         if item in self.equipped_items.values():
-            return f"{item.name} sudah dilengkapi oleh {self.name}."
+            return ActionResult(RESULT_ALREADY_EQUIPPED, False, item, self)
 
         # Memeriksa ketersediaan item di inventaris partai (yang belum dilengkapi)
         # Jika kuantitas item di inventaris adalah 0, berarti tidak ada item yang tersedia untuk dilengkapi.
-        inventory_qty = party.inventory.get(item, 0)
+        inventory_qty = party.quantity(item)
         if inventory_qty == 0:
-            return f"{item.name} tidak tersedia di inventaris."
+            return ActionResult(RESULT_NOT_IN_INVENTORY, False, item)
 
         # Menentukan slot item berdasarkan bonus statistik
-        if "attack" in item.stat_bonus:
-            slot = "weapon"
-        elif "defense" in item.stat_bonus:
-            slot = "armor"
-        else: # Item yang tidak memiliki bonus serangan atau pertahanan akan masuk slot aksesori
-            slot = "accessory"
+        slot = get_item_slot(item)
 
         # Melepas item lama dari slot jika ada dan mengembalikannya ke inventaris partai
-        if self.equipped_items[slot] is not None:
-            party.add_item(self.equipped_items[slot], 1)
+        old_item = self.equipped_items[slot]
+        if old_item is not None:
+            party.add_item(old_item, 1)
+            if self.party is not None:
+                self.party._record_unequipped(self, slot, old_item)
 
         # Melengkapi item baru ke karakter
         self.equipped_items[slot] = item
+        if self.party is not None:
+            self.party._record_equipped(self, slot, item)
+        self.invalidate_stats()
+        self._changed(CHANGE_EQUIPMENT)
         # Mengurangi item dari inventaris partai karena sudah dilengkapi
         party.remove_item(item, 1)
-        return f"Melengkapi {item.name} di slot {slot}."
+        return ActionResult(RESULT_EQUIPPED, True, item, slot)
 
     # Melepas perlengkapan dari slot
     def unequip_item(self, slot, party=None):
         if slot not in self.equipped_items:
-            return "Slot tidak valid."
+            return ActionResult(RESULT_INVALID_SLOT, False)
         if self.equipped_items[slot] is None:
-            return f"Tidak ada item yang terpasang di slot {slot}."
+            return ActionResult(RESULT_SLOT_EMPTY, False, slot)
         removed_item = self.equipped_items[slot]
         self.equipped_items[slot] = None
+        if self.party is not None:
+            self.party._record_unequipped(self, slot, removed_item)
+        self.invalidate_stats()
+        self._changed(CHANGE_EQUIPMENT)
         if party is not None:
             party.add_item(removed_item, 1) # Tambahkan item yang dilepas kembali ke inventaris party
-        return f"Item {removed_item.name} dilepas dari slot {slot}."
+        return ActionResult(RESULT_UNEQUIPPED, True, removed_item, slot)
 
     # Menggunakan ramuan
     def use_potion(self, item, party=None):
         if item.item_type != ITEM_TYPE_POTION:
-            return "Item ini bukan ramuan."
+            return ActionResult(RESULT_NOT_POTION, False)
         # Logika khusus untuk ramuan kebangkitan
         if item.name == "Ramuan Kebangkitan" and not self.is_alive:
             self._alive = True
             self._hp = self._max_hp // 2
             self._mp = self._max_mp // 2
-            return f"{self.name} dihidupkan kembali dengan 50% HP dan MP!"
+            self._changed(CHANGE_HP)
+            self._changed(CHANGE_MP)
+            return ActionResult(RESULT_REVIVED, True, self)
         # Menggunakan ramuan penyembuh HP
         if item.heal_amount > 0:
             self.heal(item.heal_amount)
         # Menggunakan ramuan pemulih MP
         if item.mp_restore > 0:
             self.restore_mp(item.mp_restore)
-        return f"Menggunakan {item.name}."
+        return ActionResult(RESULT_POTION_USED, True, item)
 
 # Kelas turunan dari Player: Sage (ahli sihir)
 class Sage(Player):
-    def __init__(self, name="Sage"):
-        super().__init__(name)
+    __slots__ = ()
+
+    def __init__(self, name="Sage", rng=None):
+        super().__init__(name, rng=rng)
         # Sesuaikan statistik awal untuk Sage
         self._max_hp = 80
         self._hp = 80
@@ -339,90 +904,524 @@ class Sage(Player):
         self._base_attack = 15
         self._base_defense = 8
         self._base_evasion = 12
+        self.invalidate_stats()
 
     # Serangan spesial untuk karakter Sage
     def special_attack(self, target):
         mp_cost = 20
         if self._mp < mp_cost:
-            return "MP tidak cukup untuk serangan spesial!"
+            return ActionResult(RESULT_NO_MP, False)
         self.reduce_mp(mp_cost)
+        self._emit(EVENT_ATTACK, self, target, True)
         if target.try_evade():
-            return f"Serangan spesial {self.name} meleset!"
+            self._emit(EVENT_EVADE, self, target)
+            return AttackResult(self, target, ATTACK_SAGE)
         damage = max(1, (self.attack_stat * 2.5) - target.defense_stat)
         target.take_damage(damage)
+        result = AttackResult(self, target, ATTACK_SAGE, damage)
         if not target.is_alive:
-            return self.handle_monster_defeat(target, damage)
-        return f"{self.name} menggunakan SERANGAN SAGE SPESIAL dan memberikan {damage} kerusakan!"
+            result.loot = self.handle_monster_defeat(target)
+        return result
 
 # Kelas musuh biasa (monster)
 class Monster(Character):
-    def __init__(self, name, stage):
-        # Statistik dasar monster berdasarkan level tahap (stage)
-        base_hp = 50 + (stage * 10)
-        base_mp = 30 + (stage * 5)
-        base_attack = 15 + (stage * 5)
-        base_defense = 8 + (stage * 3)
-        base_evasion = min(50, 10 + (stage * 2))  # Hindaran maksimum 50%
-        super().__init__(name, base_hp, base_mp, base_attack, base_defense, base_evasion)
+    __slots__ = ("stage",)
+    # Nama jenis di "monsters" / "loot_tables" paket konten
+    kind = "regular"
+
+    def __init__(self, name, stage, rng=None):
+        super().__init__(name, *self.base_stats(stage), rng=rng)
+        self.stage = stage
+
+    # Statistik dasar monster berdasarkan level tahap (stage), dari kurva paket konten:
+    # (hp, mp, serangan, pertahanan, hindaran)
+    @classmethod
+    def base_stats(cls, stage):
+        return monster_base_stats(cls.kind, stage)
 
     # Serangan biasa monster ke target
     def attack(self, target):
+        self._emit(EVENT_ATTACK, self, target, False)
         if target.try_evade():
-            return f"Serangan {self._name} meleset!"
+            self._emit(EVENT_EVADE, self, target)
+            return AttackResult(self, target, ATTACK_NORMAL)
         damage = max(1, self.attack_stat - target.defense_stat)
         target.take_damage(damage)
-        return f"{self._name} menyerang dan memberikan {damage} kerusakan!"
+        return AttackResult(self, target, ATTACK_NORMAL, damage)
 
     # Serangan spesial monster, dengan peluang 25%
     def special_attack(self, target):
-        if random.random() > 0.25: # 25% kemungkinan serangan spesial
+        if self.rng.random() > MONSTER_SPECIAL_CHANCE: # 25% kemungkinan serangan spesial
             return self.attack(target)
+        self._emit(EVENT_ATTACK, self, target, True)
         if target.try_evade():
-            return f"Serangan spesial {self._name} meleset!"
+            self._emit(EVENT_EVADE, self, target)
+            return AttackResult(self, target, ATTACK_SPECIAL)
         damage = max(1, int(self.attack_stat * 1.5) - target.defense_stat)
         target.take_damage(damage)
-        return f"{self._name} menggunakan SERANGAN SPESIAL dan memberikan {damage} kerusakan!"
+        return AttackResult(self, target, ATTACK_SPECIAL, damage)
 
-    # Drop loot saat monster dikalahkan
+    # Drop loot saat monster dikalahkan; peluang dan isi tabel dari paket konten
+    # (chance 1 berarti drop pasti, extra_chance untuk drop kedua)
     def drop_loot(self):
-        if random.random() <= 0.5:  # 50% kemungkinan drop
-            loot_table = [HEALTH_POTION, MP_POTION, WOODEN_SWORD, LEATHER_ARMOR, LUCKY_CHARM, CRIT_RING]
-            return [random.choice(loot_table)]
-        return []
+        table = loot_table(self.kind, self.stage)
+        if table.chance < 1 and self.rng.random() > table.chance:
+            return []
+        drops = [table.draw(self.rng)]
+        if table.extra_chance > 0 and self.rng.random() <= table.extra_chance:
+            drops.append(table.draw(self.rng))
+        return drops
 
 # Kelas monster boss, lebih kuat dari monster biasa
 class BossMonster(Monster):
-    def __init__(self, name, stage):
-        # Statistik dasar bos yang jauh lebih tinggi
-        base_hp = 120 + (stage * 30)
-        base_mp = 80 + (stage * 15)
-        base_attack = 30 + (stage * 15)
-        base_defense = 20 + (stage * 10)
-        base_evasion = min(70, 30 + (stage * 5))  # Hindaran maksimum 70%
-        Character.__init__(self, name, base_hp, base_mp, base_attack, base_defense, base_evasion)
+    __slots__ = ()
+    # Statistik dasar dan loot bos yang jauh lebih tinggi
+    kind = "boss"
 
     # Serangan spesial boss, sangat kuat
     def special_attack(self, target):
-        mp_cost = 20
-        if self._mp < mp_cost:
+        if self._mp < BOSS_SPECIAL_MP_COST:
             return self.attack(target)
-        self.reduce_mp(mp_cost)
+        self.reduce_mp(BOSS_SPECIAL_MP_COST)
+        self._emit(EVENT_ATTACK, self, target, True)
         damage = max(1, (self.attack_stat * 3) - target.defense_stat)
         target.take_damage(damage)
-        return f"{self._name} menggunakan SERANGAN SPESIAL BOSS dan memberikan {damage} kerusakan!"
+        return AttackResult(self, target, ATTACK_BOSS, damage)
 
-    # Loot lebih banyak dan lebih berharga
-    def drop_loot(self):
-        loot_table = [
-            IRON_SWORD,
-            CHAINMAIL_ARMOR,
-            LUCKY_CHARM,
-            HEALTH_POTION,
-            MP_POTION,
-            CRIT_RING,
-            REVIVE_POTION
-        ]
-        drops = [random.choice(loot_table)]
-        if random.random() <= 0.7:  # 70% kemungkinan dapat drop tambahan
-            drops.append(random.choice(loot_table))
+# Kumpulan monster dalam bentuk array paralel (struct-of-arrays)
+class MonsterPool:
+    """
+    Menyimpan HP/MP/serangan/pertahanan/hindaran/status hidup banyak monster
+    sebagai list paralel, untuk mode gelombang (horde) dengan ratusan musuh.
+    pool[i] mengembalikan PooledMonster, tampilan ringan yang berperilaku
+    seperti Monster/BossMonster sehingga bisa menjadi target Player.attack
+    dan dipakai oleh BattleEngine maupun UI. Indeks berubah setelah compact().
+    """
+    def __init__(self, rng=None):
+        self.rng = rng or default_rng
+        self.names = []
+        self.boss = bytearray()
+        self.stages = []
+        self.hp = []
+        self.max_hp = []
+        self.mp = []
+        self.max_mp = []
+        self.attack = []
+        self.defense = []
+        self.evasion = []
+        self.alive = bytearray()
+        # Jumlah monster yang sudah dibuang oleh compact(), per (boss, tahap)
+        self.removed = Counter()
+        self.on_change = None
+        self.on_event = None
+
+    @classmethod
+    def from_monsters(cls, monsters, rng=None):
+        pool = cls(rng)
+        for m in monsters:
+            pool._append(m.name, isinstance(m, BossMonster), m.stage, m.hp, m.max_hp, m.mp, m.max_mp,
+                         m.attack_stat, m.defense_stat, m.evasion_stat, m.is_alive)
+        return pool
+
+    def _append(self, name, boss, stage, hp, max_hp, mp, max_mp, attack, defense, evasion, alive=True):
+        self.names.append(name)
+        self.boss.append(boss)
+        self.stages.append(stage)
+        self.hp.append(hp)
+        self.max_hp.append(max_hp)
+        self.mp.append(mp)
+        self.max_mp.append(max_mp)
+        self.attack.append(attack)
+        self.defense.append(defense)
+        self.evasion.append(evasion)
+        self.alive.append(alive)
+        return len(self.names) - 1
+
+    # Menambah monster baru dengan statistik Monster/BossMonster untuk tahap tersebut
+    def add(self, name, stage, boss=False):
+        hp, mp, attack, defense, evasion = (BossMonster if boss else Monster).base_stats(stage)
+        return self._append(name, boss, stage, hp, hp, mp, mp, attack, defense, evasion)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if not -len(self.names) <= index < len(self.names):
+            raise IndexError(index)
+        return PooledMonster(self, index % len(self.names))
+
+    def __iter__(self):
+        return (PooledMonster(self, i) for i in range(len(self.names)))
+
+    def living_indices(self):
+        alive = self.alive
+        return [i for i in range(len(alive)) if alive[i]]
+
+    def living(self):
+        return [PooledMonster(self, i) for i in self.living_indices()]
+
+    def count_alive(self):
+        return self.alive.count(1)
+
+    # Membuang monster yang sudah mati; mengembalikan jumlah yang dibuang
+    def compact(self):
+        keep = self.living_indices()
+        removed = len(self.names) - len(keep)
+        if not removed:
+            return 0
+        self.removed.update((bool(self.boss[i]), self.stages[i]) for i in range(len(self.names))
+                            if not self.alive[i])
+        for field in ("names", "stages", "hp", "max_hp", "mp", "max_mp", "attack", "defense", "evasion"):
+            values = getattr(self, field)
+            setattr(self, field, [values[i] for i in keep])
+        self.boss = bytearray(self.boss[i] for i in keep)
+        self.alive = bytearray(self.alive[i] for i in keep)
+        if self.on_change is not None:
+            self.on_change(self, CHANGE_HP)
+        return removed
+
+    # Loot untuk semua monster dalam pool, termasuk yang sudah di-compact
+    def drop_all_loot(self):
+        drops = []
+        for m in self:
+            drops.extend(m.drop_loot())
+        # Monster biasa dulu, lalu boss
+        for (boss, stage), count in sorted(self.removed.items()):
+            probe = PooledMonster(self, None, boss=boss, stage=stage)
+            for _ in range(count):
+                drops.extend(probe.drop_loot())
         return drops
+
+# Tampilan satu monster di dalam MonsterPool
+class PooledMonster(Monster):
+    """
+    Membaca dan menulis statistik langsung ke array MonsterPool. Atribut
+    internal Character (_hp, _mp, _alive, ...) dipetakan ke array, sehingga
+    logika serangan Monster/BossMonster dipakai tanpa salinan.
+    """
+    __slots__ = ("pool", "index", "_boss")
+
+    def __init__(self, pool, index, boss=None, stage=None):
+        self.pool = pool
+        self.index = index
+        self._boss = pool.boss[index] if boss is None else boss
+        self.stage = pool.stages[index] if stage is None else stage
+
+    def __eq__(self, other):
+        return isinstance(other, PooledMonster) and other.pool is self.pool and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.pool), self.index))
+
+    @property
+    def rng(self): return self.pool.rng
+    @property
+    def kind(self): return BossMonster.kind if self._boss else Monster.kind
+    @property
+    def on_event(self): return self.pool.on_event
+    @property
+    def _name(self): return self.pool.names[self.index]
+    @property
+    def _max_hp(self): return self.pool.max_hp[self.index]
+    @property
+    def _max_mp(self): return self.pool.max_mp[self.index]
+    @property
+    def attack_stat(self): return self.pool.attack[self.index]
+    @property
+    def defense_stat(self): return self.pool.defense[self.index]
+    @property
+    def evasion_stat(self): return self.pool.evasion[self.index]
+
+    @property
+    def _hp(self): return self.pool.hp[self.index]
+    @_hp.setter
+    def _hp(self, value): self.pool.hp[self.index] = value
+
+    @property
+    def _mp(self): return self.pool.mp[self.index]
+    @_mp.setter
+    def _mp(self, value): self.pool.mp[self.index] = value
+
+    @property
+    def _alive(self): return bool(self.pool.alive[self.index])
+    @_alive.setter
+    def _alive(self, value): self.pool.alive[self.index] = bool(value)
+
+    def invalidate_stats(self):
+        pass
+
+    def _changed(self, kind):
+        if self.pool.on_change is not None:
+            self.pool.on_change(self, kind)
+
+    def special_attack(self, target):
+        if self._boss:
+            return BossMonster.special_attack(self, target)
+        return Monster.special_attack(self, target)
+
+# Fase pertarungan yang dipakai BattleEngine
+PHASE_PLAYER = "player"
+PHASE_MONSTER = "monster"
+PHASE_WON = "won"
+PHASE_LOST = "lost"
+
+# Jenis aksi pemain
+ACTION_ATTACK = "attack"
+ACTION_SPECIAL = "special"
+ACTION_DEFEND = "defend"
+
+GAME_OVER_MESSAGE = "Semua pemain telah mati. Permainan berakhir."
+
+# Aliran untuk satu entitas: turunan dari rng, atau aliran baru dari default_rng.fork() jika rng
+# tidak diberikan (kunci spawn tetap di atas default_rng akan memberi aliran yang sama ke setiap pemanggil)
+def _entity_rng(rng, key):
+    return rng.spawn(key) if rng is not None else default_rng.fork()
+
+# Membuat party awal (Hero + Sage dengan 200 emas)
+def create_default_party(rng=None):
+    party = Party(members=[Player(rng=_entity_rng(rng, "Hero")), Sage(rng=_entity_rng(rng, "Sage"))])
+    party.gold = 200
+    return party
+
+# Membuat daftar monster untuk sebuah tahap (setiap tahap ke-3 adalah boss)
+def create_stage_monsters(stage, rng=None):
+    if stage % 3 == 0:
+        boss_stage_num = stage // 3
+        return [BossMonster(f"Boss Tahap {boss_stage_num}", stage=boss_stage_num, rng=_entity_rng(rng, "boss"))]
+    monster_count = 1 if stage == 1 else 2
+    return [Monster(f"Monster #{i + 1}", stage=stage, rng=_entity_rng(rng, i)) for i in range(monster_count)]
+
+# Membuat gelombang (horde) monster dalam MonsterPool; boss ikut di setiap tahap ke-3
+def create_stage_wave(stage, count, rng=None):
+    pool = MonsterPool(rng)
+    for i in range(count):
+        pool.add(f"Monster #{i + 1}", stage)
+    if stage % 3 == 0:
+        pool.add(f"Boss Tahap {stage // 3}", stage // 3, boss=True)
+    return pool
+
+# Strategi bawaan untuk simulasi: serang monster hidup pertama
+def default_battle_policy(engine, player):
+    return ACTION_ATTACK, engine.living_monsters()[0]
+
+# AI monster bawaan: target acak dan serangan spesial 20%, dilempar dari battle_rng.
+# AI lain (lihat monster_ai.py) cukup menyediakan choose(engine, monster, living_players)
+# yang mengembalikan (target, pakai_spesial).
+class RandomMonsterAI:
+    def __init__(self, special_chance=MONSTER_AI_SPECIAL_CHANCE):
+        self.special_chance = special_chance
+
+    def choose(self, engine, monster, living_players):
+        target = engine.battle_rng.choice(living_players)
+        return target, engine.battle_rng.random() < self.special_chance
+
+# Mesin pertarungan tanpa Tk
+class BattleEngine:
+    """
+    Menjalankan alur pertarungan (urutan giliran, bertahan, dan hadiah
+    end_battle) tanpa ketergantungan pada Tk. UI hanya menampilkan hasilnya,
+    sedangkan simulasi bisa memanggil play_battle secara langsung.
+    Semua lemparan dadu berasal dari rng; setiap pertarungan memakai aliran
+    turunan sendiri sehingga satu seed selalu menghasilkan run yang sama.
+    """
+    def __init__(self, party=None, stage=1, rng=None, wave_size=0, monster_ai=None):
+        self.rng = rng or GameRNG()
+        self.party = party if party else create_default_party(self.rng.spawn("party-0"))
+        self.stage = stage
+        self.battle_count = 0
+        self.battle_rng = self.rng
+        # Jika diisi, setiap tahap memunculkan gelombang monster dalam MonsterPool
+        self.wave_size = wave_size
+        self.monsters = []
+        self.current_player_index = 0
+        self.player_defending = False
+        self.phase = PHASE_PLAYER
+        # on_event(kind, fields) menerima peristiwa pertarungan; atur lewat set_event_handler
+        self.on_event = None
+        # Penentu target dan jenis serangan setiap monster
+        self.monster_ai = monster_ai or RandomMonsterAI()
+
+    @property
+    def current_player(self):
+        return self.party.members[self.current_player_index]
+
+    def living_monsters(self):
+        if isinstance(self.monsters, MonsterPool):
+            return self.monsters.living()
+        return [m for m in self.monsters if m.is_alive]
+
+    def is_over(self):
+        return self.phase in (PHASE_WON, PHASE_LOST)
+
+    # Memasang handler peristiwa untuk engine, party, dan monster
+    def set_event_handler(self, handler):
+        self.on_event = handler
+        self._bind_events()
+
+    # Meneruskan handler peristiwa ke party dan monster pertarungan saat ini
+    def _bind_events(self):
+        for member in self.party.members:
+            member.on_event = self.on_event
+        if isinstance(self.monsters, MonsterPool):
+            self.monsters.on_event = self.on_event
+        else:
+            for monster in self.monsters:
+                monster.on_event = self.on_event
+
+    def _emit(self, kind, *fields):
+        if self.on_event is not None:
+            self.on_event(kind, fields)
+
+    # Memulai tahap baru dan mengembalikan pesan kemunculan monster
+    def start_stage(self):
+        self.player_defending = False
+        self.battle_count += 1
+        self.battle_rng = self.rng.spawn(f"battle-{self.battle_count}")
+        monster_rng = self.battle_rng.spawn("monsters")
+        if self.wave_size:
+            self.monsters = create_stage_wave(self.stage, self.wave_size, monster_rng)
+        else:
+            self.monsters = create_stage_monsters(self.stage, monster_rng)
+        self.current_player_index = 0
+        self.phase = PHASE_PLAYER
+        self._bind_events()
+        self._emit(EVENT_BATTLE_START, self.battle_count, self.stage, len(self.monsters))
+        if self.wave_size:
+            return f"Gelombang {len(self.monsters)} monster muncul!"
+        if self.stage % 3 == 0:
+            return "BOSS yang kuat muncul!"
+        return f"{len(self.monsters)} monster liar muncul!"
+
+    # Party dan tahap kembali ke awal; pertarungan berikutnya dimulai pemanggil lewat start_stage
+    def reset_game(self):
+        self.stage = 1
+        self.party = create_default_party(self.rng.spawn(f"party-{self.battle_count}"))
+
+    # Lewati pemain yang sudah mati mulai dari indeks saat ini
+    def _skip_dead_players(self):
+        members = self.party.members
+        while self.current_player_index < len(members) and not members[self.current_player_index].is_alive:
+            self.current_player_index += 1
+
+    # Pemain hidup berikutnya yang mendapat giliran (None jika semua mati)
+    def next_player(self):
+        self._skip_dead_players()
+        if self.current_player_index >= len(self.party.members):
+            return None
+        return self.current_player
+
+    def perform_action(self, player, action, target=None):
+        if action == ACTION_ATTACK:
+            return player.attack(target)
+        if action == ACTION_SPECIAL:
+            return player.special_attack(target)
+        if action == ACTION_DEFEND:
+            self.player_defending = True
+            return ActionResult(RESULT_DEFEND, True, player)
+        return ActionResult(RESULT_INVALID_ACTION, False)
+
+    # Giliran satu pemain; fase berikutnya disimpan di self.phase
+    def execute_player_turn(self, action, target=None):
+        if self.next_player() is None:
+            self.phase = PHASE_LOST
+            return ActionResult(RESULT_GAME_OVER, False)
+
+        result = self.perform_action(self.current_player, action, target)
+
+        if not self.living_monsters():
+            self.phase = PHASE_WON
+            return result
+
+        self.current_player_index += 1
+        if self.next_player() is None:
+            self.current_player_index = 0
+            if self.next_player() is None:
+                self.phase = PHASE_LOST
+                return result
+            self.phase = PHASE_MONSTER
+        else:
+            self.phase = PHASE_PLAYER
+        return result
+
+    # Giliran semua monster yang masih hidup
+    def execute_monster_turn(self):
+        turn_results = []
+        living_players = self.party.get_living_members()
+        if not living_players:
+            self.phase = PHASE_LOST
+            return turn_results
+
+        # Buang monster mati dari pool jika lebih dari separuhnya sudah kalah
+        pool = self.monsters
+        if isinstance(pool, MonsterPool) and pool.count_alive() * 2 < len(pool):
+            pool.compact()
+
+        for monster in self.living_monsters():
+            target, special = self.monster_ai.choose(self, monster, living_players)
+
+            action = monster.special_attack if special else monster.attack
+            result = action(target)
+
+            if self.player_defending and target == self.party.members[self.current_player_index]:
+                result.defended = True
+
+            turn_results.append(result)
+
+            living_players = self.party.get_living_members()
+            if not living_players:
+                self.phase = PHASE_LOST
+                return turn_results
+
+        self.player_defending = False
+        self.phase = PHASE_PLAYER
+        return turn_results
+
+    # Memberikan hadiah jika menang; mengembalikan (xp, emas, jarahan) atau None
+    def end_battle(self, won):
+        if not won:
+            self._emit(EVENT_BATTLE_END, self.battle_count, self.stage, False, 0, 0)
+            return None
+        xp_earned = 50 * self.stage
+        gold_earned = 75 * self.stage
+
+        for p in self.party.members:
+            p.gain_xp(xp_earned)
+
+        self.party.add_gold(gold_earned)
+
+        if isinstance(self.monsters, MonsterPool):
+            all_drops = self.monsters.drop_all_loot()
+        else:
+            all_drops = sum([m.drop_loot() for m in self.monsters], [])
+        for item in all_drops:
+            self.party.add_item(item)
+        if all_drops:
+            self._emit(EVENT_LOOT, tuple(item.item_id for item in all_drops))
+        self._emit(EVENT_BATTLE_END, self.battle_count, self.stage, True, xp_earned, gold_earned)
+
+        self.stage += 1
+        return xp_earned, gold_earned, all_drops
+
+    def play_battle(self, policy=None, max_turns=10000):
+        """
+        Memainkan pertarungan saat ini sampai selesai tanpa jeda.
+        policy(engine, player) mengembalikan (aksi, target). Pertarungan yang
+        melewati max_turns dianggap kalah. Mengembalikan True jika menang.
+        """
+        policy = policy or default_battle_policy
+        turns = 0
+        while not self.is_over():
+            turns += 1
+            if turns > max_turns:
+                self.phase = PHASE_LOST
+                break
+            if self.phase == PHASE_MONSTER:
+                self.execute_monster_turn()
+                continue
+            player = self.next_player()
+            if player is None:
+                self.phase = PHASE_LOST
+                break
+            action, target = policy(self, player)
+            self.execute_player_turn(action, target)
+        return self.phase == PHASE_WON
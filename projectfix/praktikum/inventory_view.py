@@ -0,0 +1,259 @@
+"""
+Daftar inventaris tervirtualisasi untuk party dengan ribuan item berbeda.
+
+InventoryIndex menyimpan urutan item yang sudah terurut dan tersaring
+(berdasarkan jenis dan statistik) dan memperbaruinya per item dengan bisect.
+VirtualListbox hanya memformat baris yang terlihat di layar; perubahan
+jumlah satu item hanya menggambar ulang baris itu.
+"""
+import tkinter as tk
+from bisect import bisect_left
+
+from game_logic import ITEM_TYPE_EQUIPMENT, ITEM_TYPE_POTION
+
+# Statistik yang bisa dipakai untuk menyaring dan mengurutkan (nama -> label)
+ITEM_STATS = {
+    "attack": "Serangan",
+    "defense": "Pertahanan",
+    "evasion": "Hindaran",
+    "mp": "MP",
+    "critical_damage": "Kritis",
+    "heal_amount": "Penyembuhan",
+    "mp_restore": "Pemulihan MP",
+}
+
+SORT_BY_NAME = "name"
+SORT_BY_TYPE = "type"
+SORT_BY_PRICE = "price"
+
+# Pilihan saringan dan urutan untuk UI (label -> nilai)
+ITEM_TYPE_FILTERS = {"Semua": None, "Ramuan": ITEM_TYPE_POTION, "Perlengkapan": ITEM_TYPE_EQUIPMENT}
+STAT_FILTERS = {"Semua": None, **{label: stat for stat, label in ITEM_STATS.items()}}
+SORT_OPTIONS = {"Nama": SORT_BY_NAME, "Jenis": SORT_BY_TYPE, "Harga": SORT_BY_PRICE,
+                **{label: stat for stat, label in ITEM_STATS.items()}}
+
+
+# Nilai statistik item; ramuan memakai heal_amount / mp_restore
+def item_stat(item, stat):
+    if stat == "heal_amount":
+        return item.heal_amount
+    if stat == "mp_restore":
+        return item.mp_restore
+    return item.stat_bonus.get(stat, 0)
+
+
+# Kunci urut: nama naik, atau jenis / harga / statistik (nilai terbesar dulu)
+def item_sort_key(item, sort_by):
+    if sort_by == SORT_BY_NAME:
+        return (item.name,)
+    if sort_by == SORT_BY_TYPE:
+        return (item.item_type, item.name)
+    if sort_by == SORT_BY_PRICE:
+        return (-item.price, item.name)
+    return (-item_stat(item, sort_by), item.name)
+
+
+def format_inventory_row(item, qty):
+    return f"{item.name} x{qty} - {item.description}"
+
+
+class InventoryIndex:
+    """
+    Indeks terurut atas party.inventory. rows[i] adalah ID item pada baris
+    ke-i; objek Item-nya diambil dari catalog. update(item, qty)
+    mengembalikan (aksi, baris) dengan aksi "insert", "delete" atau
+    "update", atau None jika item tidak lolos saringan.
+    """
+    def __init__(self, inventory, catalog, item_type=None, stat=None, sort_by=SORT_BY_NAME):
+        self.inventory = inventory
+        self.catalog = catalog
+        self.item_type = item_type
+        self.stat = stat
+        self.sort_by = sort_by
+        self.rows = []
+        self._keys = []
+        self.rebuild()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def matches(self, item):
+        if self.item_type is not None and item.item_type != self.item_type:
+            return False
+        if self.stat is not None and item_stat(item, self.stat) <= 0:
+            return False
+        return True
+
+    def rebuild(self):
+        items = (self.catalog[item_id] for item_id in self.inventory)
+        self._keys = sorted(self._key(item) for item in items if self.matches(item))
+        self.rows = [key[2] for key in self._keys]
+
+    def set_filter(self, item_type=None, stat=None):
+        self.item_type = item_type
+        self.stat = stat
+        self.rebuild()
+
+    def set_sort(self, sort_by):
+        self.sort_by = sort_by
+        self.rebuild()
+
+    def _key(self, item):
+        return item_sort_key(item, self.sort_by), item.name, item.item_id
+
+    def position(self, item):
+        key = self._key(item)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return i
+        return -1
+
+    def update(self, item, qty):
+        if not self.matches(item):
+            return None
+        i = self.position(item)
+        if qty <= 0:
+            if i < 0:
+                return None
+            del self._keys[i]
+            del self.rows[i]
+            return "delete", i
+        if i >= 0:
+            return "update", i
+        key = self._key(item)
+        i = bisect_left(self._keys, key)
+        self._keys.insert(i, key)
+        self.rows.insert(i, item.item_id)
+        return "insert", i
+
+
+class VirtualListbox(tk.Frame):
+    """
+    Listbox dengan jumlah baris tetap (visible_rows) yang menampilkan jendela
+    geser atas row_count baris. Teks baris diminta lewat format_row(i) hanya
+    untuk baris yang sedang terlihat.
+    """
+    def __init__(self, parent, format_row, visible_rows=15, empty_text="", **listbox_options):
+        super().__init__(parent, bg=listbox_options.get("bg"))
+        self.format_row = format_row
+        self.visible_rows = visible_rows
+        self.empty_text = empty_text
+        self.row_count = 0
+        self.offset = 0
+        self.selected = None
+        self.shown = [None] * visible_rows
+
+        self.listbox = tk.Listbox(self, height=visible_rows, activestyle="none", exportselection=False,
+                                  **listbox_options)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox.insert(tk.END, *([""] * visible_rows))
+
+        self.listbox.bind("<<ListboxSelect>>", self.on_select)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll_by(-1))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll_by(1))
+
+    def set_row_count(self, count):
+        self.row_count = count
+        self.offset = max(0, min(self.offset, count - self.visible_rows))
+        if self.selected is not None and self.selected >= count:
+            self.selected = None
+        self.render()
+
+    # Menggambar ulang semua baris yang terlihat (paling banyak visible_rows)
+    def render(self):
+        for slot in range(self.visible_rows):
+            self.render_slot(slot)
+        self.update_scrollbar()
+
+    def render_slot(self, slot):
+        row = self.offset + slot
+        if row < self.row_count:
+            text = self.format_row(row)
+        elif row == 0 and self.row_count == 0:
+            text = self.empty_text
+        else:
+            text = ""
+        if self.shown[slot] != text:
+            self.shown[slot] = text
+            self.listbox.delete(slot)
+            self.listbox.insert(slot, text)
+        if row == self.selected:
+            self.listbox.selection_set(slot)
+        else:
+            self.listbox.selection_clear(slot)
+
+    # Hanya baris ini yang diformat ulang, dan hanya jika sedang terlihat
+    def update_row(self, row):
+        if self.offset <= row < self.offset + self.visible_rows:
+            self.render_slot(row - self.offset)
+
+    # Baris baru/hilang menggeser baris di bawahnya; yang di atas layar cukup geser offset
+    def insert_row(self, row):
+        if self.selected is not None and self.selected >= row:
+            self.selected += 1
+        if row >= self.offset + self.visible_rows:
+            self.row_count += 1
+            self.update_scrollbar()
+        elif row < self.offset:
+            self.offset += 1
+            self.row_count += 1
+            self.update_scrollbar()
+        else:
+            self.set_row_count(self.row_count + 1)
+
+    def delete_row(self, row):
+        if self.selected == row:
+            self.selected = None
+        elif self.selected is not None and self.selected > row:
+            self.selected -= 1
+        if row >= self.offset + self.visible_rows:
+            self.row_count -= 1
+            self.update_scrollbar()
+        elif row < self.offset:
+            self.offset -= 1
+            self.row_count -= 1
+            self.update_scrollbar()
+        else:
+            self.set_row_count(self.row_count - 1)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.row_count - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+    def on_scroll(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.row_count))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_by(int(args[1]) * step)
+
+    def update_scrollbar(self):
+        if self.row_count <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / self.row_count,
+                               (self.offset + self.visible_rows) / self.row_count)
+
+    def on_select(self, event=None):
+        selection = self.listbox.curselection()
+        if selection and self.offset + selection[0] < self.row_count:
+            self.selected = self.offset + selection[0]
+        else:
+            self.selected = None
+
+    def clear_selection(self):
+        self.selected = None
+        self.listbox.selection_clear(0, tk.END)
+
+    # Indeks baris (bukan slot layar) yang dipilih, atau None
+    def selected_index(self):
+        return self.selected
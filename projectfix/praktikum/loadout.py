@@ -0,0 +1,700 @@
+"""
+Pemasangan perlengkapan terbaik untuk seluruh anggota party sekaligus.
+
+Semua perlengkapan party (di inventaris maupun yang sedang dipakai, lihat
+count_item_equipped) dibagi ke slot weapon/armor/accessory setiap anggota
+untuk memaksimalkan salah satu tujuan:
+    OBJECTIVE_DAMAGE    total kerusakan harapan per giliran ke monster tahap ini
+    OBJECTIVE_SURVIVAL  nilai SurvivalEvaluator untuk beberapa tahap ke depan
+
+Ini masalah penugasan dengan batas jumlah salinan tiap item. Pemangkasan:
+- Item dengan bonus yang sama digabung menjadi satu kelas (jumlah salinan
+  dijumlahkan).
+- Di setiap slot, kelas dibuang jika kelas yang lebih baik di semua
+  statistik sudah punya salinan untuk semua anggota.
+- Kerusakan dijumlahkan per anggota: setiap anggota memilih pilihan
+  terbaiknya, dan hanya kelas yang dipakai melebihi salinannya yang
+  dicabangkan (salah satu pemakainya harus melepas kelas itu).
+- Nilai bertahan hanya bergantung pada rasio kerusakan diterima /
+  kerusakan party per tahap dan tidak pernah naik jika rasio itu naik.
+  Rasio terkecil per tahap dicari dengan penugasan yang sama (Dinkelbach)
+  dan memberi batas atas yang biasanya sudah dicapai hasil terbaik; hanya
+  jika beberapa tahap saling bertentangan dipakai branch-and-bound anggota
+  demi anggota.
+Cabang yang paling banyak DEFAULT_TOLERANCE lebih baik dipangkas. Bonus
+statistik lain ikut dihitung dengan bobot sangat kecil agar slot yang tidak
+memengaruhi tujuan tetap diisi item terbaik. Jika anggaran pencarian habis
+(tahap-tahap yang saling bertentangan dengan banyak item yang
+diperebutkan), hasil terbaik sejauh ini dipakai dan LoadoutPlan.exact
+bernilai False. Persiapan pencarian ikut dihitung dalam anggaran itu.
+
+Contoh:
+    python loadout.py --items 300 --objective survival --members 4
+"""
+import argparse
+import math
+import random
+import time
+from collections import Counter
+from itertools import islice
+from operator import add, ge, itemgetter
+
+from game_logic import (
+    BattleEngine, EQUIPMENT_SLOTS, GameRNG, ITEM_TYPE_EQUIPMENT, Item, Player, get_item_slot
+)
+from replay import COMMAND_UNEQUIP, COMMAND_USE_ITEM
+from shop_planner import DEFAULT_LOOKAHEAD, SurvivalEvaluator, base_stats, item_bonus, loadout_stats
+
+OBJECTIVE_DAMAGE = "damage"
+OBJECTIVE_SURVIVAL = "survival"
+
+# Bobot bonus statistik yang tidak memengaruhi tujuan (hanya pemecah seri)
+TIE_BREAK_WEIGHT = 1e-6
+# Cabang yang paling banyak sebesar ini lebih baik dari hasil terbaik ikut dipangkas
+DEFAULT_TOLERANCE = 1e-3
+# Anggaran pencarian; jika habis, hasil terbaik sejauh ini dipakai (LoadoutPlan.exact False)
+DEFAULT_BUDGET_MS = 200
+# Rasio yang turun kurang dari bagian sekecil ini dianggap tidak turun (galat pembulatan)
+RATIO_EPSILON = 1e-12
+# Kenaikan relatif rasio untuk turunan numerik nilai per tahap
+RATIO_STEP = 1e-3
+# Penutup daftar pilihan _assign yang dipangkas: tanpa kelas (tidak pernah dilarang), tidak pernah terbaik
+_UNREACHABLE = (-math.inf, (), None)
+
+
+# Vektor yang dibandingkan saat memangkas kelas: statistik tujuan, lalu sisa bonus
+def _key(bonus, objective):
+    attack, defense, evasion, critical = bonus
+    if objective == OBJECTIVE_DAMAGE:
+        return attack, critical, defense + evasion
+    return bonus
+
+
+# Seperti shop_planner.loadout_stats, tetapi dari vektor bonus kelas
+def _with_bonuses(base, bonuses):
+    max_hp, attack, defense, evasion, critical, xp = base
+    for a, d, e, c in bonuses:
+        attack += a
+        defense += d
+        evasion += e
+        critical += c
+    return (max_hp, attack, defense, min(100, evasion), critical, xp)
+
+
+def _covers(a, b):
+    return all(map(ge, a, b))
+
+
+# Daftar pilihan _assign untuk anggota dengan statistik dasar bases: urut menurun menurut
+# gains[statistik dasar]. Pilihan yang nilainya, ditambah nilai terbesar anggota lain, tidak
+# melebihi penugasan awal start tidak pernah ada di penugasan yang lebih baik; penutup daftar
+# menggantikannya.
+def _ranked(gains, bases, start, keys, by_extra):
+    slack = sum(entry[0] for entry in start) - sum(max(gains[base]) for base in bases)
+    ranked = {}
+    for base, base_gains in gains.items():
+        threshold = slack + max(base_gains)
+        # by_extra: pilihan urut menurut bonus pemecah seri, dan sort stabil menjaga urutan itu
+        order = sorted([k for k in by_extra if base_gains[k] > threshold], key=base_gains.__getitem__, reverse=True)
+        ranked[base] = [(base_gains[k], keys[k], k) for k in order] + [_UNREACHABLE]
+    return [ranked[base] for base in bases]
+
+
+class LoadoutPlan:
+    """Perlengkapan per anggota hasil LoadoutSolver beserta nilainya."""
+    __slots__ = ("assignment", "value", "baseline", "explored", "exact")
+
+    def __init__(self, assignment, value, baseline, explored, exact):
+        # assignment: [(anggota, {slot: item atau None})]; exact False jika anggaran pencarian habis
+        self.assignment = assignment
+        self.value = value
+        self.baseline = baseline
+        self.explored = explored
+        self.exact = exact
+
+    def changes(self):
+        """(anggota, slot, item lama, item baru) untuk setiap slot yang berubah."""
+        return [(member, slot, member.equipped_items[slot], item)
+                for member, slots in self.assignment
+                for slot, item in slots.items() if member.equipped_items[slot] is not item]
+
+    def commands(self, party):
+        """
+        Perintah GameSession untuk menerapkan rencana: semua slot yang berubah
+        dilepas dulu (item kembali ke inventaris), baru item baru dipasang.
+        """
+        changes = self.changes()
+        commands = [(COMMAND_UNEQUIP, party.members.index(member), slot)
+                    for member, slot, old, _ in changes if old is not None]
+        commands += [(COMMAND_USE_ITEM, new.item_id, party.members.index(member))
+                     for member, _, _, new in changes if new is not None]
+        return commands
+
+    def message(self):
+        changes = self.changes()
+        if not changes:
+            return f"Perlengkapan sekarang sudah terbaik (nilai {self.value:.2f})."
+        lines = [f"{member.name} [{slot}]: {old.name if old else '-'} -> {new.name if new else '-'}"
+                 for member, slot, old, new in changes]
+        lines.append(f"Nilai {self.baseline:.2f} -> {self.value:.2f}")
+        if not self.exact:
+            lines.append("(anggaran pencarian habis; hasil terbaik sejauh ini)")
+        return "\n".join(lines)
+
+    __str__ = message
+
+
+class _StageRatios:
+    """
+    Kerusakan ke monster (d) dan kerusakan diterima (t) per tahap untuk
+    setiap pilihan anggota dengan statistik dasar tertentu. d hanya
+    bergantung pada bonus serangan dan kritis pilihan, t pada bonus
+    pertahanan dan hindaran, jadi tabel disusun per kombinasi bonus yang
+    berbeda, dan kolom satu tahap untuk semua pilihan disusun saat
+    dibutuhkan (biasanya hanya satu atau dua tahap yang menentukan).
+    """
+    def __init__(self, evaluator, totals):
+        # totals[k]: jumlah bonus (serangan, pertahanan, hindaran, kritis) pilihan k
+        self._evaluator = evaluator
+        offense = {}
+        defense = {}
+        self._offense_ids = [offense.setdefault((a, c), len(offense)) for a, _, _, c in totals]
+        self._defense_ids = [defense.setdefault((d, e), len(defense)) for _, d, e, _ in totals]
+        self._offense = list(offense)
+        self._defense = list(defense)
+        self._columns = {}
+        self._hulls = {}
+        self._chains = {}
+
+    def ratios(self, team):
+        """Per tahap: total t / total d untuk team = [(statistik dasar, pilihan)]."""
+        dealt = []
+        taken = []
+        for (_, attack, defense, evasion, critical, xp), k in team:
+            a, c = self._offense[self._offense_ids[k]]
+            d, e = self._defense[self._defense_ids[k]]
+            dealt.append(self._evaluator.dealt(attack + a, critical + c, xp))
+            taken.append(self._evaluator.taken(defense + d, min(100, evasion + e), xp))
+        return [sum(stage_taken) / sum(stage_dealt) for stage_dealt, stage_taken in zip(zip(*dealt), zip(*taken))]
+
+    def column(self, base, stage):
+        """([d setiap pilihan], [t setiap pilihan]) di tahap stage."""
+        column = self._columns.get((base, stage))
+        if column is None:
+            _, attack, defense, evasion, critical, xp = base
+            dealt = [self._evaluator.dealt_at(stage, attack + a, critical + c, xp) for a, c in self._offense]
+            taken = [self._evaluator.taken_at(stage, defense + d, min(100, evasion + e), xp) for d, e in self._defense]
+            column = self._columns[(base, stage)] = ([dealt[i] for i in self._offense_ids],
+                                                     [taken[j] for j in self._defense_ids])
+        return column
+
+    # Titik (d, t) yang bisa meminimalkan t - rasio * d untuk suatu rasio >= 0:
+    # rantai cembung dari d terbesar ke t terkecil
+    def _hull(self, base, stage):
+        hull = self._hulls.get((base, stage))
+        if hull is None:
+            hull = self._hulls[(base, stage)] = []
+            for d, t in sorted(set(zip(*self.column(base, stage))), key=lambda point: (-point[0], point[1])):
+                if hull and t >= hull[-1][1]:
+                    continue
+                while len(hull) >= 2 and (hull[-1][1] - hull[-2][1]) * (hull[-2][0] - d) >= \
+                        (t - hull[-2][1]) * (hull[-2][0] - hull[-1][0]):
+                    hull.pop()
+                hull.append((d, t))
+        return hull
+
+    # Jumlah Minkowski rantai anggota bases: sisi semua rantai digabung urut kemiringannya
+    def _chain(self, stage, bases):
+        key = (stage, tuple(sorted(bases)))
+        chain = self._chains.get(key)
+        if chain is None:
+            hulls = [self._hull(base, stage) for base in bases]
+            d = sum(hull[0][0] for hull in hulls)
+            t = sum(hull[0][1] for hull in hulls)
+            chain = self._chains[key] = [(d, t)]
+            for step_d, step_t in sorted(((b[0] - a[0], b[1] - a[1]) for hull in hulls for a, b in zip(hull, hull[1:])),
+                                         key=lambda step: step[1] / step[0], reverse=True):
+                d += step_d
+                t += step_t
+                chain.append((d, t))
+        return chain
+
+    def relaxed(self, stage, dealt, taken, bases):
+        """
+        Rasio terkecil di tahap stage jika anggota dengan statistik dasar
+        bases bebas memilih (tanpa batas salinan) dan anggota lain sudah
+        menyumbang dealt dan taken. Rasio atas selimut cembung pilihan
+        gabungan terkecil di salah satu titik rantainya.
+        """
+        return min((taken + t) / (dealt + d) for d, t in self._chain(stage, bases))
+
+
+class LoadoutSolver:
+    """Mencari pembagian perlengkapan terbaik untuk tujuan objective."""
+    def __init__(self, objective=OBJECTIVE_DAMAGE, lookahead=DEFAULT_LOOKAHEAD, tolerance=DEFAULT_TOLERANCE,
+                 budget_ms=DEFAULT_BUDGET_MS, max_nodes=None):
+        if objective not in (OBJECTIVE_DAMAGE, OBJECTIVE_SURVIVAL):
+            raise ValueError(f"Tujuan tidak dikenal: {objective}")
+        self.objective = objective
+        self.lookahead = lookahead
+        self.tolerance = tolerance
+        self.budget_ms = budget_ms
+        self.max_nodes = max_nodes
+        self._nodes = 0
+        self._deadline = None
+        self._exhausted = False
+
+    # Kelas per slot: bonus -> (item-item, jumlah salinan); slot kosong selalu tersedia
+    def _slot_classes(self, party):
+        owned = {item for item, _ in party.inventory_items() if item.item_type == ITEM_TYPE_EQUIPMENT}
+        owned.update(item for member in party.members for item in member.equipped_items.values() if item is not None)
+        copies = {item: party.quantity(item) + party.count_item_equipped(item) for item in owned}
+
+        members = len(party.members)
+        classes = {slot: {} for slot in EQUIPMENT_SLOTS}
+        for item, qty in copies.items():
+            if qty <= 0:
+                continue
+            entry = classes[get_item_slot(item)].setdefault(item_bonus(item), [[], 0])
+            entry[0].append(item)
+            entry[1] += qty
+
+        # Urut menurun: kelas yang lebih baik selalu diperiksa lebih dulu. Cukup
+        # membandingkan dengan kelas yang disimpan, karena kelas yang dibuang
+        # sudah tertutup kelas lain yang juga menutup kelas berikutnya.
+        result = {}
+        for slot, by_bonus in classes.items():
+            candidates = [(_key(bonus, self.objective), qty, bonus, items) for bonus, (items, qty) in by_bonus.items()]
+            candidates.append((_key((0, 0, 0, 0), self.objective), members, (0, 0, 0, 0), [None]))
+            candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+            kept = []
+            for key, qty, bonus, items in candidates:
+                if sum(other[1] for other in kept if _covers(other[0], key)) < members:
+                    kept.append((key, qty, bonus, items))
+            result[slot] = [(bonus, items, qty) for _, qty, bonus, items in kept]
+        return result
+
+    def _member_value(self, evaluator, stats, hp):
+        # Kerusakan harapan per giliran ke monster tahap ini; anggota yang tumbang tidak menyerang
+        return evaluator.profile(stats)[0][0] if hp > 0 else 0.0
+
+    def solve(self, party, stage):
+        """LoadoutPlan terbaik untuk party menjelang tahap stage (party tidak diubah)."""
+        self._nodes = 0
+        self._deadline = None if self.budget_ms is None else time.perf_counter() + self.budget_ms / 1000
+        self._exhausted = False
+        evaluator = SurvivalEvaluator(stage, self.lookahead if self.objective == OBJECTIVE_SURVIVAL else 1)
+        members = party.members
+        if not members:
+            return LoadoutPlan([], 0.0, 0.0, 0, True)
+        hps = [m.hp if m.is_alive else 0 for m in members]
+        bases = [base_stats(m) for m in members]
+        classes = self._slot_classes(party)
+        class_copies = {(slot, bonus): qty for slot in EQUIPMENT_SLOTS for bonus, _, qty in classes[slot]}
+
+        # Pilihan yang sama untuk setiap anggota: (kunci kelas per slot, jumlah bonus)
+        combinations = [((), (0, 0, 0, 0))]
+        for slot in EQUIPMENT_SLOTS:
+            combinations = [(keys + ((slot, bonus),), tuple(map(add, total, bonus)))
+                            for keys, total in combinations for bonus, _, _ in classes[slot]]
+
+        if self.objective == OBJECTIVE_DAMAGE:
+            # Pilihan tiap anggota: (statistik, kunci kelas per slot, bonus pemecah seri)
+            by_base = {}
+            options = []
+            for base in bases:
+                if base not in by_base:
+                    by_base[base] = [(_with_bonuses(base, (total,)), keys, sum(total) * TIE_BREAK_WEIGHT)
+                                     for keys, total in combinations]
+                # Salinan, karena pencarian mengurutkan pilihan setiap anggota sendiri-sendiri
+                options.append(list(by_base[base]))
+            chosen = self._search_separable(evaluator, options, [(base, hp > 0) for base, hp in zip(bases, hps)],
+                                            class_copies, hps)
+            value = sum(self._member_value(evaluator, option[0], hp) for option, hp in zip(chosen, hps))
+            current = sum(self._member_value(evaluator, loadout_stats(base, m.equipped_items.values()), hp)
+                          for m, base, hp in zip(members, bases, hps))
+        else:
+            chosen = self._search_joint(evaluator, bases, combinations, class_copies, hps)
+            value = evaluator.evaluate([option[0] for option in chosen], hps)[0]
+            current = evaluator.evaluate([loadout_stats(base, m.equipped_items.values())
+                                          for m, base in zip(members, bases)], hps)[0]
+        assignment = self._concrete_items(party, classes, chosen)
+        return LoadoutPlan(assignment, value, current, self._nodes, not self._exhausted)
+
+    # Menghitung simpul; True jika anggaran simpul atau waktu sudah habis
+    def _out_of_budget(self):
+        self._nodes += 1
+        if self.max_nodes is not None and self._nodes > self.max_nodes:
+            self._exhausted = True
+        return self._out_of_time()
+
+    # True jika waktu sudah habis; persiapan pencarian juga dibebankan ke anggaran ini
+    def _out_of_time(self):
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            self._exhausted = True
+        return self._exhausted
+
+    def _search_separable(self, evaluator, options, kinds, class_copies, hps):
+        """
+        Tujuan kerusakan dijumlahkan per anggota, jadi cukup satu _assign
+        dengan kerusakan anggota (plus bonus pemecah seri) sebagai nilai.
+        kinds: anggota dengan jenis sama punya pilihan dan nilai yang sama.
+        """
+        ranked = []
+        for opts, hp in zip(options, hps):
+            gains = {option[1]: self._member_value(evaluator, option[0], hp) + option[2] for option in opts}
+            opts.sort(key=lambda option: gains[option[1]], reverse=True)
+            ranked.append([(gains[option[1]], option[1], option) for option in opts])
+        start = [next(entry for entry in entries if entry[2] is option)
+                 for entries, option in zip(ranked, self._greedy(options, class_copies))]
+        return [entry[2] for entry in self._assign(ranked, kinds, class_copies, start, self.tolerance)]
+
+    def _assign(self, ranked, kinds, class_copies, best, tolerance):
+        """
+        Penugasan dengan batas salinan untuk nilai yang dijumlahkan per
+        anggota. ranked[i]: pilihan anggota i sebagai (nilai, kunci kelas,
+        pilihan), urut menurun; best: penugasan awal dalam bentuk yang sama.
+        Setiap simpul memilih pilihan terbaik tiap anggota tanpa memedulikan
+        jumlah salinan (batas atas); jika sebuah kelas dipakai melebihi
+        salinannya, salah satu pemakainya harus melepasnya, jadi setiap
+        pemakai menjadi cabang yang melarang kelas itu untuknya. Pemakai
+        dengan jenis (kinds) dan larangan yang sama bisa saling bertukar,
+        jadi hanya yang pertama dicabangkan. Tanpa pelanggaran, pilihan simpul
+        itu optimal. Mengembalikan penugasan terbaik.
+        """
+        # Simpul: (kelas terlarang per anggota, posisi pilihan terbaik yang tidak dilarang per
+        # anggota, anggota yang larangannya baru bertambah). Larangan cabang hanya bertambah,
+        # jadi hanya posisi anggota itu yang dicari lagi, mulai dari posisi simpul induk.
+        # Slot kosong tidak pernah dilarang, jadi setiap anggota selalu punya pilihan.
+        best_value = sum(entry[0] for entry in best)
+        stack = [(tuple(frozenset() for _ in ranked), [0] * len(ranked), None)]
+        seen = set()
+        while stack and not self._out_of_budget():
+            forbidden, positions, changed = stack.pop()
+            if forbidden in seen:
+                continue
+            seen.add(forbidden)
+            if changed is not None:
+                entries = ranked[changed]
+                position = positions[changed]
+                while not forbidden[changed].isdisjoint(entries[position][1]):
+                    position += 1
+                positions = positions[:changed] + [position] + positions[changed + 1:]
+            picks = [entries[k] for entries, k in zip(ranked, positions)]
+            upper = sum(entry[0] for entry in picks)
+            if upper <= best_value + tolerance:
+                continue
+            users = {}
+            for index, entry in enumerate(picks):
+                for key in entry[1]:
+                    users.setdefault(key, []).append(index)
+            # Kelas yang dipakai melebihi salinannya; yang paling menurunkan batas atas dicabangkan
+            conflicts = [(self._release_loss(ranked, forbidden, positions, members, key, class_copies[key]), key)
+                         for key, members in users.items() if len(members) > class_copies[key]]
+            if not conflicts:
+                best_value = upper
+                best = picks
+                continue
+            loss, conflict = max(conflicts, key=itemgetter(0))
+            if upper - loss <= best_value + tolerance:
+                continue
+            branches = {}
+            for index in users[conflict]:
+                branches.setdefault((kinds[index], forbidden[index]),
+                                    (forbidden[:index] + (forbidden[index] | {conflict},) + forbidden[index + 1:],
+                                     positions, index))
+            # Didorong terbalik sehingga cabang pemakai pertama diperiksa lebih dulu
+            stack.extend(reversed(branches.values()))
+        return best
+
+    # Penurunan batas atas paling sedikit jika pemakai kelas key (members) melepasnya sampai tersisa
+    # copies pemakai: setiap yang melepas turun ke pilihan terbaiknya tanpa kelas itu
+    def _release_loss(self, ranked, forbidden, positions, members, key, copies):
+        losses = []
+        for index in members:
+            entries = ranked[index]
+            position = positions[index]
+            fallback = next(entry for entry in islice(entries, position + 1, None)
+                            if key not in entry[1] and forbidden[index].isdisjoint(entry[1]))
+            losses.append(entries[position][0] - fallback[0])
+        losses.sort()
+        return sum(losses[:len(members) - copies])
+
+    # Pilihan terbaik yang masih tersedia, anggota demi anggota (hasil awal pencarian)
+    def _greedy(self, options, class_copies):
+        used = Counter()
+        chosen = []
+        for opts in options:
+            option = next(option for option in opts if all(used[key] < class_copies[key] for key in option[1]))
+            used.update(option[1])
+            chosen.append(option)
+        return chosen
+
+    def _search_joint(self, evaluator, bases, combinations, class_copies, hps):
+        """
+        Tujuan bertahan menilai party bersama-sama, tetapi nilainya hanya
+        bergantung pada rasio kerusakan diterima / kerusakan party di setiap
+        tahap (HP maksimum dan naik level tidak bergantung pada
+        perlengkapan) dan tidak pernah naik jika rasio itu naik. Rasio
+        terkecil setiap tahap, dicari sendiri-sendiri (_min_ratio), memberi
+        batas atas evaluate_ratios(). Tahap yang paling menurunkan nilai
+        hasil terbaik dipastikan lebih dulu; biasanya hanya satu atau dua
+        tahap yang menentukan dan pilihan terbaiknya sudah mencapai batas
+        itu. Jika tidak, _search_members menutup selisihnya.
+        """
+        keys = [keys for keys, _ in combinations]
+        extras = [sum(total) * TIE_BREAK_WEIGHT for _, total in combinations]
+        tables = _StageRatios(evaluator, [total for _, total in combinations])
+        # Dari profil statistik dasar hanya HP maksimum dan naik level yang dipakai evaluate_ratios()
+        fixed = [evaluator.profile(base) for base in bases]
+        living = [index for index, hp in enumerate(hps) if hp > 0]
+        by_extra = sorted(range(len(keys)), key=extras.__getitem__, reverse=True)
+        top_extra = extras[by_extra[0]] * len(bases)
+
+        # Melengkapi picks ({anggota: pilihan}) dengan pilihan pemecah seri terbaik yang masih tersedia
+        def complete(picks):
+            used = Counter()
+            for k in picks.values():
+                used.update(keys[k])
+            team = []
+            for index in range(len(bases)):
+                k = picks.get(index)
+                if k is None:
+                    k = next(k for k in by_extra if all(used[key] < class_copies[key] for key in keys[k]))
+                    used.update(keys[k])
+                team.append(k)
+            return team
+
+        def ratios(team):
+            return tables.ratios([(bases[index], team[index]) for index in living])
+
+        def value(team):
+            return evaluator.evaluate_ratios(ratios(team), fixed, hps)[0] + sum(extras[k] for k in team)
+
+        def phi(ratios):
+            return evaluator.evaluate_ratios(ratios, fixed, hps)[0]
+
+        def upper(lower):
+            return phi(lower) + top_extra
+
+        # Beberapa tahap menentukan sekaligus: nilai di sekitar rasio hasil terbaik didekati
+        # linear (turunan phi per tahap), dan perubahan rasio tahap s dengan (t - rasio * d) /
+        # total d hasil terbaik, yang dijumlahkan per anggota. _assign mencari penugasan yang
+        # paling menaikkan perkiraan itu; diulang selama nilai sebenarnya naik.
+        def improve():
+            while not self._out_of_time():
+                team = [best[1][index] for index in living]
+                current = tables.ratios([(bases[index], best[1][index]) for index in living])
+                weights = {}
+                for s, ratio in enumerate(current):
+                    drop = phi(current) - phi(current[:s] + [ratio * (1 + RATIO_STEP)] + current[s + 1:])
+                    if drop > 0:
+                        dealt = sum(tables.column(base, s)[0][k] for base, k in zip(living_bases, team))
+                        weights[s] = drop / (ratio * RATIO_STEP * dealt)
+                if not weights:
+                    return
+                gains = {}
+                for base in living_bases:
+                    base_gains = [0.0] * len(keys)
+                    for s, weight in weights.items():
+                        dealt, taken = tables.column(base, s)
+                        base_gains = [g - weight * (t - current[s] * d) for g, d, t in zip(base_gains, dealt, taken)]
+                    gains[base] = base_gains
+                start = [(gains[base][k], keys[k], k) for base, k in zip(living_bases, team)]
+                picks = self._assign(_ranked(gains, living_bases, start, keys, by_extra), living_bases,
+                                     class_copies, start, 0)
+                team = complete(dict(zip(living, (entry[2] for entry in picks))))
+                candidate = value(team)
+                if candidate <= best[0]:
+                    return
+                best[:] = [candidate, team]
+
+        living_bases = [bases[index] for index in living]
+        best = complete({})
+        best = [value(best), best]
+        lower = [0.0] * len(evaluator.foes)
+        unsolved = set(range(len(lower))) if living else set()
+        while upper(lower) > best[0] + self.tolerance and not self._out_of_time():
+            # Tahap yang rasio hasil terbaiknya paling menurunkan batas atas. Jika tidak ada,
+            # rasio terkecil tahap mana pun juga tidak menurunkannya (nilai monoton).
+            current = ratios(best[1])
+            bound, stage = min(((upper(lower[:s] + [current[s]] + lower[s + 1:]), s) for s in unsolved),
+                               default=(None, None))
+            if stage is None or bound >= upper(lower):
+                improve()
+                if upper(lower) > best[0] + self.tolerance:
+                    self._search_members(tables, bases, living, lower, keys, class_copies, upper, complete, value,
+                                         best)
+                break
+            unsolved.discard(stage)
+            lower[stage], team = self._min_ratio(tables, stage, living_bases, [best[1][index] for index in living],
+                                                 keys, by_extra, class_copies)
+            team = complete(dict(zip(living, team)))
+            candidate = value(team)
+            if candidate > best[0]:
+                best[:] = [candidate, team]
+        return [(_with_bonuses(bases[index], (combinations[k][1],)), keys[k], extras[k])
+                for index, k in enumerate(best[1])]
+
+    def _min_ratio(self, tables, stage, bases, team, keys, by_extra, class_copies):
+        """
+        Rasio kerusakan diterima / kerusakan party terkecil di tahap stage
+        untuk anggota hidup dengan statistik dasar bases, dengan batas
+        salinan (Dinkelbach). Selama _assign menemukan penugasan dengan
+        jumlah t - rasio * d negatif, rasionya lebih kecil dan menjadi rasio
+        berikutnya. Dimulai dari pilihan team; mengembalikan (rasio,
+        pilihan per anggota).
+        """
+        columns = {base: tables.column(base, stage) for base in bases}
+
+        def ratio(team):
+            return (sum(columns[base][1][k] for base, k in zip(bases, team))
+                    / sum(columns[base][0][k] for base, k in zip(bases, team)))
+
+        current = ratio(team)
+        while True:
+            gains = {base: [current * d - t for d, t in zip(dealt, taken)] for base, (dealt, taken) in columns.items()}
+            start = [(gains[base][k], keys[k], k) for base, k in zip(bases, team)]
+            picks = [entry[2] for entry in self._assign(_ranked(gains, bases, start, keys, by_extra), bases,
+                                                        class_copies, start, 0)]
+            lower = ratio(picks)
+            if lower >= current * (1 - RATIO_EPSILON) or self._exhausted:
+                return min(current, lower), team
+            current, team = lower, picks
+
+    def _search_members(self, tables, bases, living, lower, keys, class_copies, upper, complete, value, best):
+        """
+        Cadangan jika rasio terkecil setiap tahap tidak bisa dicapai satu
+        penugasan: branch-and-bound anggota hidup demi anggota hidup. Batas
+        atas simpul memakai per tahap rasio terkecil tanpa batas salinan
+        untuk anggota yang belum dipilih (_StageRatios.relaxed), tetapi
+        tidak kurang dari lower. Pilihan setiap anggota diurutkan sekali
+        menurut batasnya saat hanya anggota itu yang dipilih, dan anggota
+        dengan statistik dasar sama memilih menurut urutan itu tanpa mundur.
+        best: [nilai, pilihan per anggota], diperbarui di tempat.
+        """
+        stages = range(len(lower))
+
+        def bound(dealt, taken, free):
+            return upper([max(low, tables.relaxed(s, dealt[s], taken[s], free)) for s, low in zip(stages, lower)])
+
+        rankings = {}
+        for index in living:
+            base = bases[index]
+            if base not in rankings:
+                free = [bases[other] for other in living]
+                free.remove(base)
+                columns = [tables.column(base, s) for s in stages]
+                ranking = rankings[base] = []
+                for k in range(len(keys)):
+                    if self._out_of_time():
+                        return
+                    ranking.append((bound([c[0][k] for c in columns], [c[1][k] for c in columns], free), k))
+                ranking.sort(key=itemgetter(0), reverse=True)
+
+        used = Counter()
+        picks = {}
+
+        def search(depth, dealt, taken, starts):
+            if self._out_of_budget():
+                return
+            if depth == len(living):
+                team = complete(picks)
+                candidate = value(team)
+                if candidate > best[0]:
+                    best[:] = [candidate, team]
+                return
+            index = living[depth]
+            base = bases[index]
+            free = [bases[other] for other in living[depth + 1:]]
+            columns = [tables.column(base, s) for s in stages]
+            ranked = rankings[base]
+            for rank in range(starts.get(base, 0), len(ranked)):
+                loose, k = ranked[rank]
+                if loose <= best[0] + self.tolerance or self._out_of_time():
+                    # Terurut menurun, sisanya tidak mungkin lebih baik
+                    break
+                if any(used[key] >= class_copies[key] for key in keys[k]):
+                    continue
+                option_dealt = [d + c[0][k] for d, c in zip(dealt, columns)]
+                option_taken = [t + c[1][k] for t, c in zip(taken, columns)]
+                if bound(option_dealt, option_taken, free) <= best[0] + self.tolerance:
+                    continue
+                picks[index] = k
+                used.update(keys[k])
+                search(depth + 1, option_dealt, option_taken, {**starts, base: rank})
+                used.subtract(keys[k])
+                del picks[index]
+
+        search(0, [0] * len(lower), [0] * len(lower), {})
+
+    # Memilih item nyata dari setiap kelas; item yang sudah dipakai anggota itu didahulukan
+    def _concrete_items(self, party, classes, chosen):
+        remaining = Counter()
+        for slot in EQUIPMENT_SLOTS:
+            for bonus, items, _ in classes[slot]:
+                for item in items:
+                    if item is not None:
+                        remaining[item] = party.quantity(item) + party.count_item_equipped(item)
+        items_by_key = {(slot, bonus): items for slot in EQUIPMENT_SLOTS for bonus, items, _ in classes[slot]}
+
+        assignment = [(member, {}) for member in party.members]
+        pending = []
+        for (member, slots), (_, keys, _) in zip(assignment, chosen):
+            for slot, bonus in keys:
+                current = member.equipped_items[slot]
+                if current is not None and current in items_by_key[(slot, bonus)] and remaining[current] > 0:
+                    slots[slot] = current
+                    remaining[current] -= 1
+                else:
+                    pending.append((slots, slot, items_by_key[(slot, bonus)]))
+        for slots, slot, items in pending:
+            item = next((item for item in items if item is None or remaining[item] > 0))
+            if item is not None:
+                remaining[item] -= 1
+            slots[slot] = item
+        return assignment
+
+
+# Inventaris buatan dengan count item perlengkapan acak untuk uji kecepatan
+def random_equipment(count, seed=0):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        kind = rng.choice(("attack", "defense", "accessory"))
+        if kind == "attack":
+            bonus = {"attack": rng.randint(1, 20)}
+        elif kind == "defense":
+            bonus = {"defense": rng.randint(1, 15)}
+        else:
+            bonus = {}
+        for extra in ("evasion", "critical_damage"):
+            if rng.random() < 0.4 or not bonus:
+                bonus[extra] = rng.randint(1, 15)
+        items.append((Item(f"Item Acak #{i + 1}", ITEM_TYPE_EQUIPMENT, stat_bonus=bonus, price=0,
+                           item_id=f"random_{i + 1}"), rng.randint(1, 3)))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pembagian perlengkapan terbaik untuk party bawaan.")
+    parser.add_argument("--items", type=int, default=300, help="jumlah item perlengkapan acak di inventaris")
+    parser.add_argument("--stage", type=int, default=1)
+    parser.add_argument("--objective", choices=(OBJECTIVE_DAMAGE, OBJECTIVE_SURVIVAL), default=OBJECTIVE_DAMAGE)
+    parser.add_argument("--members", type=int, default=2, help="jumlah anggota party (Hero dan Sage, lalu Hero tambahan)")
+    args = parser.parse_args()
+
+    engine = BattleEngine(rng=GameRNG(0), stage=args.stage)
+    for number in range(len(engine.party.members), args.members):
+        engine.party.add_member(Player(f"Hero {number + 1}"))
+    for item, qty in random_equipment(args.items):
+        engine.party.add_item(item, qty)
+    start = time.perf_counter()
+    plan = LoadoutSolver(args.objective).solve(engine.party, args.stage)
+    elapsed = time.perf_counter() - start
+    print(plan.message())
+    print(f"{plan.explored} simpul pencarian dalam {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
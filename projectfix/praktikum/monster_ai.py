@@ -0,0 +1,296 @@
+"""
+AI monster dengan pencarian expectimax berbatas waktu.
+
+ExpectimaxMonsterAI dipasang lewat BattleEngine(monster_ai=...). Untuk
+setiap giliran monster (secara bawaan hanya BossMonster), AI mencari
+kombinasi target dan serangan (biasa/spesial) terbaik di atas representasi
+pertarungan yang ringan: tuple HP anggota party plus HP dan MP monster itu.
+Statistik yang tidak berubah selama pertarungan (serangan, pertahanan,
+peluang hindar, pengali kritis) disimpan terpisah sebagai konteks.
+
+Pohon pencarian:
+    MAX     monster memilih (target, spesial)
+    CHANCE  serangan meleset / kena (serangan spesial monster biasa hanya
+            terjadi 25%; spesial boss tidak bisa dihindari dan memakai MP)
+    CHANCE  setiap pemain hidup menyerang monster (meleset / kena / kritis),
+            sesuai default_battle_policy
+    ...     ronde berikutnya, sampai kedalaman tertentu
+
+Kedalaman dinaikkan bertahap (iterative deepening) sampai anggaran waktu
+(budget_ms) atau node (max_nodes) habis; hasil kedalaman terakhir yang
+selesai yang dipakai. Waktu diperiksa setiap 32 node, jadi anggaran bisa
+terlewati sedikit (misalnya saat garbage collector berjalan). Nilai posisi
+disimpan di TranspositionTable berukuran tetap dengan pembuangan LRU, dan
+dipakai ulang antar giliran.
+
+Catatan: dengan budget_ms, kedalaman yang tercapai bergantung pada
+kecepatan mesin sehingga keputusan bisa berbeda antar mesin. Untuk simulasi
+dan replay yang harus deterministik, pakai budget_ms=None dan max_nodes.
+"""
+import time
+from collections import OrderedDict
+
+from game_logic import BossMonster, RandomMonsterAI
+
+# Nilai posisi dari sudut pandang monster: semua pemain kalah / monster kalah
+WIN_VALUE = 1.0
+LOSS_VALUE = -1.0
+
+# Parameter pertarungan yang sama dengan Player/Monster/BossMonster di game_logic
+PLAYER_CRIT_CHANCE = 0.2
+MONSTER_SPECIAL_CHANCE = 0.25
+MONSTER_SPECIAL_MULTIPLIER = 1.5
+BOSS_SPECIAL_MULTIPLIER = 3
+BOSS_SPECIAL_MP_COST = 20
+
+
+class TranspositionTable:
+    """
+    Cache nilai posisi berukuran tetap. Entri yang paling lama tidak dipakai
+    dibuang lebih dulu (LRU) saat tabel penuh.
+    """
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class _SearchBudgetExceeded(Exception):
+    pass
+
+
+def _evade_chance(evasion):
+    return min(100, max(0, evasion)) / 100
+
+
+class ExpectimaxMonsterAI:
+    """
+    Monster memilih (target, spesial) dengan expectimax berbatas anggaran.
+    bosses_only=True berarti monster biasa tetap memakai fallback (bawaan
+    RandomMonsterAI, sama persis dengan perilaku engine tanpa AI).
+    """
+    def __init__(self, budget_ms=20, max_depth=6, max_nodes=None, table_size=100000, bosses_only=True,
+                 fallback=None):
+        self.budget_ms = budget_ms
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.table = TranspositionTable(table_size)
+        self.bosses_only = bosses_only
+        self.fallback = fallback or RandomMonsterAI()
+        self._contexts = {}
+        self._deadline = None
+        self._enforce_budget = False
+        self._nodes = 0
+        # Statistik keputusan terakhir (untuk benchmark / debugging)
+        self.last_depth = 0
+        self.last_nodes = 0
+
+    def choose(self, engine, monster, living_players):
+        if self.bosses_only and not isinstance(monster, BossMonster):
+            return self.fallback.choose(engine, monster, living_players)
+        members = engine.party.members
+        target, special = self.search(members, monster)
+        return members[target], special
+
+    # Statistik tetap pertarungan -> nomor konteks kecil untuk kunci tabel
+    def _context(self, members, monster):
+        players = tuple(
+            (m.max_hp, m.attack_stat, m.defense_stat, _evade_chance(m.evasion_stat),
+             2 + m.total_critical_damage_bonus() / 100)
+            for m in members)
+        foe = (monster.max_hp, monster.attack_stat, monster.defense_stat, _evade_chance(monster.evasion_stat),
+               isinstance(monster, BossMonster))
+        key = (players, foe)
+        context_id = self._contexts.get(key)
+        if context_id is None:
+            context_id = self._contexts[key] = len(self._contexts)
+        self._players = players
+        self._foe = foe
+        self._context_id = context_id
+        self._moves = self._monster_moves()
+        self._player_phase_cache = {}
+
+    def search(self, members, monster):
+        """Indeks target di members dan apakah memakai serangan spesial."""
+        self._context(members, monster)
+        players = tuple(m.hp if m.is_alive else 0 for m in members)
+        hp, mp = monster.hp, monster.mp
+
+        self._nodes = 0
+        self._deadline = None
+        if self.budget_ms is not None:
+            self._deadline = time.perf_counter() + self.budget_ms / 1000
+        best = None
+        depth = 0
+        for depth in range(1, self.max_depth + 1):
+            # Kedalaman 1 selalu diselesaikan agar selalu ada keputusan
+            self._enforce_budget = depth > 1
+            try:
+                best = self._best_move(players, hp, mp, depth)
+            except _SearchBudgetExceeded:
+                depth -= 1
+                break
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                break
+        self._enforce_budget = False
+        self.last_depth = depth
+        self.last_nodes = self._nodes
+        return best
+
+    def _tick(self):
+        self._nodes += 1
+        if not self._enforce_budget:
+            return
+        if self.max_nodes is not None and self._nodes > self.max_nodes:
+            raise _SearchBudgetExceeded
+        if self._deadline is not None and self._nodes & 31 == 0 and time.perf_counter() >= self._deadline:
+            raise _SearchBudgetExceeded
+
+    # Semua langkah (target, spesial) untuk target yang masih hidup, urutan tetap
+    def _monster_moves(self):
+        return [(target, special) for target in range(len(self._players)) for special in (False, True)]
+
+    def _best_move(self, players, hp, mp, depth):
+        best_value = None
+        best_move = None
+        for target, special in self._moves:
+            if players[target] <= 0:
+                continue
+            value = self._move_value(players, hp, mp, target, special, depth)
+            if best_value is None or value > best_value:
+                best_value = value
+                best_move = (target, special)
+        # Nilai akar juga disimpan; posisi yang sama bisa muncul lagi di giliran berikutnya
+        self.table.put((self._context_id, players, hp, mp, depth), best_value)
+        return best_move
+
+    def _max_value(self, players, hp, mp, depth):
+        # Node yang ditemukan di tabel tetap dihitung agar anggaran waktu selalu diperiksa
+        self._tick()
+        key = (self._context_id, players, hp, mp, depth)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        value = LOSS_VALUE
+        for target, special in self._moves:
+            if players[target] > 0:
+                value = max(value, self._move_value(players, hp, mp, target, special, depth))
+        self.table.put(key, value)
+        return value
+
+    # Nilai harapan satu langkah monster: rata-rata atas hasil serangan
+    def _move_value(self, players, hp, mp, target, special, depth):
+        total = 0.0
+        for probability, next_players, next_mp in self._attack_outcomes(players, mp, target, special):
+            total += probability * self._after_monster(next_players, hp, next_mp, depth)
+        return total
+
+    def _attack_outcomes(self, players, mp, target, special):
+        _, attack, _, _, boss = self._foe
+        _, _, defense, evade, _ = self._players[target]
+        if special and boss:
+            if mp >= BOSS_SPECIAL_MP_COST:
+                damage = max(1, attack * BOSS_SPECIAL_MULTIPLIER - defense)
+                return [(1.0, self._hit(players, target, damage), mp - BOSS_SPECIAL_MP_COST)]
+            special = False
+        outcomes = []
+        hits = [(1.0, max(1, attack - defense))]
+        if special:
+            hits = [(1 - MONSTER_SPECIAL_CHANCE, hits[0][1]),
+                    (MONSTER_SPECIAL_CHANCE, max(1, int(attack * MONSTER_SPECIAL_MULTIPLIER) - defense))]
+        for share, damage in hits:
+            if evade > 0:
+                outcomes.append((share * evade, players, mp))
+            if evade < 1:
+                outcomes.append((share * (1 - evade), self._hit(players, target, damage), mp))
+        return outcomes
+
+    @staticmethod
+    def _hit(players, target, damage):
+        hp = players[target] - damage
+        return players[:target] + (hp if hp > 0 else 0,) + players[target + 1:]
+
+    def _after_monster(self, players, hp, mp, depth):
+        if not any(players):
+            return WIN_VALUE
+        if depth <= 1:
+            return self._evaluate(players, hp)
+        total = 0.0
+        for probability, next_hp in self._player_phase(players, hp):
+            if next_hp <= 0:
+                total += probability * LOSS_VALUE
+            else:
+                total += probability * self._max_value(players, next_hp, mp, depth - 1)
+        return total
+
+    def _player_phase(self, players, hp):
+        """
+        Distribusi HP monster setelah setiap pemain hidup menyerangnya sekali
+        (meleset / kena / kritis). Hasil yang sama digabung sehingga cabang
+        peluang tidak tumbuh eksponensial.
+        """
+        key = (players, hp)
+        cached = self._player_phase_cache.get(key)
+        if cached is not None:
+            return cached
+        _, _, foe_defense, foe_evade, _ = self._foe
+        distribution = {hp: 1.0}
+        for player_hp, (_, attack, _, _, crit_multiplier) in zip(players, self._players):
+            if player_hp <= 0:
+                continue
+            damage = max(1, attack - foe_defense)
+            crit_damage = int(damage * crit_multiplier)
+            hit = 1 - foe_evade
+            branches = ((foe_evade, 0), (hit * (1 - PLAYER_CRIT_CHANCE), damage),
+                        (hit * PLAYER_CRIT_CHANCE, crit_damage))
+            next_distribution = {}
+            for current, probability in distribution.items():
+                if current <= 0:
+                    next_distribution[current] = next_distribution.get(current, 0.0) + probability
+                    continue
+                for share, dealt in branches:
+                    if share > 0:
+                        result = max(0, current - dealt)
+                        next_distribution[result] = next_distribution.get(result, 0.0) + probability * share
+            distribution = next_distribution
+        cached = self._player_phase_cache[key] = [(probability, next_hp)
+                                                  for next_hp, probability in distribution.items()]
+        return cached
+
+    # Heuristik daun: rata-rata HP party yang hilang dikurangi HP monster yang hilang
+    def _evaluate(self, players, hp):
+        lost = 0.0
+        for player_hp, stats in zip(players, self._players):
+            lost += 1 - player_hp / stats[0]
+        return lost / len(players) - (1 - hp / self._foe[0])
+
+
+# AI monster yang bisa dipilih dari baris perintah (campaign.py)
+MONSTER_AIS = {
+    "random": RandomMonsterAI,
+    # Anggaran node (bukan waktu) agar hasil simulasi sama di setiap mesin
+    "expectimax": lambda: ExpectimaxMonsterAI(budget_ms=None, max_nodes=5000),
+}
@@ -0,0 +1,227 @@
+"""
+Rekaman sesi permainan dan replay deterministik tanpa Tk.
+
+Semua perubahan keadaan model dari UI (giliran pemain dan monster, akhir
+pertarungan, tahap baru, reset, upgrade, item, toko, muat simpanan)
+dijalankan sebagai perintah lewat GameSession, yang sekaligus mencatatnya.
+Karena setiap lemparan dadu berasal dari seed BattleEngine, seed + daftar
+perintah cukup untuk mengulang sesi secara persis. Replay menjalankan
+perintah yang sama langsung pada BattleEngine (tanpa root.after dan widget)
+lalu membandingkan keadaan akhir party dengan yang terekam.
+
+Contoh:
+    python replay.py ~/.turnbased_rpg_session.json
+"""
+import argparse
+import json
+import time
+
+from game_logic import (
+    BattleEngine, GameRNG, ITEM_TYPE_EQUIPMENT, ITEM_TYPE_POTION, MonsterPool, PooledMonster
+)
+from savegame import restore, snapshot
+
+# Versi 2: reset tidak lagi memulai tahap, start_stage sesudahnya direkam sebagai perintah sendiri
+RECORDING_VERSION = 2
+
+# Jenis perintah yang direkam; argumen perintah hanya berisi nilai JSON biasa
+COMMAND_START_STAGE = "start_stage"
+COMMAND_PLAYER_TURN = "turn"
+COMMAND_MONSTER_TURN = "monster_turn"
+COMMAND_END_BATTLE = "end_battle"
+COMMAND_RESET = "reset"
+COMMAND_UPGRADE = "upgrade"
+COMMAND_UNEQUIP = "unequip"
+COMMAND_USE_ITEM = "use_item"
+COMMAND_BUY = "buy"
+COMMAND_LOAD = "load"
+
+
+class ReplayError(Exception):
+    pass
+
+
+# Posisi monster di engine.monsters (stabil selama pertarungan, juga di replay)
+def monster_index(engine, monster):
+    if monster is None:
+        return None
+    if isinstance(engine.monsters, MonsterPool):
+        return monster.index
+    return engine.monsters.index(monster)
+
+
+def monster_at(engine, index):
+    if index is None:
+        return None
+    if isinstance(engine.monsters, MonsterPool):
+        return PooledMonster(engine.monsters, index)
+    return engine.monsters[index]
+
+
+class GameSession:
+    """
+    BattleEngine beserta rekaman perintah yang mengubahnya. run(perintah,
+    *argumen) menjalankan perintah dan mengembalikan hasilnya (pesan atau
+    nilai kembali engine). Jika record False, perintah tidak dicatat
+    (dipakai saat replay).
+    """
+    def __init__(self, engine=None, record=True):
+        self.engine = engine or BattleEngine()
+        self.seed = self.engine.rng.seed
+        self.wave_size = self.engine.wave_size
+        self.stage = self.engine.stage
+        self.record = record
+        self.commands = []
+
+    def run(self, command, *args):
+        handler = self.HANDLERS.get(command)
+        if handler is None:
+            raise ReplayError(f"Perintah tidak dikenal: {command}")
+        result = handler(self, *args)
+        # Perintah yang gagal (mis. simpanan rusak) tidak ikut direkam
+        if self.record:
+            self.commands.append((command, *args))
+        return result
+
+    def _start_stage(self):
+        return self.engine.start_stage()
+
+    def _player_turn(self, action, target_index=None):
+        return self.engine.execute_player_turn(action, monster_at(self.engine, target_index))
+
+    def _monster_turn(self):
+        return self.engine.execute_monster_turn()
+
+    def _end_battle(self, won):
+        return self.engine.end_battle(won)
+
+    def _reset(self):
+        return self.engine.reset_game()
+
+    def _upgrade(self, member_index, stat):
+        return self.engine.party.members[member_index].upgrade_stat(stat)
+
+    def _unequip(self, member_index, slot):
+        party = self.engine.party
+        return party.members[member_index].unequip_item(slot, party=party)
+
+    # Ramuan hanya dikurangi dari inventaris jika benar-benar terpakai
+    def _use_item(self, item_id, member_index):
+        party = self.engine.party
+        item = party.catalog[item_id]
+        member = party.members[member_index]
+        if item.item_type == ITEM_TYPE_POTION:
+            result = member.use_potion(item, party=party)
+            if result.ok:
+                party.remove_item(item, 1)
+            return result
+        if item.item_type == ITEM_TYPE_EQUIPMENT:
+            return member.equip_item(item, party)
+        return None
+
+    def _buy(self, item_id):
+        party = self.engine.party
+        item = party.catalog[item_id]
+        if not party.spend_gold(item.price):
+            return False
+        party.add_item(item, 1)
+        return True
+
+    # Simpanan dimuat dari snapshot yang direkam, bukan dari berkas
+    def _load(self, data):
+        self.engine = restore(data)
+        return self.engine
+
+    HANDLERS = {
+        COMMAND_START_STAGE: _start_stage,
+        COMMAND_PLAYER_TURN: _player_turn,
+        COMMAND_MONSTER_TURN: _monster_turn,
+        COMMAND_END_BATTLE: _end_battle,
+        COMMAND_RESET: _reset,
+        COMMAND_UPGRADE: _upgrade,
+        COMMAND_UNEQUIP: _unequip,
+        COMMAND_USE_ITEM: _use_item,
+        COMMAND_BUY: _buy,
+        COMMAND_LOAD: _load,
+    }
+
+    def recording(self):
+        """Rekaman sesi sebagai dict JSON, termasuk keadaan akhir untuk verifikasi."""
+        return {
+            "version": RECORDING_VERSION,
+            "seed": self.seed,
+            "wave_size": self.wave_size,
+            "stage": self.stage,
+            "commands": [list(command) for command in self.commands],
+            "final": snapshot(self.engine),
+        }
+
+
+def save_recording(session, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(session.recording(), f, ensure_ascii=False)
+
+
+def load_recording(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def replay(recording):
+    """Mengulang rekaman tanpa Tk dan mengembalikan GameSession hasilnya."""
+    if recording.get("version") != RECORDING_VERSION:
+        raise ReplayError(f"Versi rekaman tidak didukung: {recording.get('version')}")
+    engine = BattleEngine(rng=GameRNG(recording["seed"]), stage=recording["stage"],
+                          wave_size=recording["wave_size"])
+    session = GameSession(engine, record=False)
+    for command in recording["commands"]:
+        session.run(*command)
+    return session
+
+
+# Daftar (kunci, terekam, hasil replay) untuk setiap nilai keadaan akhir yang berbeda
+def diff_state(expected, actual, prefix=""):
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            differences += diff_state(expected.get(key), actual.get(key), f"{prefix}{key}.")
+        return differences
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        differences = []
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            differences += diff_state(a, b, f"{prefix}{i}.")
+        return differences
+    if expected != actual:
+        return [(prefix.rstrip("."), expected, actual)]
+    return []
+
+
+def verify(recording):
+    """Replay rekaman; mengembalikan daftar perbedaan keadaan akhir (kosong jika cocok)."""
+    session = replay(recording)
+    # Lewat JSON agar tipe nilai (tuple/list, kunci angka) sama dengan yang terekam
+    actual = json.loads(json.dumps(snapshot(session.engine)))
+    return diff_state(recording["final"], actual)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay rekaman sesi permainan dan cocokkan keadaan akhirnya.")
+    parser.add_argument("recording", help="berkas rekaman JSON")
+    args = parser.parse_args()
+
+    recording = load_recording(args.recording)
+    start = time.perf_counter()
+    differences = verify(recording)
+    elapsed = time.perf_counter() - start
+    print(f"{len(recording['commands'])} perintah di-replay dalam {elapsed * 1e3:.1f} ms")
+    if not differences:
+        print("Keadaan akhir party cocok.")
+        return
+    print("Keadaan akhir BERBEDA:")
+    for key, expected, actual in differences:
+        print(f"  {key}: terekam {expected!r}, replay {actual!r}")
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Simpan/muat permainan dalam format biner ringkas berversi, plus ekspor JSON
+untuk debugging.
+
+Yang disimpan adalah keadaan di antara pertarungan: tahap, seed RNG dan
+jumlah pertarungan BattleEngine (sehingga tahap berikutnya memakai aliran
+acak yang sama), emas, inventaris, serta statistik, level, dan perlengkapan
+setiap anggota party. Item dari paket konten disimpan sebagai item_id dan
+dicari lewat ITEM_CATALOG saat dimuat; item lain (misalnya yang didaftarkan
+Party.add_item ke katalog party) ikut disimpan lengkap dengan definisinya.
+
+Layout biner (little-endian):
+    MAGIC "RPGS" | versi u8 | seed u64 | battle_count u32 | stage u32 |
+    wave_size u16 | gold u32 | jumlah_definisi u16 | definisi* |
+    jumlah_item u16 | (id str, jumlah u32)* | jumlah_anggota u8 | anggota*
+    definisi: id str | nama str | jenis str | heal, mp, harga i32 |
+              jumlah_bonus u8 | (statistik str, nilai i32)* | deskripsi str
+    anggota: kelas u8 | nama str | max_hp, hp, max_mp, mp, serangan,
+             pertahanan, hindaran i32 | hidup u8 | xp u32 | level u16 |
+             poin u16 | id perlengkapan str x 3 (panjang 0 = kosong)
+    str: panjang u8 + UTF-8
+
+Contoh:
+    python savegame.py ~/.turnbased_rpg.sav simpanan.json
+"""
+import argparse
+import json
+import struct
+
+from game_logic import (
+    BattleEngine, CONTENT, EQUIPMENT_SLOTS, GameRNG, ITEM_CATALOG, ItemCatalog, Party, Player, Sage,
+    item_from_data
+)
+
+SAVE_MAGIC = b"RPGS"
+SAVE_VERSION = 2
+# Versi 1 belum menyimpan definisi item di luar paket konten
+SUPPORTED_VERSIONS = (1, 2)
+
+# Kelas anggota party yang bisa disimpan; indeks tuple = kode kelas di berkas
+MEMBER_CLASSES = (Player, Sage)
+
+# Seed u64: GameRNG.spawn menghasilkan seed 64-bit tak bertanda
+_ENGINE = struct.Struct("<BQIIHI")
+_COUNT16 = struct.Struct("<H")
+_COUNT8 = struct.Struct("<B")
+_QTY = struct.Struct("<I")
+_MEMBER = struct.Struct("<7iBIHH")
+_ITEM = struct.Struct("<3i")
+_BONUS = struct.Struct("<i")
+
+# ID item paket konten; hanya item ini yang boleh disimpan tanpa definisi
+CONTENT_ITEM_IDS = frozenset(data["id"] for data in CONTENT.items)
+
+
+class SaveError(Exception):
+    pass
+
+
+def snapshot(engine):
+    """Keadaan engine sebagai dict biasa (dipakai format biner maupun JSON)."""
+    party = engine.party
+    return {
+        "version": SAVE_VERSION,
+        "items": _custom_items(party),
+        "seed": engine.rng.seed,
+        "battle_count": engine.battle_count,
+        "stage": engine.stage,
+        "wave_size": engine.wave_size,
+        "gold": party.gold,
+        "inventory": dict(party.inventory),
+        "members": [_member_snapshot(member) for member in party.members],
+    }
+
+
+def _member_snapshot(member):
+    return {
+        "class": type(member).__name__,
+        "name": member.name,
+        "max_hp": member._max_hp,
+        "hp": member._hp,
+        "max_mp": member._max_mp,
+        "mp": member._mp,
+        "attack": member._base_attack,
+        "defense": member._base_defense,
+        "evasion": member._base_evasion,
+        "alive": member.is_alive,
+        "xp": member.xp,
+        "level": member.level,
+        "upgrade_points": member.upgrade_points,
+        "equipment": {slot: item.item_id if item else None for slot, item in member.equipped_items.items()},
+    }
+
+
+# Definisi (format entri "items" paket konten) untuk item party di luar paket konten
+def _custom_items(party):
+    items = {}
+    for item_id in party.inventory:
+        if item_id not in CONTENT_ITEM_IDS:
+            items[item_id] = party.catalog[item_id]
+    for member in party.members:
+        for item in member.equipped_items.values():
+            if item is not None and item.item_id not in CONTENT_ITEM_IDS:
+                items[item.item_id] = item
+    return [
+        {"id": item.item_id, "name": item.name, "type": item.item_type, "stat_bonus": dict(item.stat_bonus),
+         "heal_amount": item.heal_amount, "mp_restore": item.mp_restore, "price": item.price,
+         "description": item.description}
+        for item in items.values()
+    ]
+
+
+# Katalog untuk memuat: salinan item paket konten ditambah definisi tersimpan
+def _catalog(definitions):
+    catalog = ItemCatalog(ITEM_CATALOG[item_id] for item_id in CONTENT_ITEM_IDS)
+    for data in definitions:
+        if data["id"] in CONTENT_ITEM_IDS:
+            raise SaveError(f"Definisi item bentrok dengan paket konten: {data['id']}")
+        catalog.add(item_from_data(data))
+    return catalog
+
+
+def _item(catalog, item_id):
+    item = catalog.get(item_id)
+    if item is None:
+        raise SaveError(f"Item tidak dikenal di simpanan: {item_id}")
+    return item
+
+
+def restore(data):
+    """Membangun BattleEngine baru dari snapshot. Panggil start_stage() setelahnya."""
+    if data.get("version") not in SUPPORTED_VERSIONS:
+        raise SaveError(f"Versi simpanan tidak didukung: {data.get('version')}")
+    catalog = _catalog(data.get("items", ()))
+    rng = GameRNG(data["seed"])
+    battle_count = data["battle_count"]
+    classes = {cls.__name__: cls for cls in MEMBER_CLASSES}
+
+    members = []
+    for i, m in enumerate(data["members"]):
+        cls = classes.get(m["class"])
+        if cls is None:
+            raise SaveError(f"Kelas anggota tidak dikenal: {m['class']}")
+        member = cls(m["name"], rng=rng.spawn(f"load-{battle_count}/{i}"))
+        member._max_hp = m["max_hp"]
+        member._hp = m["hp"]
+        member._max_mp = m["max_mp"]
+        member._mp = m["mp"]
+        member._base_attack = m["attack"]
+        member._base_defense = m["defense"]
+        member._base_evasion = m["evasion"]
+        member._alive = m["alive"]
+        member.xp = m["xp"]
+        member.level = m["level"]
+        member.upgrade_points = m["upgrade_points"]
+        for slot, item_id in m["equipment"].items():
+            member.equipped_items[slot] = _item(catalog, item_id) if item_id else None
+        member.invalidate_stats()
+        members.append(member)
+
+    party = Party(members, catalog=catalog)
+    party.gold = data["gold"]
+    for item_id, qty in data["inventory"].items():
+        _item(catalog, item_id)
+        party.inventory[item_id] = qty
+
+    engine = BattleEngine(party, stage=data["stage"], rng=rng, wave_size=data["wave_size"])
+    engine.battle_count = battle_count
+    return engine
+
+
+def _pack_str(out, text):
+    raw = text.encode("utf-8")
+    if len(raw) > 255:
+        raise SaveError(f"Teks terlalu panjang untuk disimpan: {text[:20]}...")
+    out.append(len(raw))
+    out += raw
+
+
+def encode(data):
+    out = bytearray(SAVE_MAGIC)
+    try:
+        out += _ENGINE.pack(data["version"], data["seed"], data["battle_count"], data["stage"],
+                            data["wave_size"], data["gold"])
+        out += _COUNT16.pack(len(data["items"]))
+        for item in data["items"]:
+            _pack_str(out, item["id"])
+            _pack_str(out, item["name"])
+            _pack_str(out, item["type"])
+            out += _ITEM.pack(item["heal_amount"], item["mp_restore"], item["price"])
+            out += _COUNT8.pack(len(item["stat_bonus"]))
+            for stat, value in item["stat_bonus"].items():
+                _pack_str(out, stat)
+                out += _BONUS.pack(value)
+            _pack_str(out, item["description"])
+        out += _COUNT16.pack(len(data["inventory"]))
+        for item_id, qty in data["inventory"].items():
+            _pack_str(out, item_id)
+            out += _QTY.pack(qty)
+        out += _COUNT8.pack(len(data["members"]))
+        class_codes = {cls.__name__: code for code, cls in enumerate(MEMBER_CLASSES)}
+        for m in data["members"]:
+            out.append(class_codes[m["class"]])
+            _pack_str(out, m["name"])
+            out += _MEMBER.pack(m["max_hp"], m["hp"], m["max_mp"], m["mp"], m["attack"], m["defense"],
+                                m["evasion"], m["alive"], m["xp"], m["level"], m["upgrade_points"])
+            for slot in EQUIPMENT_SLOTS:
+                _pack_str(out, m["equipment"][slot] or "")
+    except (struct.error, KeyError) as e:
+        raise SaveError(f"Keadaan permainan tidak bisa disimpan: {e}")
+    return bytes(out)
+
+
+def decode(raw):
+    if len(raw) < 5 or raw[:4] != SAVE_MAGIC:
+        raise SaveError("Berkas bukan simpanan permainan.")
+    if raw[4] not in SUPPORTED_VERSIONS:
+        raise SaveError(f"Versi simpanan tidak didukung: {raw[4]}")
+    view = memoryview(raw)
+    pos = 4
+
+    def read(fmt):
+        nonlocal pos
+        values = fmt.unpack_from(view, pos)
+        pos += fmt.size
+        return values
+
+    def read_str():
+        nonlocal pos
+        size = view[pos]
+        pos += 1 + size
+        return bytes(view[pos - size:pos]).decode("utf-8")
+
+    try:
+        version, seed, battle_count, stage, wave_size, gold = read(_ENGINE)
+        items = []
+        for _ in range(read(_COUNT16)[0] if version >= 2 else 0):
+            item_id, name, item_type = read_str(), read_str(), read_str()
+            heal_amount, mp_restore, price = read(_ITEM)
+            stat_bonus = {}
+            for _ in range(read(_COUNT8)[0]):
+                stat = read_str()
+                stat_bonus[stat] = read(_BONUS)[0]
+            items.append({
+                "id": item_id, "name": name, "type": item_type, "stat_bonus": stat_bonus,
+                "heal_amount": heal_amount, "mp_restore": mp_restore, "price": price,
+                "description": read_str(),
+            })
+        inventory = {}
+        for _ in range(read(_COUNT16)[0]):
+            item_id = read_str()
+            inventory[item_id] = read(_QTY)[0]
+        members = []
+        for _ in range(read(_COUNT8)[0]):
+            cls = MEMBER_CLASSES[view[pos]]
+            pos += 1
+            name = read_str()
+            (max_hp, hp, max_mp, mp, attack, defense, evasion, alive, xp, level,
+             upgrade_points) = read(_MEMBER)
+            equipment = {slot: read_str() or None for slot in EQUIPMENT_SLOTS}
+            members.append({
+                "class": cls.__name__, "name": name, "max_hp": max_hp, "hp": hp, "max_mp": max_mp, "mp": mp,
+                "attack": attack, "defense": defense, "evasion": evasion, "alive": bool(alive), "xp": xp,
+                "level": level, "upgrade_points": upgrade_points, "equipment": equipment,
+            })
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise SaveError(f"Berkas simpanan rusak: {e}")
+    return {
+        "version": version, "items": items, "seed": seed, "battle_count": battle_count, "stage": stage,
+        "wave_size": wave_size, "gold": gold, "inventory": inventory, "members": members,
+    }
+
+
+def save_game(engine, path):
+    with open(path, "wb") as f:
+        f.write(encode(snapshot(engine)))
+
+
+def load_game(path):
+    with open(path, "rb") as f:
+        return restore(decode(f.read()))
+
+
+# Ekspor/impor JSON yang mudah dibaca untuk debugging
+def export_json(engine, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(engine), f, ensure_ascii=False, indent=2)
+
+
+def import_json(path):
+    with open(path, encoding="utf-8") as f:
+        return restore(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekspor berkas simpanan biner ke JSON untuk debugging.")
+    parser.add_argument("save", help="berkas simpanan biner")
+    parser.add_argument("output", nargs="?", help="berkas JSON (default: cetak ke layar)")
+    args = parser.parse_args()
+
+    with open(args.save, "rb") as f:
+        data = decode(f.read())
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
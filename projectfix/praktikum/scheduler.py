@@ -0,0 +1,80 @@
+"""
+Penjadwal giliran pusat di atas root.after.
+
+Semua jeda permainan (giliran monster, tahap berikutnya, reset) melewati
+TurnScheduler sehingga kecepatannya bisa dikalikan, dilewati (fast-forward),
+dan semua callback yang tertunda bisa dibatalkan sekaligus saat reset_game.
+
+Modul ini disalin apa adanya ke project/scheduler.py (dan kelasnya ke
+TurnBasedGame.py yang berdiri sendiri); ubah ketiganya bersama-sama.
+"""
+
+# Jeda standar permainan dalam milidetik (pada kecepatan 1x)
+TURN_DELAY_MS = 1500
+STAGE_DELAY_MS = 4000
+
+# Pilihan pengali kecepatan yang bisa diputar dari UI
+SPEED_MULTIPLIERS = (1, 2, 4, 8)
+
+
+class TurnScheduler:
+    def __init__(self, root, speed=1):
+        self.root = root
+        self.speed = speed
+        self.fast_forward = False
+        self._pending = {}
+        self._next_token = 0
+
+    # Jeda sebenarnya setelah pengali kecepatan / fast-forward
+    def delay_for(self, delay_ms):
+        if self.fast_forward:
+            return 0
+        return int(delay_ms / self.speed)
+
+    # Putar ke pengali kecepatan berikutnya dan kembalikan nilainya
+    def cycle_speed(self):
+        if self.speed in SPEED_MULTIPLIERS:
+            index = (SPEED_MULTIPLIERS.index(self.speed) + 1) % len(SPEED_MULTIPLIERS)
+        else:
+            index = 0
+        self.speed = SPEED_MULTIPLIERS[index]
+        return self.speed
+
+    def set_fast_forward(self, enabled):
+        self.fast_forward = enabled
+        if enabled:
+            self.skip()
+
+    def schedule(self, delay_ms, callback, *args):
+        """
+        Menjadwalkan callback(*args) setelah delay_ms (skala 1x); dibatalkan
+        lewat cancel_all() atau dijalankan lebih awal lewat skip().
+        """
+        self._next_token += 1
+        token = self._next_token
+        after_id = self.root.after(self.delay_for(delay_ms), self._run, token)
+        self._pending[token] = (after_id, callback, args)
+        return token
+
+    def _run(self, token):
+        entry = self._pending.pop(token, None)
+        if entry is None:
+            return
+        _, callback, args = entry
+        callback(*args)
+
+    # Membatalkan semua callback yang tertunda (dipakai saat reset_game)
+    def cancel_all(self):
+        pending, self._pending = self._pending, {}
+        for after_id, _, _ in pending.values():
+            self.root.after_cancel(after_id)
+
+    # Menjalankan sekarang juga semua callback yang sedang menunggu
+    def skip(self):
+        for token in list(self._pending):
+            entry = self._pending.pop(token, None)
+            if entry is None:
+                continue
+            after_id, callback, args = entry
+            self.root.after_cancel(after_id)
+            callback(*args)
@@ -0,0 +1,410 @@
+"""
+Saran belanja toko: knapsack berbatas atas item toko untuk emas party.
+
+Setiap anggota party bisa mengganti perlengkapan per slot dengan item toko
+(dibeli) atau item perlengkapan di inventaris (gratis, dibatasi jumlahnya),
+sisa emas dipakai untuk ramuan. Kombinasi dinilai dengan SurvivalEvaluator:
+perkiraan cepat (tanpa lemparan dadu) berapa tahap dari N tahap berikutnya
+yang bisa dilewati party jika semua pemain terus menyerang.
+
+Perkiraan per tahap memakai nilai harapan: kerusakan party per ronde
+(hindaran dan kritis monster/pemain), kerusakan monster per ronde dibagi
+rata ke anggota hidup, monster dikalahkan berurutan, regenerasi 50 HP per
+monster, serta XP akhir tahap yang menaikkan level. HP party dibawa ke
+tahap berikutnya; ramuan kesehatan dipakai saat HP habis. Nilai:
+    tahap yang dilewati (+ sisa pecahan di tahap yang gagal)
+    + sisa HP / HP maksimum jika semua N tahap dilewati
+
+Profil setiap anggota per tahap disimpan menurut vektor statistiknya, dan
+knapsack ramuan (jumlah tiap jenis dibatasi) disimpan per sisa emas,
+sehingga ribuan kombinasi perlengkapan bisa dinilai di bawah 100 ms.
+
+Contoh:
+    python shop_planner.py --stage 4 --gold 800
+"""
+import argparse
+import math
+import time
+from collections import Counter
+from functools import lru_cache
+
+from game_logic import (
+    KILL_HEAL, MONSTER_AI_SPECIAL_CHANCE, MONSTER_SPECIAL_CHANCE, PLAYER_CRIT_CHANCE, BattleEngine, EQUIPMENT_SLOTS,
+    GameRNG, ITEM_TYPE_EQUIPMENT, ITEM_TYPE_POTION, REVIVE_POTION, SHOP_ITEMS, get_item_slot, monster_base_stats
+)
+
+# Jumlah tahap yang dinilai dan batas ramuan per jenis (termasuk yang sudah dimiliki)
+DEFAULT_LOOKAHEAD = 5
+DEFAULT_MAX_POTIONS = 10
+
+# Peluang serangan monster biasa menjadi spesial: AI mencoba, lalu Monster.special_attack berhasil
+REGULAR_SPECIAL_CHANCE = MONSTER_AI_SPECIAL_CHANCE * MONSTER_SPECIAL_CHANCE
+
+STAT_FIELDS = ("attack", "defense", "evasion", "critical_damage")
+
+
+def _evade_chance(evasion):
+    return min(100, max(0, evasion)) / 100
+
+
+# Penyembuhan satu ramuan: ramuan kebangkitan memulihkan setengah max_hp
+def _potion_heal(item, max_hp):
+    return max_hp // 2 if item.item_id == REVIVE_POTION.item_id else item.heal_amount
+
+
+def item_bonus(item):
+    """Bonus (serangan, pertahanan, hindaran, kerusakan kritis) sebuah perlengkapan."""
+    if item is None:
+        return (0, 0, 0, 0)
+    bonus = item.stat_bonus
+    return tuple(bonus.get(field, 0) for field in STAT_FIELDS)
+
+
+def base_stats(member):
+    """(max_hp, serangan, pertahanan, hindaran, kritis, xp) anggota tanpa perlengkapannya."""
+    attack, defense, evasion, critical = (sum(values) for values in
+                                          zip(*(item_bonus(item) for item in member.equipped_items.values())))
+    base_evasion = member.evasion_stat - evasion if member.evasion_stat < 100 else 100
+    return (member.max_hp, member.attack_stat - attack, member.defense_stat - defense, base_evasion,
+            member.total_critical_damage_bonus() - critical, member.xp)
+
+
+def loadout_stats(base, items):
+    """Statistik anggota dengan perlengkapan items (satu per slot, boleh None)."""
+    max_hp, attack, defense, evasion, critical, xp = base
+    for item in items:
+        a, d, e, c = item_bonus(item)
+        attack += a
+        defense += d
+        evasion += e
+        critical += c
+    return (max_hp, attack, defense, min(100, evasion), critical, xp)
+
+
+# Monster tahap s: (jumlah, hp, serangan, pertahanan, peluang hindar, boss?)
+def stage_foes(stage):
+    if stage % 3 == 0:
+        hp, _, attack, defense, evasion = monster_base_stats("boss", stage // 3)
+        return 1, hp, attack, defense, _evade_chance(evasion), True
+    hp, _, attack, defense, evasion = monster_base_stats("regular", stage)
+    return (1 if stage == 1 else 2), hp, attack, defense, _evade_chance(evasion), False
+
+
+class SurvivalEvaluator:
+    """
+    Perkiraan cepat kelangsungan hidup party untuk lookahead tahap mulai
+    dari stage. profile() disimpan per vektor statistik anggota.
+    """
+    def __init__(self, stage, lookahead=DEFAULT_LOOKAHEAD):
+        self.stage = stage
+        self.lookahead = lookahead
+        self.foes = [stage_foes(s) for s in range(stage, stage + lookahead)]
+        self._profiles = {}
+        self._dealt = {}
+        self._taken = {}
+        self._level_ups = {}
+
+    def profile(self, stats):
+        """
+        Per tahap: (kerusakan harapan ke monster per ronde, kerusakan harapan
+        yang diterima dari satu serangan monster, max_hp, HP dari naik level).
+        """
+        cached = self._profiles.get(stats)
+        if cached is not None:
+            return cached
+        max_hp, attack, defense, evasion, critical, xp = stats
+        cached = self._profiles[stats] = tuple((d, t, max_hp + 10 * ups, 10 * gained)
+                                               for d, t, (ups, gained) in zip(self.dealt(attack, critical, xp),
+                                                                              self.taken(defense, evasion, xp),
+                                                                              self._levels(xp)))
+        return cached
+
+    # Kerusakan hanya bergantung pada serangan dan kritis, kerusakan diterima pada
+    # pertahanan dan hindaran, jadi keduanya disimpan terpisah (lebih sedikit kombinasi)
+    def dealt(self, attack, critical, xp):
+        """Per tahap: kerusakan harapan ke monster per ronde (kolom pertama profile())."""
+        dealt = self._dealt.get((attack, critical, xp))
+        if dealt is None:
+            dealt = self._dealt[(attack, critical, xp)] = self._dealt_per_stage(attack, critical, xp)
+        return dealt
+
+    def taken(self, defense, evasion, xp):
+        """Per tahap: kerusakan harapan dari satu serangan monster (kolom kedua profile())."""
+        taken = self._taken.get((defense, evasion, xp))
+        if taken is None:
+            taken = self._taken[(defense, evasion, xp)] = self._taken_per_stage(defense, evasion, xp)
+        return taken
+
+    # Per tahap: (jumlah naik level sejak xp, naik level di akhir tahap sebelumnya)
+    def _levels(self, xp):
+        levels = self._level_ups.get(xp)
+        if levels is not None:
+            return levels
+        levels = self._level_ups[xp] = []
+        ups = 0
+        for s in range(self.stage, self.stage + self.lookahead):
+            # XP akhir tahap sebelumnya (50 x tahap) untuk semua anggota
+            total_ups = (xp + sum(50 * t for t in range(self.stage, s))) // 100
+            levels.append((total_ups, total_ups - ups))
+            ups = total_ups
+        return levels
+
+    def _dealt_per_stage(self, attack, critical, xp):
+        return [self.dealt_at(index, attack, critical, xp) for index in range(len(self.foes))]
+
+    def _taken_per_stage(self, defense, evasion, xp):
+        return [self.taken_at(index, defense, evasion, xp) for index in range(len(self.foes))]
+
+    def dealt_at(self, index, attack, critical, xp):
+        """Seperti dealt(), tetapi hanya untuk tahap ke-index (tanpa cache)."""
+        _, _, _, foe_defense, foe_evade, _ = self.foes[index]
+        damage = max(1, attack + 5 * self._levels(xp)[index][0] - foe_defense)
+        return (1 - foe_evade) * ((1 - PLAYER_CRIT_CHANCE) * damage
+                                  + PLAYER_CRIT_CHANCE * int(damage * (2 + critical / 100)))
+
+    def taken_at(self, index, defense, evasion, xp):
+        """Seperti taken(), tetapi hanya untuk tahap ke-index (tanpa cache)."""
+        _, _, foe_attack, _, _, boss = self.foes[index]
+        ups = self._levels(xp)[index][0]
+        level_defense = defense + 5 * ups
+        evade = _evade_chance(evasion + 5 * ups)
+        normal = max(1, foe_attack - level_defense)
+        if boss:
+            special = max(1, foe_attack * 3 - level_defense)
+            chance = MONSTER_AI_SPECIAL_CHANCE
+            return chance * special + (1 - chance) * (1 - evade) * normal
+        special = max(1, int(foe_attack * 1.5) - level_defense)
+        return (1 - evade) * ((1 - REGULAR_SPECIAL_CHANCE) * normal + REGULAR_SPECIAL_CHANCE * special)
+
+    def evaluate(self, members, hps, heal_pool=0):
+        """
+        Nilai kelangsungan hidup untuk anggota dengan statistik members dan
+        HP hps, plus total penyembuhan ramuan heal_pool. Mengembalikan
+        (nilai, penyembuhan ramuan yang terpakai).
+        """
+        return self.evaluate_profiles([self.profile(stats) for stats in members], hps, heal_pool)
+
+    def evaluate_profiles(self, profiles, hps, heal_pool=0):
+        """Seperti evaluate(), tetapi langsung dari hasil profile() setiap anggota."""
+        return self.evaluate_ratios(None, profiles, hps, heal_pool)
+
+    def evaluate_ratios(self, ratios, profiles, hps, heal_pool=0):
+        """
+        Seperti evaluate_profiles(), tetapi per tahap memakai ratios[tahap] =
+        total kerusakan diterima / total kerusakan party sebagai ganti kolom
+        kerusakan profiles (None: dihitung dari profiles). Nilai hanya
+        bergantung pada rasio itu dan tidak pernah naik jika rasionya naik,
+        jadi batas bawah rasio memberi batas atas nilai.
+        """
+        profiles = [profile for profile, hp in zip(profiles, hps) if hp > 0]
+        if not profiles:
+            return 0.0, 0
+        hp = sum(hp for hp in hps if hp > 0)
+        used = 0
+        max_hp = 0
+        living = len(profiles)
+        for index, (count, foe_hp, _, _, _, _) in enumerate(self.foes):
+            dealt = taken = max_hp = level_heal = 0
+            for profile in profiles:
+                d, t, m, healed = profile[index]
+                dealt += d
+                taken += t
+                max_hp += m
+                level_heal += healed
+            ratio = taken / dealt if ratios is None else ratios[index]
+            hp = min(max_hp, hp + level_heal)
+            # Monster ke-k hidup selama k * (hp / kerusakan party) ronde, serangannya dibagi rata
+            monster_rounds = foe_hp * count * (count + 1) / 2
+            damage = monster_rounds * ratio / living
+            healed = min(KILL_HEAL * count, damage)
+            if hp + healed - damage <= 0:
+                shortfall = damage - healed - hp + 1
+                if heal_pool - used < shortfall:
+                    return index + (hp + heal_pool - used) / (damage - healed), heal_pool
+                used += shortfall
+                hp = 1
+            else:
+                hp = min(max_hp, hp + healed - damage)
+        return self.lookahead + hp / max_hp, used
+
+
+class ShopPlan:
+    """Hasil ShopPlanner: item yang dibeli, perlengkapan tiap anggota, dan nilainya."""
+    __slots__ = ("purchases", "loadout", "cost", "score", "baseline", "combinations")
+
+    def __init__(self, purchases, loadout, cost, score, baseline, combinations):
+        self.purchases = purchases
+        self.loadout = loadout
+        self.cost = cost
+        self.score = score
+        self.baseline = baseline
+        self.combinations = combinations
+
+    def message(self):
+        if not self.purchases:
+            return f"Tidak ada pembelian yang meningkatkan peluang bertahan (nilai {self.score:.2f})."
+        lines = [f"{qty}x {item.name}" for item, qty in self.purchases.items()]
+        lines.append(f"Total {self.cost} Emas; nilai bertahan {self.baseline:.2f} -> {self.score:.2f}")
+        for member, changes in self.loadout:
+            if changes:
+                lines.append(f"{member.name}: " + ", ".join(item.name for item in changes.values()))
+        return "\n".join(lines)
+
+    __str__ = message
+
+
+class ShopPlanner:
+    """
+    Memilih pembelian toko dengan emas party yang memaksimalkan nilai
+    SurvivalEvaluator. Perlengkapan: paling banyak satu item per slot per
+    anggota; ramuan: paling banyak max_potions per jenis.
+    """
+    def __init__(self, shop_items=None, lookahead=DEFAULT_LOOKAHEAD, max_potions=DEFAULT_MAX_POTIONS):
+        self.shop_items = list(shop_items if shop_items is not None else SHOP_ITEMS)
+        self.lookahead = lookahead
+        self.max_potions = max_potions
+
+    # Pilihan per slot: (biaya, item, dari inventaris?); yang didominasi dibuang
+    def _slot_candidates(self, member, slot, owned):
+        current = member.equipped_items[slot]
+        candidates = [(0, current, False)]
+        for item, qty in owned.items():
+            if get_item_slot(item) == slot and qty > 0 and item is not current:
+                candidates.append((0, item, True))
+        for item in self.shop_items:
+            if item.item_type == ITEM_TYPE_EQUIPMENT and get_item_slot(item) == slot and item is not current:
+                candidates.append((item.price, item, False))
+        kept = []
+        for cost, item, from_inventory in sorted(candidates, key=lambda c: (c[0], c[2])):
+            bonus = item_bonus(item)
+            if any(k_cost <= cost and all(a >= b for a, b in zip(item_bonus(k_item), bonus))
+                   and (not k_owned or from_inventory) for k_cost, k_item, k_owned in kept):
+                continue
+            kept.append((cost, item, from_inventory))
+        return kept
+
+    # Semua kombinasi slot anggota: (biaya, statistik, item per slot, item inventaris yang dipakai)
+    def _member_options(self, member, owned):
+        base = base_stats(member)
+        options = [(0, (), ())]
+        for slot in EQUIPMENT_SLOTS:
+            options = [(cost + c_cost, items + (item,), used + ((item,) if from_inventory else ()))
+                       for cost, items, used in options
+                       for c_cost, item, from_inventory in self._slot_candidates(member, slot, owned)]
+        result = [(cost, loadout_stats(base, items), items, used) for cost, items, used in options]
+        result.sort(key=lambda option: option[0])
+        return result
+
+    def plan(self, party, stage):
+        """ShopPlan terbaik untuk party sebelum tahap stage."""
+        evaluator = SurvivalEvaluator(stage, self.lookahead)
+        members = party.members
+        hps = [m.hp if m.is_alive else 0 for m in members]
+        owned = Counter({item: qty for item, qty in party.inventory_items() if item.item_type == ITEM_TYPE_EQUIPMENT})
+        options = [self._member_options(m, owned) for m in members]
+
+        # Knapsack berbatas ramuan: penyembuhan maksimum untuk sisa emas, disimpan per emas
+        max_hp = max((m.max_hp for m in members), default=0)
+        potions = []
+        for item in self.shop_items:
+            if item.item_type != ITEM_TYPE_POTION:
+                continue
+            heal = _potion_heal(item, max_hp)
+            bound = max(0, self.max_potions - party.quantity(item))
+            if heal > 0 and bound > 0:
+                potions.append((item, heal, bound))
+        owned_heal = sum(_potion_heal(item, max_hp) * qty
+                         for item, qty in party.inventory_items() if item.item_type == ITEM_TYPE_POTION)
+
+        @lru_cache(maxsize=None)
+        def best_potions(index, gold):
+            if index == len(potions):
+                return 0, ()
+            item, heal, bound = potions[index]
+            best = best_potions(index + 1, gold)
+            for qty in range(1, min(bound, gold // item.price) + 1):
+                value, bought = best_potions(index + 1, gold - qty * item.price)
+                if value + qty * heal > best[0]:
+                    best = (value + qty * heal, ((item, qty),) + bought)
+            return best
+
+        current = [loadout_stats(base_stats(m), m.equipped_items.values()) for m in members]
+        baseline, _ = evaluator.evaluate(current, hps, owned_heal)
+
+        best = None
+        combinations = 0
+        chosen = [None] * len(members)
+        used = Counter()
+
+        def search(index, gold):
+            nonlocal best, combinations
+            if index == len(members):
+                combinations += 1
+                heal, bought = best_potions(0, gold)
+                score, drawn = evaluator.evaluate([option[1] for option in chosen], hps, owned_heal + heal)
+                cost = party.gold - gold
+                key = (score, -cost)
+                if best is None or key > best[0]:
+                    best = (key, tuple(chosen), bought, drawn)
+                return
+            for option in options[index]:
+                cost, _, _, items_used = option
+                if cost > gold:
+                    break
+                if any(used[item] >= owned[item] for item in items_used):
+                    continue
+                used.update(items_used)
+                chosen[index] = option
+                search(index + 1, gold - cost)
+                used.subtract(items_used)
+
+        search(0, party.gold)
+        (score, _), loadout, bought, drawn = best
+
+        purchases = Counter()
+        changes = []
+        for member, (_, _, items, items_used) in zip(members, loadout):
+            member_changes = {}
+            for slot, item in zip(EQUIPMENT_SLOTS, items):
+                if item is not member.equipped_items[slot]:
+                    member_changes[slot] = item
+                    if item not in items_used:
+                        purchases[item] += 1
+            changes.append((member, member_changes))
+        # Hanya ramuan secukupnya untuk penyembuhan yang benar-benar terpakai dalam perkiraan
+        need = max(0, math.ceil(drawn) - owned_heal)
+        for item, qty in bought:
+            heal = _potion_heal(item, max_hp)
+            take = min(qty, -(-need // heal))
+            if take > 0:
+                purchases[item] += take
+                need -= take * heal
+        cost = sum(item.price * qty for item, qty in purchases.items())
+        if cost == 0:
+            score = baseline
+        else:
+            potion_heal = sum(_potion_heal(item, max_hp) * qty
+                              for item, qty in purchases.items() if item.item_type == ITEM_TYPE_POTION)
+            score, _ = evaluator.evaluate([option[1] for option in loadout], hps, owned_heal + potion_heal)
+        return ShopPlan(purchases, changes, cost, score, baseline, combinations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Saran belanja toko untuk party bawaan.")
+    parser.add_argument("--stage", type=int, default=1)
+    parser.add_argument("--gold", type=int, default=None, help="emas party (bawaan: emas party baru)")
+    parser.add_argument("--lookahead", type=int, default=DEFAULT_LOOKAHEAD)
+    args = parser.parse_args()
+
+    engine = BattleEngine(rng=GameRNG(0), stage=args.stage)
+    if args.gold is not None:
+        engine.party.gold = args.gold
+    start = time.perf_counter()
+    plan = ShopPlanner(lookahead=args.lookahead).plan(engine.party, args.stage)
+    elapsed = time.perf_counter() - start
+    print(plan.message())
+    print(f"{plan.combinations} kombinasi perlengkapan dinilai dalam {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
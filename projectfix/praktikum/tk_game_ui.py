@@ -1,19 +1,61 @@
+import os
 import tkinter as tk
-from tkinter import messagebox, simpledialog
-import random
+from tkinter import messagebox
 from game_logic import (
-    Player, Sage, Monster, BossMonster,
     ITEM_TYPE_POTION, ITEM_TYPE_EQUIPMENT,
     HEALTH_POTION, MP_POTION, WOODEN_SWORD, IRON_SWORD,
     LEATHER_ARMOR, CHAINMAIL_ARMOR, LUCKY_CHARM, CRIT_RING,
-    REVIVE_POTION, MAGIC_STAFF, MYSTIC_ROBE, MAGIC_RING,
-    Party
+    REVIVE_POTION, MAGIC_STAFF, MYSTIC_ROBE, MAGIC_RING, SHOP_ITEMS,
+    BattleEngine, PHASE_PLAYER, PHASE_MONSTER, PHASE_WON, PHASE_LOST,
+    ACTION_ATTACK, ACTION_SPECIAL, ACTION_DEFEND, GAME_OVER_MESSAGE,
+    MonsterPool, CHANGE_HP, CHANGE_MP, CHANGE_STATS, CHANGE_LEVEL, CHANGE_EQUIPMENT, CHANGE_GOLD
+)
+from scheduler import TurnScheduler, TURN_DELAY_MS, STAGE_DELAY_MS
+from savegame import SaveError, decode, save_game
+from auto_battle import ACTION_POTION, AutoBattlePlanner, AutoBattleWorker, BattleSnapshot
+from encounter_oracle import EncounterOracle, EncounterOracleWorker
+from loadout import OBJECTIVE_DAMAGE, OBJECTIVE_SURVIVAL, LoadoutSolver
+from shop_planner import ShopPlanner
+from replay import (
+    GameSession, monster_at, monster_index, save_recording, COMMAND_START_STAGE, COMMAND_PLAYER_TURN, COMMAND_MONSTER_TURN,
+    COMMAND_END_BATTLE, COMMAND_RESET, COMMAND_UPGRADE, COMMAND_UNEQUIP, COMMAND_USE_ITEM, COMMAND_BUY, COMMAND_LOAD
+)
+from battle_log import BattleLog
+from inventory_view import (
+    InventoryIndex, VirtualListbox, format_inventory_row, ITEM_TYPE_FILTERS, STAT_FILTERS, SORT_OPTIONS
 )
 
 WINDOW_WIDTH = 1100
 WINDOW_HEIGHT = 650
 FONT_NAME = "Helvetica"
 
+# Lokasi berkas simpanan permainan
+SAVE_PATH = os.path.join(os.path.expanduser("~"), ".turnbased_rpg.sav")
+
+# Log peristiwa pertarungan (JSON Lines), dirotasi setelah BATTLE_LOG_MAX_BYTES
+BATTLE_LOG_PATH = os.path.join(os.path.expanduser("~"), ".turnbased_rpg_battle.jsonl")
+BATTLE_LOG_MAX_BYTES = 1_000_000
+
+# Anggaran berpikir mode otomatis per keputusan dan selang pemeriksaan hasilnya
+AUTO_BATTLE_BUDGET_MS = 150
+AUTO_POLL_MS = 20
+
+# Selang pemeriksaan hasil peluang menang dari thread EncounterOracle
+ODDS_POLL_MS = 50
+
+# Rekaman sesi terakhir (seed + perintah) untuk direplay dengan replay.py
+SESSION_PATH = os.path.join(os.path.expanduser("~"), ".turnbased_rpg_session.json")
+
+# Label panel pemain yang perlu diformat ulang untuk setiap jenis perubahan model
+PLAYER_FIELDS = ("name", "hp", "mp", "stats", "level", "equipped")
+PLAYER_FIELDS_BY_CHANGE = {
+    CHANGE_HP: ("hp",),
+    CHANGE_MP: ("mp",),
+    CHANGE_STATS: ("stats",),
+    CHANGE_LEVEL: ("level",),
+    CHANGE_EQUIPMENT: ("equipped",),
+}
+
 class RPGGameUI:
     def __init__(self, root):
         self.root = root
@@ -22,17 +64,59 @@ class RPGGameUI:
         self.root.resizable(False, False)
         self.root.configure(bg="#1a1a2e")
 
-        self.stage = 1
-        self.party = Party(members=[Player(), Sage()])
-        self.party.gold = 200
-        self.current_player_index = 0
-        self.monsters = []
-        self.player_defending = False
+        # Semua perubahan model lewat session agar bisa direkam dan direplay
+        self.session = GameSession(BattleEngine())
+        self.scheduler = TurnScheduler(root)
+        self.battle_log = BattleLog(BATTLE_LOG_PATH, max_bytes=BATTLE_LOG_MAX_BYTES)
+        self.engine.set_event_handler(self.battle_log)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Penanda widget yang perlu diperbarui dan nilai terakhir yang ditampilkan
+        self.dirty = set()
+        self.flush_scheduled = False
+        self.shown_text = {}
+        self.monster_visible = {}
+        self.upgrade_buttons_state = None
+        self.player_slots = {}
+        self.monster_slots = {}
+
+        # Tombol target dipakai ulang, bukan dibuat ulang setiap giliran
+        self.target_buttons = []
+
+        # Mode otomatis: planner berjalan di thread lain, keputusan basi dikenali dari token
+        self.auto_battle = False
+        self.auto_worker = None
+        self.auto_token = 0
+
+        # Peluang menang dihitung di thread lain; hasil basi dikenali dari token
+        self.odds_worker = None
+        self.odds_token = 0
 
         self.setup_frames()
         self.create_widgets()
         self.start_stage()
 
+    # Status permainan disimpan di BattleEngine
+    @property
+    def engine(self):
+        return self.session.engine
+
+    @property
+    def stage(self):
+        return self.engine.stage
+
+    @property
+    def party(self):
+        return self.engine.party
+
+    @property
+    def monsters(self):
+        return self.engine.monsters
+
+    @property
+    def current_player_index(self):
+        return self.engine.current_player_index
+
     def setup_frames(self):
         self.main_frame = tk.Frame(self.root, bg="#1a1a2e")
         self.main_frame.pack(expand=True, fill="both", padx=20, pady=10)
@@ -63,6 +147,9 @@ class RPGGameUI:
         self.buttons_frame = tk.Frame(self.root, bg="#1a1a2e")
         self.buttons_frame.pack(pady=5)
 
+        # Panel pemilihan target; menggantikan tombol aksi selama memilih
+        self.target_frame = tk.Frame(self.root, bg="#1a1a2e")
+
         self.upgrade_frame = tk.LabelFrame(self.root, text="Peningkatan", fg="#4ecdc4", bg="#2d2d44",
                                           font=(FONT_NAME, 12, "bold"))
         self.upgrade_frame.pack(fill="x", padx=20, pady=5)
@@ -111,6 +198,8 @@ class RPGGameUI:
         self.status_var = tk.StringVar()
         tk.Label(self.status_frame, textvariable=self.status_var, font=(FONT_NAME, 12), fg="#E0E0E0", bg="#1a1a2e",
                  wraplength=1050).pack()
+        self.odds_var = tk.StringVar()
+        tk.Label(self.status_frame, textvariable=self.odds_var, font=(FONT_NAME, 10), fg="#9aa0c0", bg="#1a1a2e").pack()
 
         self.gold_var = tk.StringVar()
         tk.Label(self.menu_frame, textvariable=self.gold_var, font=(FONT_NAME, 14, "bold"), fg="#ffaa00",
@@ -128,6 +217,11 @@ class RPGGameUI:
         self.action_buttons["special"].grid(row=0, column=1, padx=8)
         self.action_buttons["defend"].grid(row=0, column=2, padx=8)
 
+        tk.Label(self.target_frame, text="Pilih target monster:", font=(FONT_NAME, 12, "bold"), fg="white",
+                 bg="#1a1a2e").grid(row=0, column=0, rowspan=2, padx=8)
+        tk.Button(self.target_frame, text="Batal", font=(FONT_NAME, 11, "bold"), bg="#ff5555", fg="white",
+                  command=self.cancel_selection).grid(row=0, column=7, rowspan=2, padx=8)
+
         self.upgrade_info_var = tk.StringVar()
         tk.Label(self.upgrade_frame, textvariable=self.upgrade_info_var, font=(FONT_NAME, 12), fg="#4ecdc4",
                  bg="#2d2d44").pack(pady=5)
@@ -162,430 +256,655 @@ class RPGGameUI:
         tk.Button(self.menu_frame, text="Toko", command=self.open_shop_window, font=(FONT_NAME, 12), bg="#28a745",
                   fg="white", width=12).grid(row=0, column=1, padx=20)
 
-    def update_all_ui(self):
+        self.speed_var = tk.StringVar(value="Kecepatan: 1x")
+        tk.Button(self.menu_frame, textvariable=self.speed_var, command=self.cycle_speed, font=(FONT_NAME, 12),
+                  bg="#6c757d", fg="white", width=14).grid(row=0, column=3, padx=10)
+        self.fast_forward_var = tk.StringVar(value="Lewati: Mati")
+        tk.Button(self.menu_frame, textvariable=self.fast_forward_var, command=self.toggle_fast_forward,
+                  font=(FONT_NAME, 12), bg="#6c757d", fg="white", width=14).grid(row=0, column=4, padx=10)
+        tk.Button(self.menu_frame, text="Simpan", command=self.save_game, font=(FONT_NAME, 12), bg="#17a2b8",
+                  fg="white", width=8).grid(row=0, column=5, padx=5)
+        tk.Button(self.menu_frame, text="Muat", command=self.load_game, font=(FONT_NAME, 12), bg="#17a2b8",
+                  fg="white", width=8).grid(row=0, column=6, padx=5)
+        self.auto_battle_var = tk.StringVar(value="Otomatis: Mati")
+        tk.Button(self.menu_frame, textvariable=self.auto_battle_var, command=self.toggle_auto_battle,
+                  font=(FONT_NAME, 12), bg="#6c757d", fg="white", width=14).grid(row=0, column=7, padx=10)
+
+        self.build_inventory_window()
+        self.build_shop_window()
+
+    # Menghubungkan objek model ke UI; perubahan model hanya menandai widget terkait
+    def bind_model(self):
+        self.party.on_change = self.on_model_change
+        self.party.on_item_change = self.on_inventory_item_change
+        self.refresh_inventory_list()
+        self.player_slots = {}
         for i, player in enumerate(self.party.members):
-            p = player
-            vars = self.player_vars[i]
-            vars["name"].set(p.name)
-            vars["hp"].set(f"HP: {p.hp} / {p.max_hp}")
-            vars["mp"].set(f"MP: {p.mp} / {p.max_mp}")
-            vars["stats"].set(f"Serangan: {p.attack_stat} | Pertahanan: {p.defense_stat} | Hindaran: {p.evasion_stat}%")
-            vars["level"].set(f"Level: {p.level} | XP: {p.xp}/100")
-            weapon = p.equipped_items.get('weapon')
-            armor = p.equipped_items.get('armor')
-            accessory = p.equipped_items.get('accessory')
-            equipped_text = (
-                f"Senjata: {weapon.name if weapon else 'Kosong'}\n"
-                f"Zirah: {armor.name if armor else 'Kosong'}\n"
-                f"Aksesori: {accessory.name if accessory else 'Kosong'}"
-            )
-            vars["equipped"].set(equipped_text)
-
-        for i, m_widget in enumerate(self.monster_widgets):
-            if i < len(self.monsters) and self.monsters[i].is_alive:
-                m = self.monsters[i]
-                m_widget["vars"]["name"].set(m.name)
-                m_widget["vars"]["hp"].set(f"HP: {m.hp} / {m.max_hp}")
-                m_widget["vars"]["stats"].set(f"ATK: {m.attack_stat} | DEF: {m.defense_stat}")
+            player.on_change = self.on_model_change
+            self.player_slots[player] = i
+
+        monsters = self.monsters
+        if isinstance(monsters, MonsterPool):
+            monsters.on_change = self.on_model_change
+        else:
+            for monster in monsters:
+                monster.on_change = self.on_model_change
+        self.bind_monster_slots()
+        self.mark_all_dirty()
+
+    # Monster yang ditampilkan di slot widget (dua monster pertama)
+    def bind_monster_slots(self):
+        monsters = self.monsters
+        shown = min(len(monsters), len(self.monster_widgets))
+        self.monster_slots = {monsters[i]: i for i in range(shown)}
+
+    def on_model_change(self, obj, kind):
+        if obj is self.party:
+            if kind == CHANGE_GOLD:
+                self.dirty.add(("gold", None, kind))
+        elif obj is self.monsters:
+            # Pool di-compact: indeks monster bergeser
+            self.bind_monster_slots()
+            for i in range(len(self.monster_widgets)):
+                self.dirty.add(("monster", i, None))
+        elif obj in self.player_slots:
+            self.dirty.add(("player", self.player_slots[obj], kind))
+        elif obj in self.monster_slots:
+            self.dirty.add(("monster", self.monster_slots[obj], kind))
+        else:
+            return
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.root.after_idle(self.refresh_ui)
+
+    def mark_all_dirty(self):
+        for i in range(len(self.party.members)):
+            self.dirty.add(("player", i, None))
+        for i in range(len(self.monster_widgets)):
+            self.dirty.add(("monster", i, None))
+        self.dirty.add(("gold", None, None))
+
+    # Menggambar ulang semua widget (awal tahap / reset)
+    def update_all_ui(self):
+        self.mark_all_dirty()
+        self.refresh_ui()
+
+    # Hanya memperbarui widget yang ditandai kotor sejak refresh terakhir
+    def refresh_ui(self):
+        self.flush_scheduled = False
+        dirty, self.dirty = self.dirty, set()
+        for section, index, kind in dirty:
+            if section == "player":
+                self.render_player(index, PLAYER_FIELDS_BY_CHANGE.get(kind, PLAYER_FIELDS))
+            elif section == "monster":
+                self.render_monster(index)
+            elif section == "gold":
+                self.set_text(self.gold_var, f"Emas: {self.party.gold}")
+        self.render_upgrade_panel()
+
+    # StringVar.set hanya dipanggil jika teksnya benar-benar berubah
+    def set_text(self, var, text):
+        key = str(var)
+        if self.shown_text.get(key) != text:
+            self.shown_text[key] = text
+            var.set(text)
+
+    def render_player(self, index, fields):
+        p = self.party.members[index]
+        vars = self.player_vars[index]
+        for field in fields:
+            if field == "name":
+                text = p.name
+            elif field == "hp":
+                text = f"HP: {p.hp} / {p.max_hp}"
+            elif field == "mp":
+                text = f"MP: {p.mp} / {p.max_mp}"
+            elif field == "stats":
+                text = f"Serangan: {p.attack_stat} | Pertahanan: {p.defense_stat} | Hindaran: {p.evasion_stat}%"
+            elif field == "level":
+                text = f"Level: {p.level} | XP: {p.xp}/100"
+            else:
+                weapon = p.equipped_items.get('weapon')
+                armor = p.equipped_items.get('armor')
+                accessory = p.equipped_items.get('accessory')
+                text = (
+                    f"Senjata: {weapon.name if weapon else 'Kosong'}\n"
+                    f"Zirah: {armor.name if armor else 'Kosong'}\n"
+                    f"Aksesori: {accessory.name if accessory else 'Kosong'}"
+                )
+            self.set_text(vars[field], text)
+
+    def render_monster(self, index):
+        m_widget = self.monster_widgets[index]
+        visible = index < len(self.monsters) and self.monsters[index].is_alive
+        if visible:
+            m = self.monsters[index]
+            self.set_text(m_widget["vars"]["name"], m.name)
+            self.set_text(m_widget["vars"]["hp"], f"HP: {m.hp} / {m.max_hp}")
+            self.set_text(m_widget["vars"]["stats"], f"ATK: {m.attack_stat} | DEF: {m.defense_stat}")
+        if self.monster_visible.get(index) != visible:
+            self.monster_visible[index] = visible
+            if visible:
                 m_widget["frame"].grid()
             else:
                 m_widget["frame"].grid_remove()
 
-        self.gold_var.set(f"Emas: {self.party.gold}")
-
+    # Panel peningkatan bergantung pada pemain yang sedang mendapat giliran
+    def render_upgrade_panel(self):
         current_player = self.party.members[self.current_player_index]
-        self.upgrade_info_var.set(f"Poin Peningkatan ({current_player.name}): {current_player.upgrade_points}")
+        self.set_text(self.upgrade_info_var,
+                      f"Poin Peningkatan ({current_player.name}): {current_player.upgrade_points}")
         state = "normal" if current_player.upgrade_points > 0 else "disabled"
-        for btn in self.upgrade_buttons.values():
-            btn.config(state=state)
+        if state != self.upgrade_buttons_state:
+            self.upgrade_buttons_state = state
+            for btn in self.upgrade_buttons.values():
+                btn.config(state=state)
+
+    def cycle_speed(self):
+        speed = self.scheduler.cycle_speed()
+        self.speed_var.set(f"Kecepatan: {speed}x")
+
+    # Mode lewati: semua jeda animasi/giliran menjadi 0 dan yang tertunda langsung dijalankan
+    def toggle_fast_forward(self):
+        enabled = not self.scheduler.fast_forward
+        self.fast_forward_var.set(f"Lewati: {'Nyala' if enabled else 'Mati'}")
+        self.scheduler.set_fast_forward(enabled)
 
     def set_action_buttons_state(self, state):
         for btn in self.action_buttons.values():
             btn.config(state=state)
 
     def unequip_current_player_slot(self, slot):
-        current_player = self.party.members[self.current_player_index]
-        result = current_player.unequip_item(slot, party=self.party)
-        self.status_var.set(result)
-        self.update_all_ui()
+        result = self.session.run(COMMAND_UNEQUIP, self.current_player_index, slot)
+        self.status_var.set(result.message())
+        self.refresh_ui()
 
     def start_stage(self):
-        self.player_defending = False
-        if self.stage % 3 == 0:
-            boss_stage_num = self.stage // 3
-            self.monsters = [BossMonster(f"Boss Tahap {boss_stage_num}", stage=boss_stage_num)]
-            self.status_var.set(f"BOSS yang kuat muncul!")
-        else:
-            monster_count = 1 if self.stage == 1 else 2
-            self.monsters = [Monster(f"Monster #{i + 1}", stage=self.stage) for i in range(monster_count)]
-            self.status_var.set(f"{len(self.monsters)} monster liar muncul!")
-
-        self.current_player_index = 0
-        self.update_all_ui()
+        self.hide_target_panel()
+        self.status_var.set(self.session.run(COMMAND_START_STAGE))
+        self.bind_model()
+        self.refresh_ui()
         self.set_action_buttons_state("normal")
         self.status_var.set(f"Giliran: {self.party.members[self.current_player_index].name}")
+        self.request_odds()
+        self.request_auto_decision()
 
     def end_battle(self, won):
         self.set_action_buttons_state("disabled")
-        if won:
-            xp_earned = 50 * self.stage
-            gold_earned = 75 * self.stage
-
-            for p in self.party.members:
-                p.gain_xp(xp_earned)
-
-            self.party.add_gold(gold_earned)
-
-            all_drops = sum([m.drop_loot() for m in self.monsters], [])
-            for item in all_drops:
-                self.party.add_item(item)
-
+        rewards = self.session.run(COMMAND_END_BATTLE, won)
+        self.battle_log.flush()
+        if rewards:
+            xp_earned, gold_earned, all_drops = rewards
             drop_names = ", ".join(item.name for item in all_drops) if all_drops else "Tidak ada."
             self.status_var.set(f"Menang! Dapat {xp_earned} XP & {gold_earned} Emas.\nJarahan: {drop_names}\nBersiap untuk tahap selanjutnya...")
-            self.stage += 1
-            self.root.after(4000, self.start_stage)
+            self.scheduler.schedule(STAGE_DELAY_MS, self.start_stage)
         else:
             self.status_var.set("Permainan Berakhir! Anda telah dikalahkan.")
             messagebox.showinfo("Kalah", "Anda dikalahkan! Permainan akan diatur ulang.")
             self.reset_game()
-        self.update_all_ui()
+        self.refresh_ui()
 
     def reset_game(self):
-        self.stage = 1
-        self.party = Party(members=[Player(), Sage()])
-        self.party.gold = 200
-        self.current_player_index = 0
+        # Callback giliran/tahap dari permainan sebelumnya tidak boleh ikut berjalan
+        self.scheduler.cancel_all()
+        self.session.run(COMMAND_RESET)
         self.start_stage()
 
-    def execute_player_turn(self, action, *args):
-        while self.current_player_index < len(self.party.members) and not self.party.members[self.current_player_index].is_alive:
-            self.current_player_index += 1
+    # Simpanan berisi keadaan party dan tahap; pertarungan yang sedang berjalan dimulai ulang saat dimuat
+    def save_game(self):
+        try:
+            save_game(self.engine, SAVE_PATH)
+        except (OSError, SaveError) as e:
+            messagebox.showerror("Gagal", f"Permainan tidak bisa disimpan: {e}")
+            return
+        self.status_var.set(f"Permainan disimpan (Tahap {self.stage}).")
+
+    def load_game(self):
+        try:
+            with open(SAVE_PATH, "rb") as f:
+                data = decode(f.read())
+            engine = self.session.run(COMMAND_LOAD, data)
+        except FileNotFoundError:
+            messagebox.showwarning("Peringatan", "Belum ada permainan yang disimpan.")
+            return
+        except (OSError, SaveError) as e:
+            messagebox.showerror("Gagal", f"Simpanan tidak bisa dimuat: {e}")
+            return
+        self.scheduler.cancel_all()
+        engine.set_event_handler(self.battle_log)
+        self.start_stage()
 
-        if self.current_player_index >= len(self.party.members):
-            self.status_var.set("Semua pemain telah mati. Permainan berakhir.")
-            messagebox.showinfo("Game Over", "Semua pemain telah mati!")
-            self.reset_game()
+    # Sisa peristiwa di buffer log dan rekaman sesi ditulis sebelum jendela ditutup
+    def on_close(self):
+        self.scheduler.cancel_all()
+        if self.auto_worker is not None:
+            self.auto_worker.stop()
+        if self.odds_worker is not None:
+            self.odds_worker.stop()
+        self.battle_log.close()
+        try:
+            save_recording(self.session, SESSION_PATH)
+        except OSError:
+            pass
+        self.root.destroy()
+
+    def game_over(self):
+        self.status_var.set(GAME_OVER_MESSAGE)
+        messagebox.showinfo("Game Over", "Semua pemain telah mati!")
+        self.reset_game()
+
+    def execute_player_turn(self, action, target=None):
+        if self.engine.next_player() is None:
+            self.game_over()
             return
 
         self.set_action_buttons_state("disabled")
 
-        current_player = self.party.members[self.current_player_index]
-        result = action(current_player, *args)
-        self.status_var.set(result)
-        self.update_all_ui()
+        result = self.session.run(COMMAND_PLAYER_TURN, action, monster_index(self.engine, target))
+        self.status_var.set(result.message())
+        self.refresh_ui()
 
-        alive_monsters = [m for m in self.monsters if m.is_alive]
-        if not alive_monsters:
+        phase = self.engine.phase
+        if phase == PHASE_WON:
             self.end_battle(won=True)
-            return
-
-        self.current_player_index += 1
-        while self.current_player_index < len(self.party.members) and not self.party.members[self.current_player_index].is_alive:
-            self.current_player_index += 1
-
-        if self.current_player_index >= len(self.party.members):
-            self.current_player_index = 0
-            while self.current_player_index < len(self.party.members) and not self.party.members[self.current_player_index].is_alive:
-                self.current_player_index += 1
-            if self.current_player_index >= len(self.party.members):
-                self.status_var.set("Semua pemain telah mati. Permainan berakhir.")
-                messagebox.showinfo("Game Over", "Semua pemain telah mati!")
-                self.reset_game()
-                return
-            self.root.after(1500, self.execute_monster_turn)
+        elif phase == PHASE_LOST:
+            self.game_over()
+        elif phase == PHASE_MONSTER:
+            self.scheduler.schedule(TURN_DELAY_MS, self.execute_monster_turn)
         else:
             self.status_var.set(f"Giliran: {self.party.members[self.current_player_index].name}")
             self.set_action_buttons_state("normal")
-            self.update_all_ui()
+            self.refresh_ui()
+            self.request_auto_decision()
 
     def player_attack_action(self):
-        target = self.choose_target()
-        if target:
-            self.execute_player_turn(lambda player: player.attack(target))
+        self.choose_target(lambda target: self.execute_player_turn(ACTION_ATTACK, target))
 
     def player_special_attack_action(self):
-        target = self.choose_target()
-        if target:
-            self.execute_player_turn(lambda player: player.special_attack(target))
+        self.choose_target(lambda target: self.execute_player_turn(ACTION_SPECIAL, target))
 
     def player_defend_action(self):
-        self.player_defending = True
-
-        def defend_turn(player):
-            return f"{player.name} bersiap untuk bertahan!"
-
-        self.execute_player_turn(defend_turn)
+        self.execute_player_turn(ACTION_DEFEND)
 
     def execute_monster_turn(self):
-        turn_results = []
-        living_players = self.party.get_living_members()
-        if not living_players:
-            self.status_var.set("Semua pemain telah mati. Permainan berakhir.")
+        if not self.party.get_living_members():
+            self.game_over()
+            return
+
+        turn_results = self.session.run(COMMAND_MONSTER_TURN)
+        self.status_var.set("\\n".join(result.message() for result in turn_results))
+        self.refresh_ui()
+        if self.engine.phase == PHASE_LOST:
             messagebox.showinfo("Game Over", "Semua pemain telah mati!")
             self.reset_game()
             return
 
-        for monster in self.monsters:
-            if not monster.is_alive:
-                continue
+        self.set_action_buttons_state("normal")
+        self.status_var.set(f"Giliran: {self.party.members[self.current_player_index].name}")
+        self.request_odds()
+        self.request_auto_decision()
+
+    # Peluang menang jika semua pemain terus memakai serangan biasa, dihitung
+    # ulang di awal setiap ronde (pertanyaan ulang biasanya langsung dari memo)
+    def request_odds(self):
+        self.odds_token += 1
+        if self.engine.wave_size:
+            self.odds_var.set("")
+            return
+        if self.odds_worker is None:
+            self.odds_worker = EncounterOracleWorker(EncounterOracle())
+        self.odds_var.set("Peluang menang: menghitung...")
+        self.odds_worker.submit(self.odds_token, EncounterOracle.query(self.engine))
+        self.root.after(ODDS_POLL_MS, self.poll_odds, self.odds_token)
+
+    def poll_odds(self, token):
+        if token != self.odds_token:
+            return
+        while True:
+            answer = self.odds_worker.poll()
+            if answer is None:
+                self.root.after(ODDS_POLL_MS, self.poll_odds, token)
+                return
+            answer_token, odds = answer
+            if answer_token == token:
+                break
+        if odds is None:
+            self.odds_var.set("Peluang menang: pertarungan terlalu besar untuk dihitung")
+        else:
+            self.odds_var.set(f"{odds.message()} jika semua pemain terus menyerang")
+
+    def toggle_auto_battle(self):
+        self.auto_battle = not self.auto_battle
+        self.auto_battle_var.set(f"Otomatis: {'Nyala' if self.auto_battle else 'Mati'}")
+        # Keputusan yang sedang dipikirkan tidak lagi berlaku
+        self.auto_token += 1
+        if self.auto_battle:
+            self.request_auto_decision()
+        elif self.engine.phase == PHASE_PLAYER:
+            self.set_action_buttons_state("normal")
+            self.status_var.set(f"Giliran: {self.party.members[self.current_player_index].name}")
 
-            target = random.choice(living_players)
+    # Mengirim snapshot giliran pemain saat ini ke thread planner
+    def request_auto_decision(self):
+        if not self.auto_battle or self.engine.phase != PHASE_PLAYER or self.engine.next_player() is None:
+            return
+        if self.auto_worker is None:
+            self.auto_worker = AutoBattleWorker(AutoBattlePlanner(budget_ms=AUTO_BATTLE_BUDGET_MS))
+        self.auto_token += 1
+        self.hide_target_panel()
+        self.set_action_buttons_state("disabled")
+        self.status_var.set(f"Giliran: {self.engine.current_player.name} (otomatis, berpikir...)")
+        self.auto_worker.submit(self.auto_token, BattleSnapshot.from_engine(self.engine))
+        self.root.after(AUTO_POLL_MS, self.poll_auto_decision, self.auto_token)
 
-            action = monster.special_attack if random.random() < 0.2 else monster.attack
-            result = action(target)
+    # Diperiksa dari thread Tk; keputusan dengan token lama dibuang
+    def poll_auto_decision(self, token):
+        if token != self.auto_token:
+            return
+        while True:
+            decision = self.auto_worker.poll()
+            if decision is None:
+                self.root.after(AUTO_POLL_MS, self.poll_auto_decision, token)
+                return
+            decision_token, (action, target) = decision
+            if decision_token == token:
+                break
+        if self.engine.phase != PHASE_PLAYER:
+            return
+        if action == ACTION_POTION:
+            # Ramuan bisa saja sudah dipakai lewat inventaris selama planner berpikir
+            item_id, member_index = target
+            if self.party.quantity(self.party.catalog[item_id]) > 0:
+                self.session.run(COMMAND_USE_ITEM, item_id, member_index)
+            self.execute_player_turn(ACTION_DEFEND)
+        else:
+            self.execute_player_turn(action, monster_at(self.engine, target))
+
+    def choose_target(self, on_selected):
+        """
+        Memilih monster target tanpa jendela modal. Dengan satu monster hidup
+        on_selected langsung dipanggil; jika lebih, tombol aksi diganti
+        tombol target di jendela utama dan on_selected(monster) dipanggil
+        saat salah satunya diklik. Tombol target dipakai ulang antar giliran.
+        """
+        alive_monsters = self.engine.living_monsters()
+        if not alive_monsters:
+            return
+        if len(alive_monsters) == 1:
+            on_selected(alive_monsters[0])
+            return
 
-            if self.player_defending and target == self.party.members[self.current_player_index]:
-                result += " (Bertahan!)"
+        self.hide_target_panel()
+        # Tambah tombol hanya jika gelombang lebih besar dari yang pernah ditampilkan
+        while len(self.target_buttons) < len(alive_monsters):
+            i = len(self.target_buttons)
+            button = tk.Button(self.target_frame, font=(FONT_NAME, 11, "bold"), fg="white", bg="#8a5cf6",
+                               activebackground="#6a3cd2", width=14)
+            button.grid(row=i // 6, column=1 + i % 6, padx=4, pady=2)
+            self.target_buttons.append(button)
+
+        for i, button in enumerate(self.target_buttons):
+            if i < len(alive_monsters):
+                monster = alive_monsters[i]
+                button.config(text=f"{monster.name}\nHP: {monster.hp} / {monster.max_hp}",
+                              command=lambda m=monster: self.select_monster(m, on_selected))
+                button.grid()
+            else:
+                button.grid_remove()
 
-            turn_results.append(result)
+        self.buttons_frame.pack_forget()
+        self.target_frame.pack(after=self.status_frame, pady=5)
 
-            living_players = self.party.get_living_members()
-            if not living_players:
-                self.status_var.set("\\n".join(turn_results))
-                self.update_all_ui()
-                messagebox.showinfo("Game Over", "Semua pemain telah mati!")
-                self.reset_game()
-                return
+    def hide_target_panel(self):
+        if self.target_frame.winfo_manager():
+            self.target_frame.pack_forget()
+            self.buttons_frame.pack(after=self.status_frame, pady=5)
 
-        self.player_defending = False
-        self.status_var.set("\\n".join(turn_results))
-        self.update_all_ui()
-        self.set_action_buttons_state("normal")
-        self.status_var.set(f"Giliran: {self.party.members[self.current_player_index].name}")
+    def select_monster(self, monster, on_selected):
+        self.hide_target_panel()
+        if monster.is_alive:
+            on_selected(monster)
 
-    def choose_target(self):
-        alive_monsters = [m for m in self.monsters if m.is_alive]
-        if not alive_monsters:
-            return None
-        if len(alive_monsters) == 1:
-            return alive_monsters[0]
-
-        # Create a new window for monster selection with improved UI
-        self.selected_monster = None  # Reset before selection
-        target_win = tk.Toplevel(self.root)
-        target_win.title("Pilih Target")
-        target_win.transient(self.root)
-        target_win.grab_set()
-        target_win.geometry("320x300")
-        target_win.configure(bg="#2d2d44")
-
-        tk.Label(target_win, text="Pilih target monster:", font=(FONT_NAME, 14, "bold"), fg="white", bg="#2d2d44").pack(pady=15)
-
-        button_frame = tk.Frame(target_win, bg="#2d2d44")
-        button_frame.pack(pady=10, fill="both", expand=True)
-
-        # Scrollbar for many monsters
-        canvas = tk.Canvas(button_frame, bg="#2d2d44", highlightthickness=0)
-        scrollbar = tk.Scrollbar(button_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg="#2d2d44")
-
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        for monster in alive_monsters:
-            btn = tk.Button(scrollable_frame,
-                            text=f"{monster.name}\nHP: {monster.hp} / {monster.max_hp}",
-                            font=(FONT_NAME, 12, "bold"),
-                            fg="white",
-                            bg="#8a5cf6",
-                            activebackground="#6a3cd2",
-                            width=25,
-                            height=3,
-                            relief="raised",
-                            bd=3,
-                            command=lambda m=monster: self.select_monster(m, target_win))
-            btn.pack(pady=6, padx=10, fill="x", expand=True)
-
-        # Cancel button
-        cancel_btn = tk.Button(target_win, text="Batal", font=(FONT_NAME, 12, "bold"), bg="#ff5555", fg="white",
-                               command=lambda: self.cancel_selection(target_win))
-        cancel_btn.pack(pady=10, ipadx=10)
-
-        self.root.wait_window(target_win)
-        return self.selected_monster
-
-    def select_monster(self, monster, window):
-        self.selected_monster = monster
-        window.destroy()
-
-    def cancel_selection(self, window):
-        self.selected_monster = None
-        window.destroy()
+    def cancel_selection(self):
+        self.hide_target_panel()
 
     def upgrade_stat(self, stat):
-        current_player = self.party.members[self.current_player_index]
-        result = current_player.upgrade_stat(stat)
-        self.status_var.set(result)
-        self.update_all_ui()
+        result = self.session.run(COMMAND_UPGRADE, self.current_player_index, stat)
+        self.status_var.set(result.message())
+        self.refresh_ui()
 
-    def open_inventory_window(self):
+    # Jendela pop-up dibuat sekali dalam keadaan tersembunyi lalu dipakai ulang
+    def build_popup_window(self, title, geometry):
         win = tk.Toplevel(self.root)
-        win.title("Inventaris")
+        win.withdraw()
+        win.title(title)
         win.transient(self.root)
-        win.grab_set()
-        win.geometry("600x450")
+        win.geometry(geometry)
         win.configure(bg="#2d2d44")
+        win.protocol("WM_DELETE_WINDOW", lambda: self.close_popup_window(win))
+        return win
 
-        listbox = tk.Listbox(win, font=(FONT_NAME, 12), width=70, height=15, bg="#3c3c54", fg="white",
-                             selectbackground="#8a5cf6")
-        listbox.pack(padx=12, pady=8)
+    def show_popup_window(self, win):
+        win.deiconify()
+        win.lift()
+        win.grab_set()
 
-        def refresh_list():
-            listbox.delete(0, tk.END)
-            inventory = self.party.inventory
-            if not inventory:
-                listbox.insert(tk.END, "<Inventaris kosong>")
-                return
-            for item, qty in inventory.items():
-                listbox.insert(tk.END, f"{item.name} x{qty} - {item.description}")
-
-        def choose_target_player():
-            target_win = tk.Toplevel(win)
-            target_win.title("Pilih Pemain")
-            target_win.transient(win)
-            target_win.grab_set()
-            target_win.geometry("300x170")
-            target_win.configure(bg="#2d2d44")
-
-            tk.Label(target_win, text="Pilih pemain untuk memakai item ini:", font=(FONT_NAME, 12), fg="white",
-                     bg="#2d2d44").pack(pady=10)
-
-            selected = tk.StringVar()
-
-            def select_hero():
-                selected.set("Hero")
-                target_win.destroy()
-
-            def select_sage():
-                selected.set("Sage")
-                target_win.destroy()
-
-            tk.Button(target_win, text="Hero", command=select_hero, font=(FONT_NAME, 12), bg="#8a5cf6", fg="white",
-                      width=12).pack(pady=5)
-            tk.Button(target_win, text="Sage", command=select_sage, font=(FONT_NAME, 12), bg="#4ecdc4", fg="white",
-                      width=12).pack(pady=5)
-
-            target_win.wait_window()
-            return selected.get()
-
-        def use_item():
-            selected_indices = listbox.curselection()
-            if not selected_indices:
-                messagebox.showwarning("Peringatan", "Silakan pilih item untuk digunakan.", parent=win)
-                return
+    def close_popup_window(self, win):
+        win.grab_release()
+        win.withdraw()
+
+    def build_inventory_window(self):
+        win = self.build_popup_window("Inventaris", "600x450")
+        self.inventory_window = win
+
+        # Saringan jenis/statistik dan urutan untuk indeks inventaris
+        filter_row = tk.Frame(win, bg="#2d2d44")
+        filter_row.pack(padx=12, pady=(8, 0), fill="x")
+        self.inventory_type_var = tk.StringVar(value="Semua")
+        self.inventory_stat_var = tk.StringVar(value="Semua")
+        self.inventory_sort_var = tk.StringVar(value="Nama")
+        for label, var, options in (("Jenis:", self.inventory_type_var, ITEM_TYPE_FILTERS),
+                                    ("Statistik:", self.inventory_stat_var, STAT_FILTERS),
+                                    ("Urutkan:", self.inventory_sort_var, SORT_OPTIONS)):
+            tk.Label(filter_row, text=label, font=(FONT_NAME, 11), fg="white", bg="#2d2d44").pack(side="left")
+            tk.OptionMenu(filter_row, var, *options, command=lambda _: self.apply_inventory_filter()).pack(
+                side="left", padx=(2, 10))
+
+        self.inventory_index = InventoryIndex(self.party.inventory, self.party.catalog)
+        self.inventory_view = VirtualListbox(win, self.format_inventory_view_row, visible_rows=15,
+                                             empty_text="<Inventaris kosong>", font=(FONT_NAME, 12), width=70,
+                                             bg="#3c3c54", fg="white", selectbackground="#8a5cf6")
+        self.inventory_view.pack(padx=12, pady=8)
+
+        # Baris pemilihan pemain di dalam jendela inventaris (tanpa jendela modal)
+        self.item_target_row = tk.Frame(win, bg="#2d2d44")
+        tk.Label(self.item_target_row, text="Pilih pemain untuk memakai item ini:", font=(FONT_NAME, 12),
+                 fg="white", bg="#2d2d44").pack(side="left", padx=6)
+        self.item_target_buttons = []
+        for i in range(len(self.party.members)):
+            button = tk.Button(self.item_target_row, command=lambda index=i: self.select_item_target(index),
+                               font=(FONT_NAME, 12), bg="#8a5cf6" if i == 0 else "#4ecdc4", fg="white", width=10)
+            button.pack(side="left", padx=4)
+            self.item_target_buttons.append(button)
+        tk.Button(self.item_target_row, text="Batal", command=self.hide_item_target_row, font=(FONT_NAME, 12),
+                  bg="#aaa", fg="black").pack(side="left", padx=4)
+        self.pending_item = None
 
-            item_text = listbox.get(selected_indices[0])
-            item_name_to_find = item_text.split(" x")[0]
+        btn_frame = tk.Frame(win, bg="#2d2d44")
+        btn_frame.pack(side="bottom", pady=6)
+        tk.Button(btn_frame, text="Gunakan/Lengkapi", command=self.use_item, font=(FONT_NAME, 12), bg="#3D9970",
+                  fg="white").pack(side="left", padx=6)
+        for label, objective in (("Atur Serangan", OBJECTIVE_DAMAGE), ("Atur Bertahan", OBJECTIVE_SURVIVAL)):
+            tk.Button(btn_frame, text=label, command=lambda objective=objective: self.optimize_loadout(objective),
+                      font=(FONT_NAME, 12), bg="#4ecdc4", fg="white").pack(side="left", padx=6)
+        tk.Button(btn_frame, text="Tutup", command=self.close_inventory_window, font=(FONT_NAME, 12), bg="#aaa",
+                  fg="black").pack(side="left", padx=6)
 
-            # Temukan objek item inventaris berdasarkan nama
-            item_to_use = None
-            for item in self.party.inventory.keys():
-                if item.name == item_name_to_find:
-                    item_to_use = item
-                    break
+    def open_inventory_window(self):
+        self.hide_item_target_row()
+        self.refresh_inventory_list()
+        self.show_popup_window(self.inventory_window)
+
+    def close_inventory_window(self):
+        self.hide_item_target_row()
+        self.close_popup_window(self.inventory_window)
+
+    def refresh_inventory_list(self):
+        if self.inventory_index.inventory is not self.party.inventory:
+            self.inventory_index.inventory = self.party.inventory
+            self.inventory_index.catalog = self.party.catalog
+            self.inventory_index.rebuild()
+        self.inventory_view.set_row_count(len(self.inventory_index))
+
+    def apply_inventory_filter(self):
+        self.inventory_index.item_type = ITEM_TYPE_FILTERS[self.inventory_type_var.get()]
+        self.inventory_index.stat = STAT_FILTERS[self.inventory_stat_var.get()]
+        self.inventory_index.set_sort(SORT_OPTIONS[self.inventory_sort_var.get()])
+        self.inventory_view.clear_selection()
+        self.inventory_view.scroll_to(0)
+        self.inventory_view.set_row_count(len(self.inventory_index))
+
+    def format_inventory_view_row(self, row):
+        item_id = self.inventory_index.rows[row]
+        return format_inventory_row(self.party.catalog[item_id], self.party.inventory[item_id])
+
+    # Satu item berubah jumlah: perbarui indeks dan paling banyak satu baris yang terlihat
+    def on_inventory_item_change(self, item, qty):
+        if self.inventory_index.inventory is not self.party.inventory:
+            return
+        change = self.inventory_index.update(item, qty)
+        if change is None:
+            return
+        action, row = change
+        if action == "update":
+            self.inventory_view.update_row(row)
+        elif action == "insert":
+            self.inventory_view.insert_row(row)
+        else:
+            self.inventory_view.delete_row(row)
+
+    def hide_item_target_row(self):
+        self.pending_item = None
+        self.item_target_row.pack_forget()
+
+    def choose_item_target(self, item):
+        self.pending_item = item
+        for button, member in zip(self.item_target_buttons, self.party.members):
+            button.config(text=member.name)
+        self.item_target_row.pack(pady=6)
+
+    def select_item_target(self, index):
+        item = self.pending_item
+        self.hide_item_target_row()
+        if item is not None:
+            self.apply_item(item, index)
+
+    def use_item(self):
+        win = self.inventory_window
+        row = self.inventory_view.selected_index()
+        if row is None:
+            messagebox.showwarning("Peringatan", "Silakan pilih item untuk digunakan.", parent=win)
+            return
 
-            if not item_to_use:
-                messagebox.showerror("Error", "Item tidak ditemukan.", parent=win)
-                return
+        # Baris daftar dipetakan langsung ke ID item
+        item_to_use = self.party.catalog.get(self.inventory_index.rows[row])
+        if not item_to_use:
+            messagebox.showerror("Error", "Item tidak ditemukan.", parent=win)
+            return
 
-            # Konfirmasi jumlah inventaris > 0 sebelum menggunakan
-            if self.party.inventory.get(item_to_use, 0) <= 0:
-                messagebox.showwarning("Gagal", f"Item tidak tersedia dalam inventaris.", parent=win)
-                return
+        # Konfirmasi jumlah inventaris > 0 sebelum menggunakan
+        if self.party.quantity(item_to_use) <= 0:
+            messagebox.showwarning("Gagal", f"Item tidak tersedia dalam inventaris.", parent=win)
+            return
 
-            target_name = choose_target_player()
-            if not target_name:
-                return
+        self.choose_item_target(item_to_use)
 
-            target_player = next((p for p in self.party.members if p.name.lower() == target_name.lower()), None)
-            if not target_player:
-                messagebox.showerror("Error", "Pemain tidak ditemukan.", parent=win)
-                return
+    def apply_item(self, item_to_use, member_index):
+        win = self.inventory_window
+        if self.party.quantity(item_to_use) <= 0:
+            messagebox.showwarning("Gagal", f"Item tidak tersedia dalam inventaris.", parent=win)
+            return
 
-            if item_to_use.item_type == ITEM_TYPE_POTION:
-                result = target_player.use_potion(item_to_use, party=self.party)
-                if "Menggunakan" in result or "dihidupkan kembali" in result:
-                    self.party.remove_item(item_to_use, 1)
-            elif item_to_use.item_type == ITEM_TYPE_EQUIPMENT:
-                result = target_player.equip_item(item_to_use, self.party)
-            else:
-                messagebox.showinfo("Info", "Item tidak bisa digunakan.", parent=win)
-                return
+        if item_to_use.item_type not in (ITEM_TYPE_POTION, ITEM_TYPE_EQUIPMENT):
+            messagebox.showinfo("Info", "Item tidak bisa digunakan.", parent=win)
+            return
+        result = self.session.run(COMMAND_USE_ITEM, item_to_use.item_id, member_index)
 
-            messagebox.showinfo("Hasil", result, parent=win)
-            self.update_all_ui()
-            refresh_list()
+        messagebox.showinfo("Hasil", result.message(), parent=win)
+        self.refresh_ui()
 
-        refresh_list()
+    # Membagi ulang semua perlengkapan party; slot yang berubah dilepas dulu, lalu dipasang
+    def optimize_loadout(self, objective):
+        win = self.inventory_window
+        plan = LoadoutSolver(objective).solve(self.party, self.stage)
+        if not plan.changes():
+            messagebox.showinfo("Atur Perlengkapan", plan.message(), parent=win)
+            return
+        if not messagebox.askyesno("Atur Perlengkapan", f"{plan.message()}\n\nPasang sekarang?", parent=win):
+            return
+        for command in plan.commands(self.party):
+            self.session.run(*command)
+        self.refresh_ui()
+
+    # Daftar toko tidak pernah berubah, jadi hanya diisi sekali saat dibuat
+    def build_shop_window(self):
+        win = self.build_popup_window("Toko", "500x400")
+        self.shop_window = win
+        self.shop_items = SHOP_ITEMS
+
+        self.shop_listbox = tk.Listbox(win, font=(FONT_NAME, 12), width=60, height=12, bg="#3c3c54", fg="white",
+                                       selectbackground="#28a745")
+        self.shop_listbox.pack(padx=12, pady=8)
+        for item in self.shop_items:
+            self.shop_listbox.insert(tk.END, f"{item.name} ({item.price} Emas) - {item.description}")
 
         btn_frame = tk.Frame(win, bg="#2d2d44")
         btn_frame.pack(pady=6)
-        tk.Button(btn_frame, text="Gunakan/Lengkapi", command=use_item, font=(FONT_NAME, 12), bg="#3D9970",
+        tk.Button(btn_frame, text="Beli", command=self.buy_item, font=(FONT_NAME, 12), bg="#007b40",
                   fg="white").pack(side="left", padx=6)
-        tk.Button(btn_frame, text="Tutup", command=win.destroy, font=(FONT_NAME, 12), bg="#aaa", fg="black").pack(
-            side="left", padx=6)
+        tk.Button(btn_frame, text="Saran", command=self.suggest_purchases, font=(FONT_NAME, 12), bg="#4ecdc4",
+                  fg="white").pack(side="left", padx=6)
+        tk.Button(btn_frame, text="Tutup", command=lambda: self.close_popup_window(win), font=(FONT_NAME, 12),
+                  bg="#aaa", fg="black").pack(side="left", padx=6)
 
     def open_shop_window(self):
-        shop_items = [
-            HEALTH_POTION,
-            MP_POTION,
-            WOODEN_SWORD,
-            IRON_SWORD,
-            LUCKY_CHARM,
-            CRIT_RING,
-            CHAINMAIL_ARMOR,
-            REVIVE_POTION,
-            MAGIC_STAFF,
-            MYSTIC_ROBE,
-            MAGIC_RING,
-        ]
-        win = tk.Toplevel(self.root)
-        win.title("Toko")
-        win.transient(self.root)
-        win.grab_set()
-        win.geometry("500x400")
-        win.configure(bg="#2d2d44")
-
-        listbox = tk.Listbox(win, font=(FONT_NAME, 12), width=60, height=12, bg="#3c3c54", fg="white",
-                             selectbackground="#28a745")
-        listbox.pack(padx=12, pady=8)
-        for item in shop_items:
-            listbox.insert(tk.END, f"{item.name} ({item.price} Emas) - {item.description}")
-
-        def buy_item():
-            selected_indices = listbox.curselection()
-            if not selected_indices:
-                messagebox.showwarning("Peringatan", "Silakan pilih item yang ingin dibeli.", parent=win)
-                return
-
-            item = shop_items[selected_indices[0]]
-
-            if self.party.gold < item.price:
-                messagebox.showwarning("Gagal", "Emas tidak cukup.", parent=win)
-                return
+        self.shop_listbox.selection_clear(0, tk.END)
+        self.show_popup_window(self.shop_window)
+
+    def buy_item(self):
+        win = self.shop_window
+        selected_indices = self.shop_listbox.curselection()
+        if not selected_indices:
+            messagebox.showwarning("Peringatan", "Silakan pilih item yang ingin dibeli.", parent=win)
+            return
 
-            self.party.spend_gold(item.price)
-            self.party.add_item(item, 1)
-            messagebox.showinfo(
-                "Berhasil",
-                f"Item {item.name} berhasil dibeli dan ditambahkan ke inventaris bersama.",
-                parent=win)
-            self.update_all_ui()
+        item = self.shop_items[selected_indices[0]]
 
-        btn_frame = tk.Frame(win, bg="#2d2d44")
-        btn_frame.pack(pady=6)
-        tk.Button(btn_frame, text="Beli", command=buy_item, font=(FONT_NAME, 12), bg="#007b40", fg="white").pack(
-            side="left", padx=6)
-        tk.Button(btn_frame, text="Tutup", command=win.destroy, font=(FONT_NAME, 12), bg="#aaa", fg="black").pack(
-            side="left", padx=6)
+        if self.party.gold < item.price:
+            messagebox.showwarning("Gagal", "Emas tidak cukup.", parent=win)
+            return
 
+        self.session.run(COMMAND_BUY, item.item_id)
+        messagebox.showinfo(
+            "Berhasil",
+            f"Item {item.name} berhasil dibeli dan ditambahkan ke inventaris bersama.",
+            parent=win)
+        self.refresh_ui()
+
+    # Saran belanja dari ShopPlanner; pembelian dan pemasangan lewat session agar ikut terekam
+    def suggest_purchases(self):
+        win = self.shop_window
+        plan = ShopPlanner(self.shop_items).plan(self.party, self.stage)
+        if not plan.purchases:
+            messagebox.showinfo("Saran Belanja", plan.message(), parent=win)
+            return
+        if not messagebox.askyesno("Saran Belanja", f"{plan.message()}\n\nBeli dan pasang sekarang?", parent=win):
+            return
+        for item, qty in plan.purchases.items():
+            for _ in range(qty):
+                self.session.run(COMMAND_BUY, item.item_id)
+        for member, changes in plan.loadout:
+            member_index = self.party.members.index(member)
+            for item in changes.values():
+                self.session.run(COMMAND_USE_ITEM, item.item_id, member_index)
+        self.refresh_ui()